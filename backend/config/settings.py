@@ -71,6 +71,24 @@ DATABASES = {
     }
 }
 
+# Serialized nets are cached under a per-net version key (see rdp.serializers.serialize_petri_nets),
+# so entries never go stale; swap in Redis/Memcached to share them between workers.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'rdp',
+        'TIMEOUT': 60 * 60,
+        'OPTIONS': {'MAX_ENTRIES': 1000},
+    }
+}
+
+# Compiled Petri nets kept in each process (rdp.engine.loader); DIRECTORY adds a pickle tier
+# shared by every worker on the host.
+RDP_COMPILED_NET_CACHE = {
+    'MAX_BYTES': 256 * 1024 * 1024,
+    'DIRECTORY': None,
+}
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
@@ -0,0 +1,245 @@
+"""
+Reproducible engine benchmarks on synthetic hospital nets (``manage.py benchmark_engine``).
+
+Scenarios are generated, never read from the database, so results only depend on the engine
+and the machine: ``admission`` is the README's P1-P6 admission example, ``hospital-N`` chains N
+consultation + maternity + surgery blocks (about 20 places and 20 transitions each, 500 blocks
+being the 10k-node case) with overflow transfers between neighbouring blocks.
+"""
+import json
+import pickle
+import platform
+import time
+import tracemalloc
+from array import array
+
+from .engine import CompiledNet, Simulator, TimedSimulator, StateSpace, TraceRecorder
+
+
+FORMAT_VERSION = 1
+SCENARIOS = ('admission', 'hospital-1', 'hospital-50', 'hospital-500')
+
+# Metric name -> True when higher is better
+METRICS = {
+    'compile_ms': False,
+    'steps_per_s': True,
+    'timed_events_per_s': True,
+    'enabled_scan_us': False,
+    'states_per_s': True,
+    'pickle_ms': False,
+    'trace_pack_ms': False,
+    'peak_memory_kb': False,
+}
+
+
+def _place(pid, tokens=0, capacity=None):
+    return {'id_in_net': pid, 'tokens': tokens, 'capacity': capacity}
+
+
+def _transition(tid, timed=False, delay=1.0, priority=1):
+    return {'id_in_net': tid, 'type': 'timed' if timed else 'immediate', 'delay_mean': delay, 'priority': priority}
+
+
+def _arc(source, target, weight=1, inhibitor=False):
+    return {'source_id': source, 'target_id': target, 'weight': weight, 'is_inhibitor': inhibitor, 'is_reset': False}
+
+
+def admission_rows():
+    """P1-P6 / T1-T4 from the README, with P5 as a self-replenishing arrival source."""
+    places = [
+        _place('P1', 5), _place('P2', 0, 4), _place('P3', 4, 4), _place('P4'), _place('P5', 1), _place('P6'),
+    ]
+    transitions = [
+        _transition('T1'), _transition('T2', True, 8.0), _transition('T3', True, 5.0), _transition('T4', priority=2),
+    ]
+    arcs = [
+        _arc('P1', 'T1'), _arc('P3', 'T1'), _arc('T1', 'P2'), _arc('P6', 'T1', inhibitor=True),
+        _arc('P2', 'T2'), _arc('T2', 'P4'), _arc('T2', 'P3'),
+        _arc('P5', 'T3'), _arc('T3', 'P5'), _arc('T3', 'P1'),
+        _arc('P6', 'T4'), _arc('P3', 'T4'), _arc('T4', 'P2'),
+    ]
+    return places, transitions, arcs
+
+
+def hospital_rows(blocks):
+    """``blocks`` copies of the README's consultation, maternity and surgery flows."""
+    places, transitions, arcs = [], [], []
+    for b in range(blocks):
+        def n(name):
+            return f'{name}_b{b}'
+
+        places += [
+            _place(n('Arrivee_src'), 1), _place(n('File_Attente_Consultation')),
+            _place(n('Medecins_Generaux_libres'), 4), _place(n('Chirurgiens_libres'), 3),
+            _place(n('Bureaux_Consultation_libres'), 4), _place(n('Patients_en_Consultation')),
+            _place(n('File_Attente_Maternite')), _place(n('SagesFemmes_libres'), 6),
+            _place(n('Patients_en_PreOp')), _place(n('Salles_Operation_libres'), 2),
+            _place(n('Patients_en_Operation')), _place(n('Patients_en_PostOp')), _place(n('Patients_Sortis')),
+        ]
+        transitions += [
+            _transition(n('Arrivee_Patient'), True, 2.0),
+            _transition(n('Debut_Consultation'), priority=2),
+            _transition(n('Debut_Consultation_Chirurgien')),
+            _transition(n('Fin_Consultation_Sortie'), True, 15.0),
+            _transition(n('Fin_Consultation_Maternite'), True, 50.0),
+            _transition(n('Fin_Consultation_PreOp'), True, 50.0),
+            _transition(n('Debut_Operation')),
+            _transition(n('Fin_Operation'), True, 90.0),
+            _transition(n('Sortie_PostOp'), True, 120.0),
+        ]
+        arcs += [
+            _arc(n('Arrivee_src'), n('Arrivee_Patient')), _arc(n('Arrivee_Patient'), n('Arrivee_src')),
+            _arc(n('Arrivee_Patient'), n('File_Attente_Consultation')),
+        ]
+        for doctor, tid in (('Medecins_Generaux_libres', 'Debut_Consultation'),
+                            ('Chirurgiens_libres', 'Debut_Consultation_Chirurgien')):
+            arcs += [
+                _arc(n('File_Attente_Consultation'), n(tid)), _arc(n('Bureaux_Consultation_libres'), n(tid)),
+                _arc(n(doctor), n(tid)), _arc(n(tid), n('Patients_en_Consultation')), _arc(n(tid), n(doctor)),
+            ]
+        for tid, target in (('Fin_Consultation_Sortie', 'Patients_Sortis'),
+                            ('Fin_Consultation_Maternite', 'File_Attente_Maternite'),
+                            ('Fin_Consultation_PreOp', 'Patients_en_PreOp')):
+            arcs += [
+                _arc(n('Patients_en_Consultation'), n(tid)), _arc(n(tid), n(target)),
+                _arc(n(tid), n('Bureaux_Consultation_libres')),
+            ]
+        for room in range(1, 5):
+            salle, debut, fin = n(f'SalleMat_{room}_libre'), n(f'Debut_Maternite_{room}'), n(f'Fin_Maternite_{room}')
+            travail = n(f'Patients_en_Travail_Maternite_{room}')
+            places += [_place(salle, 3, 3), _place(travail)]
+            transitions += [_transition(debut, priority=5 - room), _transition(fin, True, 240.0)]
+            arcs += [
+                _arc(n('File_Attente_Maternite'), debut), _arc(n('SagesFemmes_libres'), debut), _arc(salle, debut),
+                _arc(debut, travail), _arc(travail, fin), _arc(fin, salle), _arc(fin, n('SagesFemmes_libres')),
+                _arc(fin, n('Patients_Sortis')),
+            ]
+        arcs += [
+            _arc(n('Patients_en_PreOp'), n('Debut_Operation')), _arc(n('Chirurgiens_libres'), n('Debut_Operation')),
+            _arc(n('Salles_Operation_libres'), n('Debut_Operation')), _arc(n('Debut_Operation'), n('Patients_en_Operation')),
+            _arc(n('Patients_en_Operation'), n('Fin_Operation')), _arc(n('Fin_Operation'), n('Chirurgiens_libres')),
+            _arc(n('Fin_Operation'), n('Salles_Operation_libres')), _arc(n('Fin_Operation'), n('Patients_en_PostOp')),
+            _arc(n('Patients_en_PostOp'), n('Sortie_PostOp')), _arc(n('Sortie_PostOp'), n('Patients_Sortis')),
+        ]
+        if b + 1 < blocks:
+            # Overflow: a maternity patient waiting here moves on when the next block has a free midwife
+            transfer = n('Transfert_Maternite')
+            transitions.append(_transition(transfer, True, 30.0))
+            arcs += [
+                _arc(n('File_Attente_Maternite'), transfer),
+                _arc(f'SagesFemmes_libres_b{b + 1}', transfer), _arc(transfer, f'SagesFemmes_libres_b{b + 1}'),
+                _arc(transfer, f'File_Attente_Maternite_b{b + 1}'),
+            ]
+    return places, transitions, arcs
+
+
+def scenario_rows(name):
+    if name == 'admission':
+        return admission_rows()
+    if name.startswith('hospital-'):
+        try:
+            return hospital_rows(int(name.split('-', 1)[1]))
+        except ValueError:
+            pass
+    raise ValueError(f"Unknown scenario '{name}'")
+
+
+def _best(function, repeat):
+    """Best wall time of ``repeat`` calls, in seconds, and the last result."""
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def run_scenario(name, steps=20_000, max_states=2_000, max_memory=64 * 1024 * 1024, repeat=3, seed=0):
+    rows = scenario_rows(name)
+    compile_s, net = _best(lambda: CompiledNet.from_rows(*rows), repeat)
+
+    def untimed(observers=()):
+        return Simulator(net, policy='random', seed=seed, observers=observers).run(steps, trace=False)
+
+    def timed():
+        return TimedSimulator(net, seed=seed, server='infinite').run(max_events=steps)
+
+    def explore():
+        space = StateSpace(net, max_states=max_states, max_memory=max_memory)
+        space.explore()
+        return space
+
+    untimed_s, untimed_result = _best(untimed, repeat)
+    timed_s, timed_result = _best(timed, repeat)
+    explore_s, space = _best(explore, repeat)
+
+    marking = array('l', net.initial_marking)
+    scans = max(1, 20_000 // max(1, net.transition_count))
+    scan_s, _ = _best(lambda: [net.enabled(marking) for _ in range(scans)], repeat)
+    pickle_s, _ = _best(lambda: pickle.loads(pickle.dumps(net, pickle.HIGHEST_PROTOCOL)), repeat)
+    recorder = TraceRecorder()
+    untimed([recorder])
+    pack_s, _ = _best(lambda: recorder.trace().to_bytes(), repeat)
+
+    # Separate pass: tracemalloc slows allocation-heavy code down too much to time it
+    tracemalloc.start()
+    try:
+        CompiledNet.from_rows(*rows)
+        untimed()
+        timed()
+        explore()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'places': net.place_count,
+        'transitions': net.transition_count,
+        'arcs': len(rows[2]),
+        'states': len(space.keys),
+        'compile_ms': compile_s * 1e3,
+        'steps_per_s': untimed_result.steps / untimed_s if untimed_s else None,
+        'timed_events_per_s': timed_result.events / timed_s if timed_s else None,
+        'enabled_scan_us': scan_s / scans * 1e6,
+        'states_per_s': len(space.keys) / explore_s if explore_s else None,
+        'pickle_ms': pickle_s * 1e3,
+        'trace_pack_ms': pack_s * 1e3,
+        'peak_memory_kb': peak / 1024,
+    }
+
+
+def run_benchmarks(scenarios=SCENARIOS, **options):
+    return {
+        'format': FORMAT_VERSION,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'options': options,
+        'results': {name: run_scenario(name, **options) for name in scenarios},
+    }
+
+
+def compare(results, baseline, tolerance=0.2):
+    """
+    Metrics of ``results`` worse than ``baseline`` by more than ``tolerance`` (relative).
+    Scenarios or metrics missing from either side are skipped.
+    """
+    regressions = []
+    for name, metrics in results['results'].items():
+        reference = baseline.get('results', {}).get(name)
+        if not reference:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            new, old = metrics.get(metric), reference.get(metric)
+            if not new or not old:
+                continue
+            change = (new - old) / old
+            if (change < -tolerance) if higher_is_better else (change > tolerance):
+                regressions.append({'scenario': name, 'metric': metric, 'baseline': old, 'value': new, 'change': change})
+    return regressions
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
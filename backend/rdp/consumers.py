@@ -0,0 +1,245 @@
+"""
+Live simulation over WebSockets, served by the plain ASGI application in ``config/asgi.py``.
+
+``ws://<host>/ws/rdp/petri-nets/<id>/simulate/?mode=timed&fps=20&speed=60`` opens a session that runs
+the engine server-side and pushes one frame per tick with only the places whose tokens changed:
+
+    -> {"type": "init", "marking": {...}, "enabled": [...], ...}
+    <- {"action": "play"} | {"action": "pause"} | {"action": "step", "count": 1}
+       | {"action": "fps", "value": 30} | {"action": "batch", "value": 100} | {"action": "speed", "value": 120}
+       | {"action": "reset"}
+    -> {"type": "frame", "step": 42, "time": 12.5, "fired": ["t1"], "changed": {"p1": 0, "p2": 3}}
+    -> {"type": "stopped", "reason": "deadlock"}
+"""
+import asyncio
+import json
+import re
+from array import array
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+
+from .engine import Simulator, TimedSimulator, POLICIES, SERVER_SEMANTICS
+from .engine.loader import load_compiled_net
+from .models import PetriNet
+
+PATH = re.compile(r'^/ws/rdp/petri-nets/(?P<pk>\d+)/simulate/?$')
+MAX_FPS = 60
+MAX_BATCH = 10_000
+
+
+class SessionError(ValueError):
+    pass
+
+
+def _number(options, name, default, cast, low, high):
+    try:
+        value = cast(options.get(name, default))
+    except (TypeError, ValueError):
+        raise SessionError(f"'{name}' must be a number")
+    if not low <= value <= high:
+        raise SessionError(f"'{name}' must be between {low} and {high}")
+    return value
+
+
+class SimulationSession:
+    """
+    Engine state of one connection. ``fps`` frames per second; each frame fires ``batch`` transitions
+    (untimed) or advances the clock by ``speed / fps`` time units (timed, at most MAX_BATCH firings).
+    """
+
+    def __init__(self, net, options):
+        self.net = net
+        self.mode = options.get('mode', 'untimed')
+        if self.mode not in ('untimed', 'timed'):
+            raise SessionError("'mode' must be 'untimed' or 'timed'")
+        self.policy = options.get('policy', 'first')
+        if self.policy not in POLICIES:
+            raise SessionError(f"'policy' must be one of {', '.join(POLICIES)}")
+        self.server = options.get('server', 'single')
+        if self.server not in SERVER_SEMANTICS:
+            raise SessionError(f"'server' must be one of {', '.join(SERVER_SEMANTICS)}")
+        self.seed = _number(options, 'seed', 0, int, -2 ** 63, 2 ** 63 - 1) if 'seed' in options else None
+        self.configure(options)
+        self.reset()
+
+    def configure(self, options):
+        self.fps = _number(options, 'fps', getattr(self, 'fps', 10), float, 0.1, MAX_FPS)
+        self.batch = _number(options, 'batch', getattr(self, 'batch', 1), int, 1, MAX_BATCH)
+        self.speed = _number(options, 'speed', getattr(self, 'speed', 1.0), float, 1e-6, 1e9)
+
+    def reset(self):
+        if self.mode == 'timed':
+            self.sim = TimedSimulator(self.net, seed=self.seed, server=self.server)
+        else:
+            self.sim = Simulator(self.net, policy=self.policy, seed=self.seed)
+        self.steps = 0
+        self.sent = array('l', self.sim.marking)
+
+    @property
+    def time(self):
+        return self.sim.now if self.mode == 'timed' else None
+
+    def advance(self, count=None):
+        """
+        Fire ``count`` transitions, or one frame's worth when ``count`` is None.
+        Returns ``(fired, deadlock)``.
+        """
+        sim, fired = self.sim, []
+        if self.mode == 'untimed':
+            for _ in range(self.batch if count is None else count):
+                t = sim.step()
+                if t is None:
+                    return fired, True
+                fired.append(t)
+            return fired, False
+
+        horizon = None if count is not None else sim.now + self.speed / self.fps
+        while len(fired) < (MAX_BATCH if count is None else count):
+            t = sim.step(horizon)
+            if t is None:
+                if sim.next_event_time() is None:
+                    return fired, True
+                sim.now = max(sim.now, horizon)
+                break
+            fired.append(t)
+        return fired, False
+
+    def frame(self, fired):
+        """The frame message for ``fired``: only places whose tokens differ from the last frame sent."""
+        net, marking, sent = self.net, self.sim.marking, self.sent
+        changed = {}
+        for p in {p for t in set(fired) for p in net.changed[t]}:
+            if marking[p] != sent[p]:
+                sent[p] = marking[p]
+                changed[net.place_ids[p]] = marking[p]
+        self.steps += len(fired)
+        return {
+            'type': 'frame',
+            'step': self.steps,
+            'time': self.time,
+            'fired': [net.transition_ids[t] for t in fired],
+            'changed': changed,
+        }
+
+    def state(self, playing):
+        net = self.net
+        return {
+            'type': 'init',
+            'mode': self.mode,
+            'playing': playing,
+            'fps': self.fps,
+            'batch': self.batch,
+            'speed': self.speed,
+            'step': self.steps,
+            'time': self.time,
+            'marking': net.marking_dict(self.sim.marking),
+            'enabled': [net.transition_ids[t] for t in sorted(self.sim.index.members)],
+        }
+
+
+@sync_to_async
+def _load(pk):
+    try:
+        return load_compiled_net(PetriNet.objects.get(pk=pk))
+    except PetriNet.DoesNotExist:
+        return None
+
+
+async def _send_json(send, payload):
+    await send({'type': 'websocket.send', 'text': json.dumps(payload)})
+
+
+async def simulation_websocket(scope, receive, send):
+    message = await receive()
+    if message['type'] != 'websocket.connect':
+        return
+    match = PATH.match(scope['path'])
+    if match is None:
+        await send({'type': 'websocket.close', 'code': 4404})
+        return
+    net = await _load(int(match['pk']))
+    if net is None:
+        await send({'type': 'websocket.close', 'code': 4404})
+        return
+    options = {k: v[-1] for k, v in parse_qs(scope.get('query_string', b'').decode()).items()}
+    try:
+        session = SimulationSession(net, options)
+    except SessionError as e:
+        await send({'type': 'websocket.accept'})
+        await _send_json(send, {'type': 'error', 'error': str(e)})
+        await send({'type': 'websocket.close', 'code': 4400})
+        return
+
+    await send({'type': 'websocket.accept'})
+    lock = asyncio.Lock()  # one engine advance at a time, shared by the player and "step" messages
+    player = None
+
+    async def advance(count=None):
+        async with lock:
+            # Off the event loop: a large frame must not stall the other sessions of this worker
+            fired, deadlock = await asyncio.to_thread(session.advance, count)
+            if fired:
+                await _send_json(send, session.frame(fired))
+            if deadlock:
+                await _send_json(send, {'type': 'stopped', 'reason': 'deadlock', 'step': session.steps})
+        return deadlock
+
+    async def play():
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            if await advance():
+                return
+            await asyncio.sleep(max(0.0, 1.0 / session.fps - (loop.time() - started)))
+
+    def playing():
+        return player is not None and not player.done()
+
+    async def pause():
+        nonlocal player
+        if playing():
+            player.cancel()
+            try:
+                await player
+            except asyncio.CancelledError:
+                pass
+        player = None
+
+    await _send_json(send, session.state(False))
+    try:
+        while True:
+            message = await receive()
+            if message['type'] == 'websocket.disconnect':
+                break
+            if message['type'] != 'websocket.receive':
+                continue
+            try:
+                command = json.loads(message.get('text') or message.get('bytes') or 'null')
+                action = command.get('action') if isinstance(command, dict) else None
+                if action == 'play':
+                    if not playing():
+                        player = asyncio.create_task(play())
+                elif action == 'pause':
+                    await pause()
+                elif action == 'step':
+                    await pause()
+                    await advance(_number(command, 'count', 1, int, 1, MAX_BATCH))
+                elif action in ('fps', 'batch', 'speed'):
+                    session.configure({action: command.get('value')})
+                elif action == 'reset':
+                    await pause()
+                    async with lock:
+                        session.reset()
+                    await _send_json(send, session.state(False))
+                    continue
+                else:
+                    raise SessionError(f"Unknown action {action!r}")
+            except (ValueError, SessionError) as e:
+                await _send_json(send, {'type': 'error', 'error': str(e)})
+                continue
+            await _send_json(send, {
+                'type': 'state', 'playing': playing(), 'fps': session.fps, 'batch': session.batch, 'speed': session.speed,
+            })
+    finally:
+        await pause()
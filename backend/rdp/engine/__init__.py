@@ -0,0 +1,28 @@
+from .compiler import CompiledNet
+from .index import EnabledIndex
+from .simulator import Simulator, SimulationResult, POLICIES
+from .distributions import DISTRIBUTIONS, make_sampler
+from .stats import Observer, MarkingStatistics, confidence_interval
+from .timed import TimedSimulator, TimedResult, SERVER_SEMANTICS, MAX_EVENTS
+from .replications import replicate, run_replication, aggregate_replications
+from .stubborn import StubbornSets
+from .reachability import StateSpace, OMEGA, analyse
+from .invariants import InvariantExplosion, farkas, incidence_matrix, structural_analysis
+from .trace import TraceRecorder, Trace
+from .kpi import KPICollector, P2Quantile, LevelHistogram
+from .colored import ColoredNet, ColoredSimulator, ColoredResult
+from .schedule import CompiledSchedule
+from .optimizer import optimize
+from .warmup import mser, SteadyStateMonitor
+from .reduction import Reduction, reduce_net
+
+__all__ = [
+    'CompiledNet', 'EnabledIndex', 'Simulator', 'SimulationResult', 'POLICIES',
+    'DISTRIBUTIONS', 'make_sampler', 'Observer', 'MarkingStatistics', 'TimedSimulator', 'TimedResult',
+    'SERVER_SEMANTICS', 'MAX_EVENTS', 'confidence_interval', 'replicate', 'run_replication',
+    'aggregate_replications', 'StubbornSets', 'StateSpace', 'OMEGA', 'analyse',
+    'InvariantExplosion', 'farkas', 'incidence_matrix', 'structural_analysis',
+    'TraceRecorder', 'Trace', 'KPICollector', 'P2Quantile', 'LevelHistogram',
+    'ColoredNet', 'ColoredSimulator', 'ColoredResult', 'CompiledSchedule', 'optimize',
+    'mser', 'SteadyStateMonitor', 'Reduction', 'reduce_net',
+]
@@ -0,0 +1,99 @@
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+
+
+class CompiledNetCache:
+    """
+    Thread-safe LRU of ``(marking_version, CompiledNet)`` pairs bounded by ``max_bytes``
+    (``CompiledNet.nbytes``).
+
+    With ``directory`` set, entries are also pickled there (only the arrays travel, see
+    ``CompiledNet.__getstate__``), so other worker processes and restarts skip the database
+    and the compilation; in-process misses fall back to that tier before the caller rebuilds.
+    Keys must change whenever the structure does; stale files are never read again and can be
+    pruned by age.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024, directory=None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+        value = self._read(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._store(key, value)
+        return value
+
+    def put(self, key, value, persist=True):
+        """Store ``value``; ``persist=False`` skips the file tier (e.g. a marking-only refresh)."""
+        self._store(key, value)
+        if persist:
+            self._write(key, value)
+
+    def discard(self, pk):
+        """Drop every in-process entry of net ``pk`` (keys start with the net id)."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == pk]:
+                self.nbytes -= self._entries.pop(key)[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def _store(self, key, value):
+        size = value[1].nbytes
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.nbytes -= previous[1]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                self.nbytes -= self._entries.popitem(last=False)[1][1]
+
+    def _path(self, key):
+        return os.path.join(self.directory, '-'.join(str(part) for part in key) + '.pickle')
+
+    def _read(self, key):
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(key), 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def _write(self, key, value):
+        if not self.directory:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._path(key))  # readers never see a partial file
+        except OSError:
+            pass
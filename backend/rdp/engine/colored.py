@@ -0,0 +1,314 @@
+import random
+from array import array
+
+
+DOT = 'dot'   # colour of plain (uncoloured) tokens
+ANY = '*'     # arc inscription: the colour bound by the firing
+
+VARIABLE = -1  # compiled ANY
+ALL = -2       # inhibitor/reset arc without colour: looks at every colour of the place
+
+
+class ColoredNet:
+    """
+    Coloured Petri net with one colour variable per transition, compiled like :class:`CompiledNet`.
+
+    Tokens are plain strings (``"urgent"``, ``"stagiaire-3"``); the marking is a flat
+    ``places x colours`` count array, so a folded net with one place per resource type
+    replaces one place per resource instance. Arc ``color`` inscriptions:
+
+    * ``''``: plain ``dot`` tokens (inhibitor/reset arcs: every colour of the place);
+    * a colour name: tokens of that colour only;
+    * ``'*'``: tokens of the colour the transition fires with. The candidates are the
+      colours available on its ``'*'`` input arcs, narrowed by the arcs' ``guard`` lists.
+
+    Uncoloured nets only hold ``dot`` tokens and behave exactly like the P/T engine.
+    Capacities bound the total over all colours.
+    """
+
+    def __init__(self, place_ids, transition_ids, colors, initial_marking, capacity,
+                 inputs, inhibitors, resets, outputs, guards):
+        self.place_ids = tuple(place_ids)
+        self.transition_ids = tuple(transition_ids)
+        self.colors = tuple(colors)
+        self.initial_marking = array('l', initial_marking)
+        self.capacity = array('l', capacity)
+        self.inputs = inputs            # t -> ((place, weight, colour), ...)
+        self.inhibitors = inhibitors    # t -> ((place, weight, colour or ALL), ...)
+        self.resets = resets            # t -> ((place, colour or ALL), ...)
+        self.outputs = outputs          # t -> ((place, weight, colour), ...)
+        self.guards = guards            # t -> tuple of allowed colours, or None
+        self.place_index = {pid: i for i, pid in enumerate(self.place_ids)}
+        self.transition_index = {tid: i for i, tid in enumerate(self.transition_ids)}
+        self.color_index = {color: i for i, color in enumerate(self.colors)}
+
+        size = len(self.place_ids)
+        dependents = [set() for _ in range(size)]
+        touched, variable = [], []
+        for t in range(len(self.transition_ids)):
+            for p, *_ in inputs[t] + inhibitors[t]:
+                dependents[p].add(t)
+            for p, *_ in outputs[t]:
+                if self.capacity[p]:
+                    dependents[p].add(t)
+            touched.append(tuple(sorted({p for p, *_ in inputs[t] + resets[t] + outputs[t]})))
+            variable.append(tuple((p, w) for p, w, k in inputs[t] if k == VARIABLE))
+        self.dependents = tuple(tuple(sorted(ts)) for ts in dependents)
+        self.touched = tuple(touched)
+        self.variable_inputs = tuple(variable)
+
+    @classmethod
+    def from_rows(cls, places, transitions, arcs):
+        """
+        Compile rows like ``CompiledNet.from_rows``, plus ``colored_tokens`` on places
+        (``{colour: count}``, replacing ``tokens``) and ``color``/``guard`` on arcs.
+        Arcs whose endpoints do not resolve are ignored.
+        """
+        place_ids = [p['id_in_net'] for p in places]
+        transition_ids = [t['id_in_net'] for t in transitions]
+        place_index = {pid: i for i, pid in enumerate(place_ids)}
+        transition_index = {tid: i for i, tid in enumerate(transition_ids)}
+
+        colors = {DOT: 0}
+
+        def color(name):
+            return colors.setdefault(name, len(colors))
+
+        for place in places:
+            for name in (place.get('colored_tokens') or {}):
+                color(name)
+        for arc in arcs:
+            if arc.get('color') not in ('', None, ANY):
+                color(arc['color'])
+            for name in arc.get('guard') or ():
+                color(name)
+
+        size = len(transition_ids)
+        inputs = [[] for _ in range(size)]
+        inhibitors = [[] for _ in range(size)]
+        resets = [[] for _ in range(size)]
+        outputs = [[] for _ in range(size)]
+        guards = [None] * size
+
+        for arc in arcs:
+            source, target, weight = arc['source_id'], arc['target_id'], arc['weight']
+            name = arc.get('color') or ''
+            if source in place_index and target in transition_index:
+                p, t = place_index[source], transition_index[target]
+                any_colour = ALL if name == '' else VARIABLE if name == ANY else color(name)
+                if arc['is_inhibitor']:
+                    inhibitors[t].append((p, weight, any_colour))
+                if arc['is_reset']:
+                    resets[t].append((p, any_colour))
+                if not arc['is_inhibitor'] and not arc['is_reset']:
+                    inputs[t].append((p, weight, VARIABLE if name == ANY else color(name or DOT)))
+                if arc.get('guard'):
+                    allowed = {colors[g] for g in arc['guard']}
+                    guards[t] = allowed if guards[t] is None else guards[t] & allowed
+            elif source in transition_index and target in place_index:
+                t, p = transition_index[source], place_index[target]
+                outputs[t].append((p, weight, VARIABLE if name == ANY else color(name or DOT)))
+
+        width = len(colors)
+        marking = [0] * (len(places) * width)
+        for i, place in enumerate(places):
+            colored = place.get('colored_tokens')
+            for name, count in (colored.items() if colored else [(DOT, place['tokens'])]):
+                marking[i * width + colors[name]] += count
+
+        return cls(
+            place_ids, transition_ids, sorted(colors, key=colors.get), marking,
+            [p['capacity'] or 0 for p in places],
+            tuple(map(tuple, inputs)), tuple(map(tuple, inhibitors)), tuple(map(tuple, resets)),
+            tuple(map(tuple, outputs)), tuple(None if g is None else tuple(sorted(g)) for g in guards),
+        )
+
+    @property
+    def place_count(self):
+        return len(self.place_ids)
+
+    @property
+    def transition_count(self):
+        return len(self.transition_ids)
+
+    def totals(self, marking):
+        width = len(self.colors)
+        return array('l', (sum(marking[p * width:(p + 1) * width]) for p in range(len(self.place_ids))))
+
+    def _needs(self, t, c):
+        width, needs = len(self.colors), {}
+        for p, w, k in self.inputs[t]:
+            cell = p * width + (c if k == VARIABLE else k)
+            needs[cell] = needs.get(cell, 0) + w
+        return needs
+
+    def candidates(self, marking, t):
+        """Colours worth trying for ``t``: those its ``'*'`` input arcs can supply, within the guard."""
+        guard = self.guards[t]
+        variable = self.variable_inputs[t]
+        if not variable:
+            return guard if guard is not None else (0,)
+        width = len(self.colors)
+        p, w = variable[0]
+        row = p * width
+        return tuple(c for c in (guard if guard is not None else range(width)) if marking[row + c] >= w)
+
+    def is_enabled(self, marking, totals, t, c):
+        width = len(self.colors)
+        needs = self._needs(t, c)
+        for cell, w in needs.items():
+            if marking[cell] < w:
+                return False
+        for p, w, k in self.inhibitors[t]:
+            held = totals[p] if k == ALL else marking[p * width + (c if k == VARIABLE else k)]
+            if held >= w:
+                return False
+        capacity = self.capacity
+        bounded = [(p, w) for p, w, _ in self.outputs[t] if capacity[p]]
+        if bounded:
+            after = {p: totals[p] for p, _ in bounded}
+            for cell, w in needs.items():
+                if cell // width in after:
+                    after[cell // width] -= w
+            for p, k in self.resets[t]:
+                if p in after:
+                    if k == ALL:
+                        after[p] = 0
+                    else:
+                        cell = p * width + (c if k == VARIABLE else k)
+                        after[p] -= marking[cell] - needs.get(cell, 0)
+            for p, w in bounded:
+                after[p] += w
+            for p, value in after.items():
+                if value > capacity[p]:
+                    return False
+        return True
+
+    def bindings(self, marking, totals, t):
+        """Colours ``t`` can fire with in ``marking``."""
+        return [c for c in self.candidates(marking, t) if self.is_enabled(marking, totals, t, c)]
+
+    def fire(self, marking, totals, t, c):
+        """Fire ``t`` with colour ``c`` in place (consume, reset, produce); return the touched places."""
+        width = len(self.colors)
+        for cell, w in self._needs(t, c).items():
+            marking[cell] -= w
+            totals[cell // width] -= w
+        for p, k in self.resets[t]:
+            if k == ALL:
+                for cell in range(p * width, (p + 1) * width):
+                    marking[cell] = 0
+                totals[p] = 0
+            else:
+                cell = p * width + (c if k == VARIABLE else k)
+                totals[p] -= marking[cell]
+                marking[cell] = 0
+        for p, w, k in self.outputs[t]:
+            marking[p * width + (c if k == VARIABLE else k)] += w
+            totals[p] += w
+        return self.touched[t]
+
+    def marking_dict(self, marking):
+        """``{place: {colour: count}}`` without the empty colours."""
+        width = len(self.colors)
+        return {
+            pid: {self.colors[k]: marking[p * width + k] for k in range(width) if marking[p * width + k]}
+            for p, pid in enumerate(self.place_ids)
+        }
+
+
+class ColoredSimulator:
+    """Untimed token game on a :class:`ColoredNet`; ``policy`` as in :class:`Simulator`."""
+
+    timed = False
+
+    def __init__(self, net, marking=None, policy='first', seed=None):
+        if policy not in ('first', 'random'):
+            raise ValueError(f"Unknown policy '{policy}'")
+        self.net = net
+        self.marking = array('l', net.initial_marking if marking is None else marking)
+        self.totals = net.totals(self.marking)
+        self.policy = policy
+        self.rng = random.Random(seed)
+        self.steps = 0
+        # Enabled colours per transition, refreshed only for the dependents of touched places
+        self.bindings = [net.bindings(self.marking, self.totals, t) for t in range(net.transition_count)]
+
+    @property
+    def now(self):
+        return float(self.steps)
+
+    def _choose(self):
+        bindings = self.bindings
+        if self.policy == 'first':
+            for t, colors in enumerate(bindings):
+                if colors:
+                    return t, colors[0]
+            return None
+        total = sum(len(colors) for colors in bindings)
+        if not total:
+            return None
+        pick = self.rng.randrange(total)
+        for t, colors in enumerate(bindings):
+            if pick < len(colors):
+                return t, colors[pick]
+            pick -= len(colors)
+
+    def step(self):
+        """Fire one ``(transition, colour)`` binding and return it, or ``None`` on deadlock."""
+        choice = self._choose()
+        if choice is None:
+            return None
+        t, c = choice
+        net, marking, totals = self.net, self.marking, self.totals
+        seen = set()
+        for p in net.fire(marking, totals, t, c):
+            for u in net.dependents[p]:
+                if u not in seen:
+                    seen.add(u)
+                    self.bindings[u] = net.bindings(marking, totals, u)
+        self.steps += 1
+        return choice
+
+    def run(self, steps, trace=True):
+        net = self.net
+        counts = {}
+        fired = []
+        deadlock = False
+        for _ in range(steps):
+            choice = self.step()
+            if choice is None:
+                deadlock = True
+                break
+            counts[choice] = counts.get(choice, 0) + 1
+            if trace:
+                fired.append(choice)
+        return ColoredResult(net, self.marking, self.steps, deadlock, counts, fired if trace else None)
+
+
+class ColoredResult:
+    def __init__(self, net, marking, steps, deadlock, counts, trace):
+        self.net = net
+        self.marking = array('l', marking)
+        self.steps = steps
+        self.deadlock = deadlock
+        self.counts = counts
+        self.trace = trace
+
+    def as_dict(self):
+        net = self.net
+        firings = {}
+        for (t, c), n in sorted(self.counts.items()):
+            firings.setdefault(net.transition_ids[t], {})[net.colors[c]] = n
+        data = {
+            'mode': 'colored',
+            'steps': self.steps,
+            'deadlock': self.deadlock,
+            'marking': net.marking_dict(self.marking),
+            'firings': firings,
+        }
+        if self.trace is not None:
+            data['transitions'] = list(net.transition_ids)
+            data['colors'] = list(net.colors)
+            data['trace'] = [[t, c] for t, c in self.trace]
+        return data
@@ -0,0 +1,232 @@
+from array import array
+
+
+def _csr(rows, size):
+    """Pack per-transition ``{place: weight}`` dicts into CSR arrays."""
+    ptr = array('l', [0])
+    places = array('l')
+    weights = array('l')
+    for t in range(size):
+        for p, w in sorted(rows[t].items()):
+            places.append(p)
+            weights.append(w)
+        ptr.append(len(places))
+    return ptr, places, weights
+
+
+class CompiledNet:
+    """
+    Array-backed representation of a Petri net, built once per net.
+
+    Places and transitions are addressed by their index in ``place_ids`` /
+    ``transition_ids``. Arcs are folded into sparse CSR incidence arrays:
+
+    * ``pre``: normal input arcs, the transition needs and consumes ``weight`` tokens;
+    * ``inhibitor``: the transition is disabled while the place holds ``weight`` tokens or more;
+    * ``reset``: firing empties the place (no enabling condition);
+    * ``post``: output arcs, firing produces ``weight`` tokens.
+
+    A ``capacity`` of 0 means unbounded, as in the editor. Firing is disabled when
+    it would push a bounded place over its capacity.
+
+    ``timing`` holds the per-transition ``(timed, delay_mean, priority, distribution)``
+    columns used by the timed engine; untimed engines ignore it.
+    """
+
+    def __init__(self, place_ids, transition_ids, initial_marking, capacity,
+                 pre, post, inhibitor, reset, timing=None):
+        self.place_ids = tuple(place_ids)
+        self.transition_ids = tuple(transition_ids)
+        self.initial_marking = array('l', initial_marking)
+        self.capacity = array('l', capacity)
+        size = len(self.transition_ids)
+        if timing is None:
+            timing = ([0] * size, [1.0] * size, [1] * size, ['exponential'] * size)
+        self.timed = bytearray(timing[0])
+        self.delay_mean = array('d', timing[1])
+        self.priority = array('l', timing[2])
+        self.distribution = tuple(timing[3])
+        self.pre_ptr, self.pre_place, self.pre_weight = pre
+        self.post_ptr, self.post_place, self.post_weight = post
+        self.inhibitor_ptr, self.inhibitor_place, self.inhibitor_weight = inhibitor
+        self.reset_ptr, self.reset_place = reset
+        self._build_views()
+
+    @classmethod
+    def from_rows(cls, places, transitions, arcs):
+        """
+        Compile plain rows (dicts, as returned by ``QuerySet.values()``).
+
+        Transition rows only need ``id_in_net``; missing timing columns take the
+        model defaults. Arcs whose endpoints do not resolve to a place and a transition of the
+        net are ignored, like the editor does.
+        """
+        place_ids = [p['id_in_net'] for p in places]
+        transition_ids = [t['id_in_net'] for t in transitions]
+        place_index = {pid: i for i, pid in enumerate(place_ids)}
+        transition_index = {tid: i for i, tid in enumerate(transition_ids)}
+
+        size = len(transition_ids)
+        pre = [{} for _ in range(size)]
+        post = [{} for _ in range(size)]
+        inhibitor = [{} for _ in range(size)]
+        reset = [{} for _ in range(size)]
+
+        for arc in arcs:
+            source, target, weight = arc['source_id'], arc['target_id'], arc['weight']
+            if source in place_index and target in transition_index:
+                p, t = place_index[source], transition_index[target]
+                if arc['is_inhibitor']:
+                    # Several inhibitor arcs on the same place: the tightest one wins
+                    inhibitor[t][p] = min(weight, inhibitor[t].get(p, weight))
+                if arc['is_reset']:
+                    reset[t][p] = 1
+                if not arc['is_inhibitor'] and not arc['is_reset']:
+                    pre[t][p] = pre[t].get(p, 0) + weight
+            elif source in transition_index and target in place_index:
+                t, p = transition_index[source], place_index[target]
+                post[t][p] = post[t].get(p, 0) + weight
+
+        reset_ptr, reset_place, _ = _csr(reset, size)
+        return cls(
+            place_ids,
+            transition_ids,
+            [p['tokens'] for p in places],
+            [p['capacity'] or 0 for p in places],
+            _csr(pre, size),
+            _csr(post, size),
+            _csr(inhibitor, size),
+            (reset_ptr, reset_place),
+            (
+                [t.get('type') == 'timed' for t in transitions],
+                [t.get('delay_mean', 1.0) for t in transitions],
+                [t.get('priority', 1) for t in transitions],
+                [t.get('delay_distribution', 'exponential') for t in transitions],
+            ),
+        )
+
+    def _build_views(self):
+        # Per-transition tuples are what the firing loops iterate over: they are
+        # much cheaper to walk in CPython than slicing the CSR arrays every step.
+        self.place_index = {pid: i for i, pid in enumerate(self.place_ids)}
+        self.transition_index = {tid: i for i, tid in enumerate(self.transition_ids)}
+
+        def rows(ptr, places, weights):
+            return tuple(
+                tuple(zip(places[ptr[t]:ptr[t + 1]], weights[ptr[t]:ptr[t + 1]]))
+                for t in range(len(self.transition_ids))
+            )
+
+        self.pre = rows(self.pre_ptr, self.pre_place, self.pre_weight)
+        self.post = rows(self.post_ptr, self.post_place, self.post_weight)
+        self.inhibitors = rows(self.inhibitor_ptr, self.inhibitor_place, self.inhibitor_weight)
+        self.resets = tuple(
+            tuple(self.reset_place[self.reset_ptr[t]:self.reset_ptr[t + 1]])
+            for t in range(len(self.transition_ids))
+        )
+
+        # Capacity checks only concern bounded places the transition writes to:
+        # (place, consumed, produced, is_reset)
+        checks = []
+        touched = []
+        changed = []
+        dependents = [set() for _ in self.place_ids]
+        for t in range(len(self.transition_ids)):
+            consumed = dict(self.pre[t])
+            produced = dict(self.post[t])
+            reset = set(self.resets[t])
+            checks.append(tuple(
+                (p, consumed.get(p, 0), w, p in reset)
+                for p, w in self.post[t] if self.capacity[p]
+            ))
+            touched.append(tuple(sorted(consumed.keys() | reset | produced.keys())))
+            # Places whose token count can actually move when t fires (self-loops cancel out)
+            changed.append(tuple(sorted(
+                {p for p in consumed.keys() | produced.keys()
+                 if consumed.get(p, 0) != produced.get(p, 0)} | reset
+            )))
+            for p in consumed:
+                dependents[p].add(t)
+            for p, _ in self.inhibitors[t]:
+                dependents[p].add(t)
+            for p, *_ in checks[t]:
+                dependents[p].add(t)
+        self.capacity_checks = tuple(checks)
+        self.touched = tuple(touched)
+        self.changed = tuple(changed)
+        # Place -> transitions whose enabling reads it (input, inhibitor or capacity-bounded output)
+        self.dependents = tuple(tuple(sorted(ts)) for ts in dependents)
+
+    def __getstate__(self):
+        # Only the arrays travel (e.g. to worker processes); views are rebuilt.
+        return {
+            key: value for key, value in self.__dict__.items()
+            if key not in ('place_index', 'transition_index', 'pre', 'post',
+                           'inhibitors', 'resets', 'capacity_checks', 'touched',
+                           'changed', 'dependents')
+        }
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._build_views()
+
+    def with_marking(self, marking):
+        """A copy with another initial marking, sharing the (never mutated) structure and views."""
+        net = object.__new__(CompiledNet)
+        net.__dict__.update(self.__dict__)
+        net.initial_marking = array('l', marking)
+        return net
+
+    def with_capacity(self, capacity):
+        """A copy with other capacities; its capacity checks are rebuilt for the newly bounded places."""
+        net = self.with_marking(self.initial_marking)
+        net.capacity = array('l', capacity)
+        net._build_views()
+        return net
+
+    @property
+    def nbytes(self):
+        """Approximate resident size: the arrays plus the per-node and per-arc cost of the views."""
+        arrays = sum(
+            len(value) * value.itemsize for value in self.__dict__.values() if isinstance(value, array)
+        )
+        arcs = len(self.pre_place) + len(self.post_place) + len(self.inhibitor_place) + len(self.reset_place)
+        return arrays + len(self.timed) + 200 * (len(self.place_ids) + len(self.transition_ids)) + 250 * arcs
+
+    @property
+    def place_count(self):
+        return len(self.place_ids)
+
+    @property
+    def transition_count(self):
+        return len(self.transition_ids)
+
+    def is_enabled(self, marking, t):
+        for p, w in self.pre[t]:
+            if marking[p] < w:
+                return False
+        for p, w in self.inhibitors[t]:
+            if marking[p] >= w:
+                return False
+        capacity = self.capacity
+        for p, consumed, produced, reset in self.capacity_checks[t]:
+            base = 0 if reset else marking[p] - consumed
+            if base + produced > capacity[p]:
+                return False
+        return True
+
+    def enabled(self, marking):
+        return [t for t in range(len(self.transition_ids)) if self.is_enabled(marking, t)]
+
+    def fire(self, marking, t):
+        """Fire ``t`` in place on ``marking`` (consume, reset, produce) and return the touched places."""
+        for p, w in self.pre[t]:
+            marking[p] -= w
+        for p in self.resets[t]:
+            marking[p] = 0
+        for p, w in self.post[t]:
+            marking[p] += w
+        return self.touched[t]
+
+    def marking_dict(self, marking):
+        return dict(zip(self.place_ids, marking))
@@ -0,0 +1,37 @@
+import math
+
+
+DISTRIBUTIONS = ('exponential', 'deterministic', 'uniform', 'erlang', 'lognormal')
+
+
+def make_sampler(distribution, mean, shape=None, spread=None, cv=None):
+    """
+    Return ``sample(rng) -> delay`` for a firing delay of the given mean.
+
+    * ``exponential``: memoryless, the default;
+    * ``deterministic``: always ``mean``;
+    * ``uniform``: on ``[mean - spread, mean + spread]`` (``spread`` defaults to ``mean``);
+    * ``erlang``: sum of ``shape`` exponentials (default 2), less variable than exponential;
+    * ``lognormal``: coefficient of variation ``cv`` (default 0.5), for long-tailed durations.
+    """
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"Unknown delay distribution '{distribution}'")
+    if mean <= 0:
+        return lambda rng: 0.0
+    if distribution == 'exponential':
+        rate = 1.0 / mean
+        return lambda rng: rng.expovariate(rate)
+    if distribution == 'deterministic':
+        return lambda rng: mean
+    if distribution == 'uniform':
+        spread = mean if spread is None else min(spread, mean)
+        low, high = mean - spread, mean + spread
+        return lambda rng: rng.uniform(low, high)
+    if distribution == 'erlang':
+        shape = int(shape or 2)
+        scale = mean / shape
+        return lambda rng: rng.gammavariate(shape, scale)
+    cv = 0.5 if cv is None else cv
+    sigma = math.sqrt(math.log(1 + cv * cv))
+    mu = math.log(mean) - sigma * sigma / 2
+    return lambda rng: rng.lognormvariate(mu, sigma)
@@ -0,0 +1,91 @@
+import heapq
+
+
+class EnabledIndex:
+    """
+    Incrementally maintained set of enabled transitions.
+
+    Instead of rescanning the whole net after each firing, only the transitions
+    that read one of the places the firing changed (``net.changed`` then
+    ``net.dependents``) are re-evaluated, so a step costs what the change
+    touches, not the size of the net.
+
+    ``rank`` orders transitions for :meth:`first` (lowest rank first, default:
+    transition index); :meth:`choice` samples uniformly among enabled ones.
+    """
+
+    def __init__(self, net, marking, rank=None):
+        self.net = net
+        self.marking = marking
+        size = net.transition_count
+        self.rank = list(range(size)) if rank is None else list(rank)
+        self._by_rank = {r: t for t, r in enumerate(self.rank)}
+        self.flags = bytearray(size)
+        self.members = []
+        self._position = [-1] * size
+        self._heap = []
+        self._queued = bytearray(size)
+        self._stamp = [0] * size
+        self._clock = 0
+        self.refresh()
+
+    def __len__(self):
+        return len(self.members)
+
+    def __contains__(self, t):
+        return bool(self.flags[t])
+
+    def refresh(self):
+        """Re-evaluate every transition, e.g. after the marking was changed externally."""
+        for t in range(self.net.transition_count):
+            self._set(t, self.net.is_enabled(self.marking, t))
+
+    def _set(self, t, enabled):
+        if enabled:
+            if not self.flags[t]:
+                self.flags[t] = 1
+                self._position[t] = len(self.members)
+                self.members.append(t)
+                if not self._queued[t]:
+                    self._queued[t] = 1
+                    heapq.heappush(self._heap, self.rank[t])
+        elif self.flags[t]:
+            self.flags[t] = 0
+            # Swap-remove keeps ``members`` dense for O(1) sampling
+            i = self._position[t]
+            last = self.members.pop()
+            if last != t:
+                self.members[i] = last
+                self._position[last] = i
+            self._position[t] = -1
+
+    def update(self, places):
+        """Re-evaluate the transitions that depend on any of ``places``."""
+        self._clock += 1
+        clock, stamp = self._clock, self._stamp
+        net, marking = self.net, self.marking
+        for p in places:
+            for t in net.dependents[p]:
+                if stamp[t] != clock:
+                    stamp[t] = clock
+                    self._set(t, net.is_enabled(marking, t))
+
+    def fire(self, t):
+        self.net.fire(self.marking, t)
+        changed = self.net.changed[t]
+        self.update(changed)
+        return changed
+
+    def first(self):
+        """Enabled transition with the lowest rank, or ``None``."""
+        heap, flags, by_rank = self._heap, self.flags, self._by_rank
+        while heap:
+            t = by_rank[heap[0]]
+            if flags[t]:
+                return t
+            heapq.heappop(heap)
+            self._queued[t] = 0
+        return None
+
+    def choice(self, rng):
+        return rng.choice(self.members) if self.members else None
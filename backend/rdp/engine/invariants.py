@@ -0,0 +1,132 @@
+from math import gcd
+
+
+class InvariantExplosion(Exception):
+    """Raised when Farkas elimination produces more than ``max_rows`` intermediate rows."""
+
+
+def _normalise(values):
+    divisor = 0
+    for v in values:
+        divisor = gcd(divisor, v)
+    return [v // divisor for v in values] if divisor > 1 else values
+
+
+def farkas(matrix, max_rows=10_000):
+    """
+    Minimal-support semi-positive integer solutions ``y >= 0`` of ``y . matrix = 0``.
+
+    ``matrix`` is a list of integer rows (one per unknown). Rows of ``[matrix | I]``
+    are combined column by column so that each column is cancelled with
+    non-negative multipliers (Farkas / Martinez-Silva algorithm); rows with a
+    non-minimal support are pruned as soon as they appear. Integer arithmetic
+    throughout, rows are divided by their gcd.
+    """
+    size = len(matrix)
+    columns = len(matrix[0]) if matrix else 0
+    # (residual row, multipliers, support bitmask)
+    rows = [(list(row), [int(i == j) for j in range(size)], 1 << i) for i, row in enumerate(matrix)]
+    for column in range(columns):
+        kept = [row for row in rows if row[0][column] == 0]
+        positive = [row for row in rows if row[0][column] > 0]
+        negative = [row for row in rows if row[0][column] < 0]
+        for a_res, a_mul, a_sup in positive:
+            for b_res, b_mul, b_sup in negative:
+                fa, fb = -b_res[column], a_res[column]
+                combined = _normalise(
+                    [fa * x + fb * y for x, y in zip(a_res + a_mul, b_res + b_mul)]
+                )
+                kept.append((combined[:columns], combined[columns:], a_sup | b_sup))
+                if len(kept) > max_rows:
+                    raise InvariantExplosion(f"more than {max_rows} intermediate rows")
+        rows = _minimal(kept)
+    return [multipliers for _, multipliers, _ in rows]
+
+
+def _minimal(rows):
+    """Drop rows whose support strictly contains another row's support, and duplicates."""
+    rows = sorted(rows, key=lambda row: bin(row[2]).count('1'))
+    kept = []
+    for row in rows:
+        support = row[2]
+        if any(other[2] & support == other[2] for other in kept):
+            continue
+        kept.append(row)
+    return kept
+
+
+def incidence_matrix(net):
+    """``C[p][t]`` = tokens produced minus consumed in ``p`` by ``t`` (inhibitors and resets excluded)."""
+    matrix = [[0] * net.transition_count for _ in range(net.place_count)]
+    for t in range(net.transition_count):
+        for p, w in net.pre[t]:
+            matrix[p][t] -= w
+        for p, w in net.post[t]:
+            matrix[p][t] += w
+    return matrix
+
+
+def structural_analysis(net, max_rows=10_000):
+    """
+    Structure-only answers from the incidence matrix, without exploring states.
+
+    * P-invariants ``y`` (``y . C = 0``): the weighted token count ``y . M`` is
+      constant, so every place in a support is bounded by ``y . M0 / y[p]``.
+    * T-invariants ``x`` (``C . x = 0``): firing counts that reproduce a marking.
+
+    Reset arcs break conservation, so invariants through a reset place (or
+    transition) are discarded. ``complete`` is false if the elimination hit
+    ``max_rows`` and the lists below are then empty.
+    """
+    matrix = incidence_matrix(net)
+    reset_places = {p for t in range(net.transition_count) for p in net.resets[t]}
+    reset_transitions = {t for t in range(net.transition_count) if net.resets[t]}
+
+    complete = True
+    try:
+        p_invariants = [
+            y for y in farkas(matrix, max_rows)
+            if not any(y[p] for p in reset_places)
+        ]
+    except InvariantExplosion:
+        p_invariants, complete = [], False
+    try:
+        transposed = [list(column) for column in zip(*matrix)] if matrix else [[] for _ in range(net.transition_count)]
+        t_invariants = [
+            x for x in farkas(transposed, max_rows)
+            if not any(x[t] for t in reset_transitions)
+        ]
+    except InvariantExplosion:
+        t_invariants, complete = [], False
+
+    bounds = [net.capacity[p] or None for p in range(net.place_count)]
+    for y in p_invariants:
+        weighted = sum(c * m for c, m in zip(y, net.initial_marking))
+        for p, c in enumerate(y):
+            if c:
+                bound = weighted // c
+                if bounds[p] is None or bound < bounds[p]:
+                    bounds[p] = bound
+
+    covered = {p for y in p_invariants for p, c in enumerate(y) if c}
+    repetitive = {t for x in t_invariants for t, c in enumerate(x) if c}
+    return {
+        'complete': complete,
+        'p_invariants': [
+            {
+                'weights': {net.place_ids[p]: c for p, c in enumerate(y) if c},
+                'tokens': sum(c * m for c, m in zip(y, net.initial_marking)),
+            }
+            for y in p_invariants
+        ],
+        't_invariants': [
+            {net.transition_ids[t]: c for t, c in enumerate(x) if c} for x in t_invariants
+        ],
+        'bounded': all(b is not None for b in bounds),
+        'conservative': len(covered) == net.place_count,
+        'consistent': len(repetitive) == net.transition_count,
+        'places': {
+            pid: {'bound': bounds[p], 'covered': p in covered}
+            for p, pid in enumerate(net.place_ids)
+        },
+    }
@@ -0,0 +1,234 @@
+from collections import deque
+
+from .stats import MarkingStatistics
+
+
+QUANTILES = (0.5, 0.9, 0.95)
+
+
+class P2Quantile:
+    """
+    Streaming quantile estimate in O(1) memory (Jain & Chlamtac's P² algorithm): five markers
+    whose heights are nudged with a piecewise-parabolic fit as observations arrive.
+    """
+
+    def __init__(self, p):
+        self.p = p
+        self.count = 0
+        self.heights = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self.increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def add(self, x, count=1):
+        """Add ``count`` observations equal to ``x`` in O(1)."""
+        q = self.heights
+        while count and self.count < 5:
+            self.count += 1
+            count -= 1
+            q.append(x)
+            q.sort()
+        if not count:
+            return
+        self.count += count
+
+        n = self.positions
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+        for i in range(k + 1, 5):
+            n[i] += count
+        for i in range(5):
+            self.desired[i] += count * self.increments[i]
+
+        for i in (1, 2, 3):
+            # Move towards the desired position by as many whole steps as the neighbours leave room for
+            # (one step per observation in the original algorithm)
+            d = self.desired[i] - n[i]
+            if d >= 1:
+                d = min(int(d), n[i + 1] - n[i] - 1)
+            elif d <= -1:
+                d = max(int(d), n[i - 1] - n[i] + 1)
+            else:
+                continue
+            if not d:
+                continue
+            parabolic = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+            )
+            if q[i - 1] < parabolic < q[i + 1]:
+                q[i] = parabolic
+            else:
+                j = i + 1 if d > 0 else i - 1
+                q[i] += d * (q[j] - q[i]) / (n[j] - n[i])
+            n[i] += d
+
+    def value(self):
+        if not self.count:
+            return None
+        if self.count <= 5:
+            return self.heights[min(len(self.heights) - 1, int(self.p * len(self.heights)))]
+        return self.heights[2]
+
+
+class LevelHistogram:
+    """
+    Time spent at each token level: exact below ``EXACT``, power-of-two buckets above,
+    so memory stays bounded however large a queue grows.
+    """
+
+    EXACT = 256
+
+    def __init__(self):
+        self.time = {}
+        self.total = 0.0
+
+    def add(self, level, duration):
+        if duration <= 0:
+            return
+        exact = self.EXACT
+        key = level if level < exact else exact + level.bit_length() - exact.bit_length()
+        self.time[key] = self.time.get(key, 0.0) + duration
+        self.total += duration
+
+    def _level(self, key):
+        exact = self.EXACT
+        return key if key < exact else 1 << (key - exact + exact.bit_length() - 1)
+
+    def quantile(self, p):
+        """Smallest level (bucket lower bound above ``EXACT``) held at least a ``p`` fraction of the time."""
+        if not self.total:
+            return None
+        threshold, cumulative = p * self.total, 0.0
+        for key in sorted(self.time):
+            cumulative += self.time[key]
+            if cumulative >= threshold:
+                return self._level(key)
+        return self._level(max(self.time))
+
+
+class KPICollector(MarkingStatistics):
+    """
+    One-pass KPIs of a run, on top of :class:`MarkingStatistics`:
+
+    * per place: time-weighted mean and level percentiles, occupancy of resource places
+      (those holding tokens initially), arrival rate, Little's law waiting time, and the
+      sojourn time of tokens assuming FIFO service, with P² percentiles;
+    * per transition: firing count and throughput.
+
+    Sojourn times keep one ``[first_arrival, last_arrival, tokens]`` batch per group of
+    tokens still present, not one entry per token ever seen. Past ``max_batches`` groups
+    in a place (a queue that keeps growing), neighbouring batches are merged and their
+    tokens taken as spread evenly between the first and last arrival, so memory stays
+    constant and sojourn times lose resolution instead. Untimed runs use the step count as clock.
+    """
+
+    def __init__(self, max_batches=4096):
+        if max_batches < 2:
+            raise ValueError('max_batches must be >= 2')
+        self.max_batches = max_batches
+
+    def start(self, sim):
+        super().start(sim)
+        net = sim.net
+        self.initial = list(sim.marking)
+        self.histograms = [LevelHistogram() for _ in range(net.place_count)]
+        self.batches = [deque([[sim.now, sim.now, tokens]]) if tokens else deque() for tokens in sim.marking]
+        self.sojourn_count = [0] * net.place_count
+        self.sojourn_total = [0.0] * net.place_count
+        self.sojourn_sketches = [[P2Quantile(q) for q in QUANTILES] for _ in range(net.place_count)]
+        self.firings = [0] * net.transition_count
+
+    def _leave(self, p, tokens, now):
+        batches, sketches = self.batches[p], self.sojourn_sketches[p]
+        while tokens and batches:
+            first, last, held = batch = batches[0]
+            taken = min(tokens, held)
+            # The oldest ``taken`` of the batch, at the middle of their share of its span
+            spread = (last - first) * taken / held
+            waited = now - first - spread / 2
+            for sketch in sketches:
+                sketch.add(waited, taken)
+            self.sojourn_count[p] += taken
+            self.sojourn_total[p] += waited * taken
+            tokens -= taken
+            if taken == held:
+                batches.popleft()
+            else:
+                batch[0], batch[2] = first + spread, held - taken
+
+    def _arrive(self, p, tokens, now):
+        batches = self.batches[p]
+        if batches and batches[-1][0] == now:
+            batches[-1][2] += tokens
+            return
+        batches.append([now, now, tokens])
+        if len(batches) > self.max_batches:
+            # Halve the resolution: pairs of neighbouring batches merge into one spanning both
+            merged = deque()
+            while batches:
+                first = batches.popleft()
+                if batches:
+                    second = batches.popleft()
+                    first = [first[0], second[1], first[2] + second[2]]
+                merged.append(first)
+            self.batches[p] = merged
+
+    def on_fire(self, sim, t, changed):
+        now, net = sim.now, self.net
+        current, last, histograms = self.current, self.last, self.histograms
+        for p in changed:
+            histograms[p].add(current[p], now - last[p])
+        # Tokens present before the firing: consume, then reset, then produce (engine order)
+        for p, w in net.pre[t]:
+            self._leave(p, w, now)
+        for p in net.resets[t]:
+            self._leave(p, current[p], now)
+        for p, w in net.post[t]:
+            self._arrive(p, w, now)
+        self.firings[t] += 1
+        super().on_fire(sim, t, changed)
+
+    def on_schedule(self, sim, changed):
+        now, current, marking = sim.now, self.current, sim.marking
+        for p in changed:
+            self.histograms[p].add(current[p], now - self.last[p])
+            delta = marking[p] - current[p]
+            if delta < 0:
+                self._leave(p, -delta, now)
+            elif delta:
+                self._arrive(p, delta, now)
+        super().on_schedule(sim, changed)
+
+    def finish(self, sim):
+        for p in range(self.net.place_count):
+            self.histograms[p].add(self.current[p], sim.now - self.last[p])
+        super().finish(sim)
+
+    def as_dict(self):
+        duration = self.end_time - self.start_time
+        places = super().as_dict()
+        for p, pid in enumerate(self.net.place_ids):
+            kpi = places[pid]
+            histogram, count = self.histograms[p], self.sojourn_count[p]
+            kpi['percentiles'] = {f'p{round(q * 100)}': histogram.quantile(q) for q in QUANTILES}
+            if self.initial[p]:
+                kpi['occupancy'] = max(0.0, 1 - kpi['mean'] / self.initial[p])
+            kpi['sojourn'] = {
+                'count': count,
+                'mean': self.sojourn_total[p] / count if count else None,
+                **{f'p{round(q * 100)}': s.value() for q, s in zip(QUANTILES, self.sojourn_sketches[p])},
+            }
+        transitions = {
+            tid: {'count': n, 'throughput': n / duration if duration > 0 else 0.0}
+            for tid, n in zip(self.net.transition_ids, self.firings)
+        }
+        return {'duration': duration, 'places': places, 'transitions': transitions}
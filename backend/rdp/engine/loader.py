@@ -0,0 +1,76 @@
+from array import array
+
+from django.conf import settings
+
+from rdp.models import Place, Transition, Arc, Schedule, WarmState
+from .cache import CompiledNetCache
+from .colored import ColoredNet
+from .compiler import CompiledNet
+from .schedule import CompiledSchedule
+
+
+PLACE_FIELDS = ('id_in_net', 'tokens', 'capacity')
+TRANSITION_FIELDS = ('id_in_net', 'type', 'delay_mean', 'priority', 'delay_distribution')
+ARC_FIELDS = ('source_id', 'target_id', 'weight', 'is_inhibitor', 'is_reset')
+COLORED_PLACE_FIELDS = PLACE_FIELDS + ('colored_tokens',)
+COLORED_ARC_FIELDS = ARC_FIELDS + ('color', 'guard')
+
+_options = getattr(settings, 'RDP_COMPILED_NET_CACHE', {})
+compiled_nets = CompiledNetCache(
+    max_bytes=_options.get('MAX_BYTES', 256 * 1024 * 1024),
+    directory=_options.get('DIRECTORY'),
+)
+
+
+def compile_net(petri_net):
+    """Load the rows of ``petri_net`` with one query per table and compile them."""
+    places = Place.objects.filter(petri_net=petri_net).order_by('id_in_net').values(*PLACE_FIELDS)
+    transitions = Transition.objects.filter(petri_net=petri_net).order_by('id_in_net').values(*TRANSITION_FIELDS)
+    arcs = Arc.objects.filter(petri_net=petri_net).values(*ARC_FIELDS)
+    return CompiledNet.from_rows(list(places), list(transitions), list(arcs))
+
+
+def load_compiled_net(petri_net):
+    """
+    ``compile_net`` through the process-wide cache, keyed by ``structure_version``: a hit costs
+    nothing when ``petri_net.version`` is the one cached, and a single tokens query otherwise.
+    """
+    key = (petri_net.pk, f'{petri_net.created_at.timestamp():.6f}', petri_net.structure_version)
+    cached = compiled_nets.get(key)
+    if cached is not None:
+        version, net = cached
+        if version == petri_net.version:
+            return net
+        tokens = Place.objects.filter(petri_net=petri_net).order_by('id_in_net').values_list('tokens', flat=True)
+        marking = array('l', tokens)
+        if len(marking) == net.place_count:
+            net = net.with_marking(marking)
+            compiled_nets.put(key, (petri_net.version, net), persist=False)
+            return net
+
+    net = compile_net(petri_net)
+    compiled_nets.put(key, (petri_net.version, net))
+    return net
+
+
+def load_colored_net(petri_net):
+    """Compile ``petri_net`` as a :class:`ColoredNet` (not cached: coloured runs are the exception)."""
+    places = Place.objects.filter(petri_net=petri_net).order_by('id_in_net').values(*COLORED_PLACE_FIELDS)
+    transitions = Transition.objects.filter(petri_net=petri_net).order_by('id_in_net').values(*TRANSITION_FIELDS)
+    arcs = Arc.objects.filter(petri_net=petri_net).values(*COLORED_ARC_FIELDS)
+    return ColoredNet.from_rows(list(places), list(transitions), list(arcs))
+
+
+def load_schedule(petri_net, schedule_id, net):
+    """Compile schedule ``schedule_id`` of ``petri_net`` against ``net``; ``None`` when no id is given."""
+    if schedule_id is None:
+        return None
+    schedule = Schedule.objects.get(pk=schedule_id, petri_net=petri_net)
+    return CompiledSchedule(net, schedule.entries)
+
+
+def load_warm_state(petri_net, warm_state_id):
+    """Snapshot of warm state ``warm_state_id`` of ``petri_net``; ``None`` when no id is given."""
+    if warm_state_id is None:
+        return None
+    return WarmState.objects.only('state').get(pk=warm_state_id, petri_net=petri_net).state
@@ -0,0 +1,253 @@
+import itertools
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .replications import replication_seeds, run_replication
+from .stats import confidence_interval
+from .timed import TimedSimulator
+
+
+TARGET_METRICS = {
+    'place': ('marking', 'waiting_time', 'occupancy'),
+    'transition': ('throughput',),
+}
+
+# Shipped once per worker process, like ``replications._worker_net``
+_worker_net = None
+_worker_options = None
+_worker_targets = None
+
+
+def _init_worker(net, options, targets):
+    global _worker_net, _worker_options, _worker_targets
+    _worker_net, _worker_options, _worker_targets = net, options, targets
+
+
+def compile_targets(net, targets):
+    """``[{'place': id, 'metric': ..., 'max': x}, ...]`` as ``(kind, index, metric, min, max)`` tuples."""
+    compiled = []
+    for target in targets:
+        kind = 'place' if 'place' in target else 'transition'
+        ids = net.place_index if kind == 'place' else net.transition_index
+        node = target.get(kind)
+        if node not in ids:
+            raise ValueError(f"Unknown {kind} '{node}' in targets")
+        metric = target.get('metric', 'waiting_time' if kind == 'place' else 'throughput')
+        if metric not in TARGET_METRICS[kind]:
+            raise ValueError(f"Unknown {kind} metric '{metric}'")
+        low, high = target.get('min'), target.get('max')
+        if low is None and high is None:
+            raise ValueError(f"Target on '{node}' needs a min or a max")
+        compiled.append((kind, ids[node], metric, low, high))
+    return tuple(compiled)
+
+
+def evaluate(net, marking, seed, options, targets):
+    """One replication of ``net`` started from ``marking``, reduced to one value per target."""
+    run = run_replication(net.with_marking(marking), seed, **options)
+    values = []
+    for kind, i, metric, _, _ in targets:
+        if kind == 'transition':
+            values.append(run['throughput'][i])
+        elif metric == 'marking':
+            values.append(run['means'][i])
+        elif metric == 'waiting_time':
+            values.append(run['waits'][i])
+        else:
+            values.append(1 - run['means'][i] / marking[i] if marking[i] else None)
+    return values
+
+
+def _evaluate_in_worker(task):
+    marking, seed = task
+    return evaluate(_worker_net, marking, seed, _worker_options, _worker_targets)
+
+
+class Candidate:
+    def __init__(self, levels, marking, cost):
+        self.levels = levels
+        self.marking = marking
+        self.cost = cost
+        self.samples = []   # one list of target values per replication
+        self.status = 'uncertain'
+        self.dropped = None  # round at which it was discarded
+
+    def intervals(self, targets, confidence):
+        return [
+            confidence_interval([sample[k] for sample in self.samples], confidence)
+            for k in range(len(targets))
+        ]
+
+    def classify(self, targets, confidence):
+        """``infeasible``/``feasible`` once every interval is on one side of its bound, ``uncertain`` otherwise."""
+        self.estimates = self.intervals(targets, confidence)
+        self.violation = 0.0
+        settled = True
+        for (_, _, _, low, high), estimate in zip(targets, self.estimates):
+            mean = estimate['mean']
+            if mean is None:
+                settled = False
+                continue
+            bound_low = estimate['low'] if estimate['low'] is not None else mean
+            bound_high = estimate['high'] if estimate['high'] is not None else mean
+            if high is not None:
+                self.violation += max(0.0, mean - high) / (abs(high) or 1.0)
+                if estimate['n'] > 1 and bound_low > high:
+                    self.status = 'infeasible'
+                    return
+                settled = settled and estimate['n'] > 1 and bound_high <= high
+            if low is not None:
+                self.violation += max(0.0, low - mean) / (abs(low) or 1.0)
+                if estimate['n'] > 1 and bound_high < low:
+                    self.status = 'infeasible'
+                    return
+                settled = settled and estimate['n'] > 1 and bound_low >= low
+        self.status = 'feasible' if settled else 'uncertain'
+
+    def dominated_by(self, other):
+        return all(a <= b for a, b in zip(self.levels, other.levels))
+
+    def as_dict(self, resources):
+        return {
+            'marking': dict(zip(resources, self.levels)),
+            'cost': self.cost,
+            'status': self.status,
+            'replications': len(self.samples),
+            'violation': getattr(self, 'violation', None),
+            'targets': getattr(self, 'estimates', None),
+            'dropped_at_round': self.dropped,
+        }
+
+
+def optimize(net, resources, targets, until, costs=None, min_replications=4, max_replications=64, eta=2,
+             seed=None, max_events=None, delays=None, server='single', schedule=None, workers=None,
+             confidence=0.95, monotone=False, max_candidates=10_000, warmup=0.0):
+    """
+    Cheapest initial marking of the ``resources`` places (``{place: [levels...]}``) whose timed
+    replications meet every target, by successive halving over the grid of levels.
+
+    Every round runs the surviving candidates up to the round's replication count (``min_replications``,
+    then ``eta`` times more each round, up to ``max_replications``) and then drops:
+
+    * candidates whose confidence interval is on the wrong side of a target; with ``monotone``
+      (more resources never hurt, which ``min`` targets such as occupancy usually break) every
+      candidate below them on all resources goes too;
+    * candidates costlier than the cheapest one already proven feasible;
+    * all but the best ``1 / eta`` of the uncertain ones, ranked by (misses a target on average, cost);
+      proven-feasible candidates are never halved away.
+
+    All candidates share the same replication seeds (common random numbers), so they are
+    compared on the same arrival streams. ``costs`` weights each resource (default 1 per token);
+    the first ``warmup`` time units of every replication are left out of the targets.
+    """
+    if not resources:
+        raise ValueError('At least one resource place is required')
+    if eta < 2:
+        raise ValueError('eta must be >= 2')
+    if min_replications < 2 or max_replications < min_replications:
+        raise ValueError('Need 2 <= min_replications <= max_replications')
+    costs = costs or {}
+    names = list(resources)
+    for name in names:
+        if name not in net.place_index:
+            raise ValueError(f"Unknown resource place '{name}'")
+    grids = [sorted(set(resources[name])) for name in names]
+    if any(not grid or grid[0] < 0 for grid in grids):
+        raise ValueError('Resource levels must be non-empty lists of non-negative integers')
+    size = math.prod(len(grid) for grid in grids)
+    if size > max_candidates:
+        raise ValueError(f"{size} candidate configurations, more than max_candidates={max_candidates}")
+    if warmup and warmup >= until:
+        raise ValueError('warmup must be shorter than until')
+    compiled = compile_targets(net, targets)
+    options = {'until': until, 'max_events': max_events, 'delays': delays, 'server': server, 'schedule': schedule,
+               'warmup': warmup}
+    TimedSimulator(net, delays=delays, server=server, schedule=schedule)  # fail fast on bad options
+
+    places = [net.place_index[name] for name in names]
+    candidates = []
+    for levels in itertools.product(*grids):
+        marking = list(net.initial_marking)
+        for p, level in zip(places, levels):
+            marking[p] = level
+        cost = sum(costs.get(name, 1) * level for name, level in zip(names, levels))
+        candidates.append(Candidate(levels, marking, cost))
+
+    seeds = replication_seeds(seed, max_replications)
+    workers = min(workers or os.cpu_count() or 1, size * min_replications)
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(net, options, compiled))
+
+    survivors = list(candidates)
+    rounds = []
+    runs = 0
+    replications = min_replications
+    try:
+        for number in itertools.count(1):
+            tasks = [
+                (c, seeds[i]) for c in survivors for i in range(len(c.samples), replications)
+            ]
+            if pool is None:
+                results = [evaluate(net, c.marking, s, options, compiled) for c, s in tasks]
+            else:
+                chunksize = max(1, len(tasks) // (workers * 4))
+                results = pool.map(_evaluate_in_worker, [(c.marking, s) for c, s in tasks], chunksize=chunksize)
+            for (c, _), values in zip(tasks, results):
+                c.samples.append(values)
+            runs += len(tasks)
+
+            for c in survivors:
+                c.classify(compiled, confidence)
+            infeasible = [c for c in survivors if c.status == 'infeasible']
+            kept = []
+            for c in survivors:
+                if c.status == 'infeasible' or (monotone and any(c.dominated_by(bad) for bad in infeasible)):
+                    c.status = 'infeasible'
+                    c.dropped = number
+                else:
+                    kept.append(c)
+            feasible_costs = [c.cost for c in kept if c.status == 'feasible']
+            if feasible_costs:
+                cheapest = min(feasible_costs)
+                for c in kept:
+                    if c.cost > cheapest:
+                        c.dropped = number
+                kept = [c for c in kept if c.cost <= cheapest]
+            # Never halve away a proven-feasible candidate: it is the current answer
+            feasible = [c for c in kept if c.status == 'feasible']
+            uncertain = sorted((c for c in kept if c.status != 'feasible'),
+                               key=lambda c: (c.violation > 0, c.cost, c.violation))
+
+            last = replications >= max_replications
+            if not last and len(uncertain) > 1:
+                keep = max(1, math.ceil(len(uncertain) / eta))
+                for c in uncertain[keep:]:
+                    c.dropped = number
+                uncertain = uncertain[:keep]
+            kept = sorted(feasible + uncertain, key=lambda c: (c.violation > 0, c.cost, c.violation))
+            rounds.append({'round': number, 'replications': replications, 'evaluated': len(survivors),
+                           'kept': len(kept)})
+            survivors = kept
+            if last or len(survivors) <= 1 and all(c.status != 'uncertain' for c in survivors):
+                break
+            replications = min(max_replications, replications * eta)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    feasible = sorted((c for c in survivors if c.status == 'feasible'), key=lambda c: (c.cost, c.violation))
+    best = feasible[0] if feasible else (survivors[0] if survivors else None)
+    ranked = sorted((c for c in candidates if c.samples), key=lambda c: (
+        c.status == 'infeasible', c.violation > 0, c.cost, c.violation
+    ))
+    return {
+        'best': best.as_dict(names) if best is not None else None,
+        'proven': bool(feasible),
+        'candidates': size,
+        'runs': runs,
+        'grid_runs': size * max_replications,
+        'rounds': rounds,
+        'ranking': [c.as_dict(names) for c in ranked[:20]],
+    }
@@ -0,0 +1,342 @@
+import sys
+from array import array
+from collections import deque
+
+from .stubborn import StubbornSets
+
+
+# Stands for "arbitrarily many tokens" in coverability markings. Large enough
+# for every enabling test (inputs pass, inhibitors block) to do the right thing.
+OMEGA = 1 << 62
+
+# Rough per-state and per-edge bookkeeping cost, for the memory budget
+STATE_OVERHEAD = 120
+EDGE_OVERHEAD = 24
+
+
+def _pack(marking):
+    return array('q', marking).tobytes()
+
+
+def _unpack(key):
+    return array('q', key)
+
+
+class StateSpace:
+    """
+    Breadth-first reachability / Karp-Miller coverability graph of a :class:`CompiledNet`.
+
+    Markings are stored once, packed to ``bytes``, in a dict (visited set) that
+    maps them to node ids; parents and firing transitions live in flat arrays
+    so deadlock witnesses can be rebuilt. When a new marking strictly covers
+    one of its ancestors, the growing places are accelerated to ``OMEGA``
+    (places with a capacity are never accelerated, they are bounded anyway).
+
+    Acceleration is only sound for plain arcs: more tokens in a place read by an
+    inhibitor or reset arc may disable the repeated sequence, or be wiped out by it.
+    Such places are never accelerated, and an ancestor only counts as covered when
+    they hold exactly the same tokens; when they grow forever the exploration is
+    truncated instead. Every node keeps the range of those places on its path and a
+    pointer to its nearest ancestor holding the same tokens there, so the ancestor
+    walk only visits candidates.
+
+    Exploration stops when ``max_states`` markings are known or the estimated
+    memory use passes ``max_memory`` bytes; results are then partial.
+
+    With ``reduction='stubborn'`` only a stubborn subset of the enabled
+    transitions is expanded in each marking. Deadlocks (and OMEGA witnesses of
+    unboundedness) are preserved, but bounds are only lower bounds and
+    liveness is not preserved.
+    """
+
+    def __init__(self, net, marking=None, max_states=100_000, max_memory=None, reduction=None):
+        if reduction not in (None, 'stubborn'):
+            raise ValueError(f"Unknown reduction '{reduction}'")
+        self.net = net
+        self.reduction = reduction
+        self.stubborn = StubbornSets(net) if reduction == 'stubborn' else None
+        self.initial = array('q', net.initial_marking if marking is None else marking)
+        guarded = {p for t in range(net.transition_count) for p, _ in net.inhibitors[t]}
+        guarded.update(p for t in range(net.transition_count) for p in net.resets[t])
+        self.guarded = tuple(sorted(guarded))
+        self.max_states = max_states
+        self.max_memory = max_memory
+        self.index = {}
+        self.keys = []
+        self.parent = array('l')
+        self.via = array('l')
+        self.totals = []
+        self.floor = []
+        # Per node: tokens in the guarded places, their (low, high) range on the path from
+        # the root, the nearest proper ancestor with the same tokens there and the first
+        # node of its run of equal guarded tokens
+        self.guards = []
+        self.ranges = []
+        self.same = array('l')
+        self.run = array('l')
+        self.edges = array('l')
+        self.deadlocks = []
+        self.fired = bytearray(net.transition_count)
+        self.max_enabled = 0
+        self.memory = 0
+        self.complete = False
+        self.truncated = None
+
+    def _guard(self, marking):
+        return tuple(marking[p] for p in self.guarded)
+
+    def _ancestor(self, node, guard):
+        """Nearest ancestor-or-self of ``node`` with the same guarded tokens, or -1."""
+        low, high = self.ranges[node]
+        if any(g < a or g > b for g, a, b in zip(guard, low, high)):
+            # Out of the range seen on the path (e.g. an inhibitor-read place growing forever)
+            return -1
+        guards, parent, run = self.guards, self.parent, self.run
+        while node != -1 and guards[node] != guard:
+            node = parent[run[node]]
+        return node
+
+    def _add(self, key, parent, via, total, guard=()):
+        node = len(self.keys)
+        self.index[key] = node
+        self.keys.append(key)
+        self.parent.append(parent)
+        self.via.append(via)
+        self.totals.append(total)
+        # Smallest token count on the path from the root, to skip hopeless ancestor walks
+        self.floor.append(total if parent == -1 else min(total, self.floor[parent]))
+        self.guards.append(guard)
+        if parent == -1:
+            self.ranges.append((guard, guard))
+            self.same.append(-1)
+            self.run.append(node)
+        else:
+            self.same.append(self._ancestor(parent, guard))
+            low, high = self.ranges[parent]
+            if self.guarded:
+                low = tuple(map(min, low, guard))
+                high = tuple(map(max, high, guard))
+            self.ranges.append((low, high))
+            self.run.append(self.run[parent] if self.guards[parent] == guard else node)
+        self.memory += sys.getsizeof(key) + STATE_OVERHEAD
+        return node
+
+    def _accelerate(self, marking, node):
+        """Karp-Miller: set to OMEGA the places that grew since a covered ancestor."""
+        total = sum(marking)
+        if total <= self.floor[node]:
+            return marking
+        capacity, keys, same, totals = self.net.capacity, self.keys, self.same, self.totals
+        node = self._ancestor(node, self._guard(marking))
+        while node != -1:
+            # A strictly covered ancestor has a strictly smaller token count
+            if totals[node] < total:
+                ancestor = _unpack(keys[node])
+                if all(a <= m for a, m in zip(ancestor, marking)):
+                    for p, (a, m) in enumerate(zip(ancestor, marking)):
+                        if m > a and not capacity[p]:
+                            marking[p] = OMEGA
+            node = same[node]
+        return marking
+
+    def successors(self, marking, transitions):
+        """``(t, successor)`` pairs for enabled ``transitions``; ``OMEGA`` places stay ``OMEGA``."""
+        net = self.net
+        for t in transitions:
+            successor = array('q', marking)
+            for p, w in net.pre[t]:
+                if successor[p] != OMEGA:
+                    successor[p] -= w
+            for p in net.resets[t]:
+                successor[p] = 0
+            for p, w in net.post[t]:
+                if successor[p] != OMEGA:
+                    successor[p] += w
+            yield t, successor
+
+    def explore(self):
+        initial = self.initial
+        self._add(_pack(initial), -1, -1, sum(initial), self._guard(initial))
+        frontier = deque([0])
+        while frontier:
+            if len(self.keys) >= self.max_states:
+                self.truncated = 'max_states'
+                return self
+            if self.max_memory is not None and self.memory >= self.max_memory:
+                self.truncated = 'max_memory'
+                return self
+            node = frontier.popleft()
+            marking = _unpack(self.keys[node])
+            enabled = self.net.enabled(marking)
+            if self.stubborn is not None:
+                expanded = self.stubborn.select(marking, enabled)
+            else:
+                expanded = enabled
+            for t, successor in self.successors(marking, expanded):
+                self.fired[t] = 1
+                successor = self._accelerate(successor, node)
+                key = _pack(successor)
+                target = self.index.get(key)
+                if target is None:
+                    target = self._add(key, node, t, sum(successor), self._guard(successor))
+                    frontier.append(target)
+                self.edges.extend((node, t, target))
+                self.memory += EDGE_OVERHEAD
+            if not enabled:
+                self.deadlocks.append(node)
+            self.max_enabled = max(self.max_enabled, len(enabled))
+        self.complete = True
+        return self
+
+    def marking(self, node):
+        return _unpack(self.keys[node])
+
+    def path(self, node):
+        """Transitions fired from the initial marking to ``node``."""
+        trace = []
+        while self.parent[node] != -1:
+            trace.append(self.via[node])
+            node = self.parent[node]
+        return trace[::-1]
+
+    def bounds(self):
+        """Largest token count seen per place (``OMEGA`` when unbounded)."""
+        bounds = list(self.initial)
+        for key in self.keys:
+            for p, value in enumerate(_unpack(key)):
+                if value > bounds[p]:
+                    bounds[p] = value
+        return bounds
+
+    def live_transitions(self):
+        """
+        Transitions that can fire again from every reachable marking, i.e. that
+        occur inside every terminal strongly connected component. Only
+        meaningful on a complete, OMEGA-free reachability graph.
+        """
+        size = len(self.keys)
+        adjacency = [[] for _ in range(size)]
+        for i in range(0, len(self.edges), 3):
+            adjacency[self.edges[i]].append(self.edges[i + 2])
+        component = _strongly_connected_components(adjacency)
+
+        count = max(component) + 1 if size else 0
+        terminal = [True] * count
+        inner = [set() for _ in range(count)]
+        for i in range(0, len(self.edges), 3):
+            source, t, target = self.edges[i], self.edges[i + 1], self.edges[i + 2]
+            if component[source] != component[target]:
+                terminal[component[source]] = False
+            else:
+                inner[component[source]].add(t)
+        live = set(range(self.net.transition_count))
+        for c in range(count):
+            if terminal[c]:
+                live &= inner[c]
+        return live
+
+
+def _strongly_connected_components(adjacency):
+    """Iterative Tarjan; returns the component id of every node."""
+    size = len(adjacency)
+    index = [-1] * size
+    low = [0] * size
+    on_stack = bytearray(size)
+    component = [-1] * size
+    stack = []
+    counter = 0
+    components = 0
+    for root in range(size):
+        if index[root] != -1:
+            continue
+        work = [(root, 0)]
+        while work:
+            node, i = work.pop()
+            if i == 0:
+                index[node] = low[node] = counter
+                counter += 1
+                stack.append(node)
+                on_stack[node] = 1
+            recurse = False
+            successors = adjacency[node]
+            while i < len(successors):
+                nxt = successors[i]
+                i += 1
+                if index[nxt] == -1:
+                    work.append((node, i))
+                    work.append((nxt, 0))
+                    recurse = True
+                    break
+                if on_stack[nxt]:
+                    low[node] = min(low[node], index[nxt])
+            if recurse:
+                continue
+            if low[node] == index[node]:
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = 0
+                    component[member] = components
+                    if member == node:
+                        break
+                components += 1
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+    return component
+
+
+def analyse(net, max_states=100_000, max_memory=None, max_witnesses=10, reduction=None):
+    """
+    Explore the state space of ``net`` and report deadlocks, place bounds and liveness.
+
+    ``bounded``/``live`` are ``None`` when the answer is unknown because the
+    exploration was truncated, reduced (boundedness and liveness are not
+    preserved by stubborn sets) or, for liveness, because the net is unbounded.
+    """
+    space = StateSpace(net, max_states=max_states, max_memory=max_memory, reduction=reduction).explore()
+    bounds = space.bounds()
+    unbounded = any(b == OMEGA for b in bounds)
+    exact = space.complete and reduction is None
+    if unbounded:
+        bounded = False
+    else:
+        bounded = True if exact else None
+
+    report = {
+        'states': len(space.keys),
+        'edges': len(space.edges) // 3,
+        'complete': space.complete,
+        'truncated': space.truncated,
+        'reduction': reduction,
+        'deadlock': bool(space.deadlocks) if space.deadlocks or space.complete else None,
+        'bounded': bounded,
+        'max_concurrent': space.max_enabled,
+        'bounds_exact': exact,
+        'places': {
+            pid: {'bound': None if b == OMEGA else b}
+            for pid, b in zip(net.place_ids, bounds)
+        },
+        'deadlocks': [
+            {
+                'marking': {
+                    pid: None if v == OMEGA else v
+                    for pid, v in zip(net.place_ids, space.marking(node))
+                },
+                'trace': [net.transition_ids[t] for t in space.path(node)],
+            }
+            for node in space.deadlocks[:max_witnesses]
+        ],
+        'dead_transitions': [
+            tid for t, tid in enumerate(net.transition_ids) if not space.fired[t]
+        ] if exact else None,
+    }
+    if exact and not unbounded:
+        live = space.live_transitions()
+        report['live'] = len(live) == net.transition_count
+        report['non_live_transitions'] = [
+            tid for t, tid in enumerate(net.transition_ids) if t not in live
+        ]
+    else:
+        report['live'] = None
+        report['non_live_transitions'] = None
+    return report
@@ -0,0 +1,342 @@
+from .compiler import CompiledNet
+
+
+RULES = ('self_loop_places', 'self_loop_transitions', 'implicit_places', 'series_places', 'series_transitions')
+
+
+class Reduction:
+    """
+    A net reduced by :func:`reduce_net` and the way back to the original nodes.
+
+    * ``places``: members of each reduced place, whose marking is the sum of theirs
+      (series places fused into one are reported under ``'A+B'``);
+    * ``transitions``: members of each reduced transition, fired in that order;
+    * ``implicit``: original places left out, ``pid -> (kept pid or None, offset)``: the place
+      always holds the kept place's tokens plus ``offset`` (or just ``offset``);
+    * ``silent``: original transitions left out, whose firings are not observable any more.
+    """
+
+    def __init__(self, original, net, places, transitions, implicit, silent, applied):
+        self.original = original
+        self.net = net
+        self.places = places
+        self.transitions = transitions
+        self.implicit = implicit
+        self.silent = silent
+        self.applied = applied
+
+    def _shifted(self, values, shift):
+        """Values keyed by reduced place id, plus one per implicit place (``shift(value, offset)``)."""
+        values = dict(values)
+        for pid, (kept, offset) in self.implicit.items():
+            if offset is None:
+                values[pid] = None
+            elif kept is None or kept in values:
+                values[pid] = shift(values[kept] if kept is not None else None, offset)
+        return values
+
+    def expand_marking(self, marking):
+        """``{pid: tokens}`` of the original places (``None`` where ``marking`` has ``None``)."""
+        if not isinstance(marking, dict):
+            marking = self.net.marking_dict(marking)
+        return self._shifted(marking, lambda value, offset: offset if value is None else value + offset)
+
+    def expand_counts(self, firings):
+        """``{tid: n}`` of the reduced transitions as firings of their original members."""
+        expanded = {}
+        for tid, n in firings.items():
+            for member in self.transitions[self.net.transition_index[tid]]:
+                expanded[member] = expanded.get(member, 0) + n
+        return expanded
+
+    def expand_transitions(self, tids):
+        """Reduced transition ids as the ordered list of their original members."""
+        return [member for tid in tids for member in self.transitions[self.net.transition_index[tid]]]
+
+    def translate_delays(self, delays):
+        """Per-transition delay overrides of the original ids, for the reduced transitions that kept their timing."""
+        return {
+            tid: delays[members[0]]
+            for tid, members in zip(self.net.transition_ids, self.transitions) if members[0] in delays
+        }
+
+    def analysis(self, report):
+        """An :func:`analyse` report of the reduced net, in terms of the original nodes."""
+        report = dict(report)
+
+        def bound(value, offset):
+            if value is None:
+                return {'bound': offset}
+            return {'bound': None if value['bound'] is None else value['bound'] + offset}
+
+        report['places'] = self._shifted(report['places'], bound)
+        report['deadlocks'] = [
+            {'marking': self.expand_marking(witness['marking']), 'trace': self.expand_transitions(witness['trace'])}
+            for witness in report['deadlocks']
+        ]
+        for key in ('dead_transitions', 'non_live_transitions'):
+            if report[key] is not None:
+                report[key] = self.expand_transitions(report[key])
+        if report['live'] and self.silent:
+            # Nothing tells whether the transitions left out are live themselves
+            report['live'] = None
+        if report['bounded'] and self.applied['series_transitions']:
+            # A place between fused transitions may pile up tokens while the second one waits
+            report['bounded'] = None
+        report['reduction'] = self.as_dict()
+        return report
+
+    def simulation(self, data):
+        """A ``SimulationResult``/``TimedResult`` dict of the reduced net, in terms of the original nodes."""
+        data = dict(data)
+        data['marking'] = self.expand_marking(data['marking'])
+        data['firings'] = self.expand_counts(data['firings'])
+        if 'places' in data:
+            def statistics(value, offset):
+                if value is None:
+                    return {'mean': offset, 'max': offset, 'arrival_rate': None, 'waiting_time': None}
+                mean, rate = value['mean'] + offset, value['arrival_rate']
+                return {'mean': mean, 'max': value['max'] + offset, 'arrival_rate': rate,
+                        'waiting_time': mean / rate if rate > 0 else None}
+
+            data['places'] = self._shifted(data['places'], statistics)
+        data['reduction'] = self.as_dict()
+        return data
+
+    def as_dict(self):
+        original, net = self.original, self.net
+        return {
+            'places': {'before': original.place_count, 'after': net.place_count},
+            'transitions': {'before': original.transition_count, 'after': net.transition_count},
+            'rules': self.applied,
+            'merged_places': {
+                pid: list(members) for pid, members in zip(net.place_ids, self.places) if len(members) > 1
+            },
+            'fused_transitions': {
+                tid: list(members) for tid, members in zip(net.transition_ids, self.transitions) if len(members) > 1
+            },
+            'implicit_places': {
+                pid: {'place': kept, 'offset': offset} for pid, (kept, offset) in sorted(self.implicit.items())
+            },
+            'silent_transitions': sorted(self.silent),
+        }
+
+
+def reduce_net(net, timed=False, keep=()):
+    """
+    Shrink ``net`` with behaviour-preserving reduction rules (Murata, 1989) until none applies:
+
+    * ``self_loop_places``: a place only read through equal input/output arcs and marked enough
+      for all of them never disables anything;
+    * ``self_loop_transitions``: a transition whose firing changes nothing, when another
+      transition is enabled whenever it is (so no deadlock is hidden);
+    * ``implicit_places``: of two places with the same input and output arcs, the more marked
+      one always holds the other's tokens plus a constant;
+    * ``series_places``: a transition moving one token from a place it alone empties to another
+      place; both places become one;
+    * ``series_transitions``: an unmarked place filled by one transition and emptied by another
+      that needs nothing else; the second one fires as part of the first.
+
+    Reachability up to the removed nodes, deadlocks, boundedness and liveness are preserved.
+    Only ordinary places (no capacity, inhibitor or reset arc) are removed or merged, and nodes
+    whose ids are in ``keep`` are left alone. With ``timed``, rules that would change timed
+    behaviour are restricted: only immediate transitions disappear, and self-loop places go only
+    when they do not limit the enabling degree. Returns a :class:`Reduction`.
+    """
+    keep = set(keep)
+    P, T = net.place_count, net.transition_count
+    pre = [dict(net.pre[t]) for t in range(T)]
+    post = [dict(net.post[t]) for t in range(T)]
+    marking = list(net.initial_marking)
+    producers = [set() for _ in range(P)]
+    consumers = [set() for _ in range(P)]
+    for t in range(T):
+        for p in post[t]:
+            producers[p].add(t)
+        for p in pre[t]:
+            consumers[p].add(t)
+    special = {p for t in range(T) for p, _ in net.inhibitors[t]} | {p for t in range(T) for p in net.resets[t]}
+    fixed = [bool(net.inhibitors[t] or net.resets[t]) or net.transition_ids[t] in keep for t in range(T)]
+    place_members = [[pid] for pid in net.place_ids]
+    transition_members = [[tid] for tid in net.transition_ids]
+    places, transitions = set(range(P)), set(range(T))
+    implicit, silent = {}, []
+    anchors = set()  # places that an implicit place is expressed against: never merged or emptied away
+    applied = dict.fromkeys(RULES, 0)
+
+    def free(p):
+        return not net.capacity[p] and p not in special
+
+    def ordinary(p):
+        return free(p) and not any(pid in keep for pid in place_members[p])
+
+    def immediate(t):
+        return not timed or not net.timed[t]
+
+    def drop_place(p):
+        places.discard(p)
+        for t in producers[p]:
+            del post[t][p]
+        for t in consumers[p]:
+            del pre[t][p]
+
+    def drop_transition(t):
+        transitions.discard(t)
+        for p in pre[t]:
+            consumers[p].discard(t)
+        for p in post[t]:
+            producers[p].discard(t)
+        pre[t], post[t] = {}, {}
+
+    def self_loop_place(p):
+        loops = producers[p] | consumers[p]
+        if not loops or producers[p] != consumers[p] or not ordinary(p) or len(place_members[p]) > 1:
+            return False
+        if any(pre[t][p] != post[t][p] or marking[p] < pre[t][p] for t in loops):
+            return False
+        if timed and any(net.timed[t] and (len(pre[t]) > 1 or marking[p] // pre[t][p] != 1) for t in loops):
+            return False
+        drop_place(p)
+        implicit[place_members[p][0]] = (None, marking[p])
+        return True
+
+    def self_loop_transition(t):
+        if fixed[t] or not pre[t] or pre[t] != post[t] or len(transition_members[t]) > 1:
+            return False
+        # A witness enabled whenever t is, that really moves tokens
+        for other in transitions:
+            if (
+                other != t and not net.inhibitors[other] and pre[other] != post[other]
+                and all(p in pre[t] and w <= pre[t][p] for p, w in pre[other].items())
+                and all(free(p) for p in post[other])
+            ):
+                drop_transition(t)
+                silent.extend(transition_members[t])
+                return True
+        return False
+
+    def signature(p):
+        return (
+            tuple(sorted((t, post[t][p]) for t in producers[p])),
+            tuple(sorted((t, pre[t][p]) for t in consumers[p])),
+        )
+
+    def series_places(t):
+        if fixed[t] or not immediate(t) or len(pre[t]) != 1 or len(post[t]) != 1:
+            return False
+        (p1, w1), = pre[t].items()
+        (p2, w2), = post[t].items()
+        if p1 == p2 or w1 != 1 or w2 != 1 or consumers[p1] != {t} or not ordinary(p1) or not ordinary(p2):
+            return False
+        if p1 in anchors or p2 in anchors:
+            return False
+        drop_transition(t)
+        silent.extend(transition_members[t])
+        for source in producers[p1]:
+            post[source][p2] = post[source].get(p2, 0) + post[source].pop(p1)
+            producers[p2].add(source)
+        producers[p1] = set()
+        places.discard(p1)
+        marking[p2] += marking[p1]
+        place_members[p2] = place_members[p1] + place_members[p2]
+        return True
+
+    def series_transitions(p):
+        if marking[p] or len(producers[p]) != 1 or len(consumers[p]) != 1 or not ordinary(p) or len(place_members[p]) > 1:
+            return False
+        if p in anchors:
+            return False
+        t1, = producers[p]
+        t2, = consumers[p]
+        if t1 == t2 or fixed[t1] or fixed[t2] or not immediate(t2) or len(pre[t2]) != 1 or post[t1][p] != pre[t2][p]:
+            return False
+        if not all(free(q) for q in post[t2]):
+            return False
+        outputs = post[t2]
+        drop_transition(t2)
+        drop_place(p)
+        for q, w in outputs.items():
+            post[t1][q] = post[t1].get(q, 0) + w
+            producers[q].add(t1)
+        transition_members[t1] += transition_members[t2]
+        # Only ever marked in between the fused firings: not observable in the reduced net
+        implicit[place_members[p][0]] = (None, None)
+        return True
+
+    changed = True
+    while changed:
+        changed = False
+        for p in sorted(places):
+            if p in places and self_loop_place(p):
+                applied['self_loop_places'] += 1
+                changed = True
+        for t in sorted(transitions):
+            if t in transitions and self_loop_transition(t):
+                applied['self_loop_transitions'] += 1
+                changed = True
+        duplicates = {}
+        for p in sorted(places):
+            if not consumers[p] or not ordinary(p) or len(place_members[p]) > 1:
+                continue
+            key = signature(p)
+            q = duplicates.setdefault(key, p)
+            if q != p:
+                kept, dropped = (q, p) if marking[q] <= marking[p] else (p, q)
+                drop_place(dropped)
+                implicit[place_members[dropped][0]] = (place_members[kept][0], marking[dropped] - marking[kept])
+                anchors.add(kept)
+                duplicates[key] = kept
+                applied['implicit_places'] += 1
+                changed = True
+        for t in sorted(transitions):
+            if t in transitions and series_places(t):
+                applied['series_places'] += 1
+                changed = True
+        for p in sorted(places):
+            if p in places and series_transitions(p):
+                applied['series_transitions'] += 1
+                changed = True
+
+    place_order = sorted(places)
+    transition_order = sorted(transitions)
+    place_ids = {p: '+'.join(place_members[p]) for p in place_order}
+    transition_ids = {t: '+'.join(transition_members[t]) for t in transition_order}
+    arcs = []
+    for t in transition_order:
+        tid = transition_ids[t]
+        arcs += [{'source_id': place_ids[p], 'target_id': tid, 'weight': w, 'is_inhibitor': False, 'is_reset': False}
+                 for p, w in pre[t].items()]
+        arcs += [{'source_id': tid, 'target_id': place_ids[p], 'weight': w, 'is_inhibitor': False, 'is_reset': False}
+                 for p, w in post[t].items()]
+        arcs += [{'source_id': place_ids[p], 'target_id': tid, 'weight': w, 'is_inhibitor': True, 'is_reset': False}
+                 for p, w in net.inhibitors[t]]
+        arcs += [{'source_id': place_ids[p], 'target_id': tid, 'weight': 1, 'is_inhibitor': False, 'is_reset': True}
+                 for p in net.resets[t]]
+    reduced = CompiledNet.from_rows(
+        [{'id_in_net': place_ids[p], 'tokens': marking[p], 'capacity': net.capacity[p]} for p in place_order],
+        [
+            {
+                'id_in_net': transition_ids[t], 'type': 'timed' if net.timed[t] else 'immediate',
+                'delay_mean': net.delay_mean[t], 'priority': net.priority[t],
+                'delay_distribution': net.distribution[t],
+            }
+            for t in transition_order
+        ],
+        arcs,
+    )
+    # Follow chains: a duplicate of a place that later turned out to be a duplicate or a self-loop
+    names = set(reduced.place_ids)
+
+    def resolve(kept, offset):
+        while kept is not None and kept not in names:
+            kept, extra = implicit[kept]
+            offset += extra
+        return kept, offset
+
+    implicit = {pid: resolve(kept, offset) for pid, (kept, offset) in implicit.items()}
+    return Reduction(
+        net, reduced,
+        tuple(tuple(place_members[p]) for p in place_order),
+        tuple(tuple(transition_members[t]) for t in transition_order),
+        implicit, silent, applied,
+    )
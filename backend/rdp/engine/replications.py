@@ -0,0 +1,129 @@
+import os
+import random
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from .stats import confidence_interval
+from .timed import TimedSimulator
+
+
+# Set once per worker process by ``_init_worker`` so the compiled net is
+# pickled and shipped once per worker, not once per replication.
+_worker_net = None
+_worker_options = None
+
+
+def _init_worker(net, options):
+    global _worker_net, _worker_options
+    _worker_net = net
+    _worker_options = options
+
+
+def run_replication(net, seed, until=None, max_events=None, delays=None, server='single', schedule=None,
+                    warm_state=None, warmup=0.0):
+    """
+    Run one seeded timed replication and reduce it to flat per-index metric lists.
+
+    The first ``warmup`` time units are simulated but left out of the metrics (e.g. the
+    ``warmup_time`` found by :class:`SteadyStateMonitor`); ``until`` includes them.
+    """
+    simulator = TimedSimulator(net, seed=seed, delays=delays, server=server, schedule=schedule,
+                               warm_state=warm_state)
+    # Firing counts add up across runs, unlike the statistics: keep the warm-up's out
+    warm_counts = [0] * net.transition_count
+    if warmup:
+        simulator.run(until=warmup)
+        warm_counts = list(simulator.counts)
+    result = simulator.run(until=until, max_events=max_events)
+    statistics = result.statistics
+    duration = statistics.end_time - statistics.start_time
+    means = [
+        area / duration if duration > 0 else float(current)
+        for area, current in zip(statistics.area, statistics.current)
+    ]
+    throughput = [(n - warm) / duration if duration > 0 else 0.0 for n, warm in zip(result.counts, warm_counts)]
+    waits = [
+        mean / (inflow / duration) if duration > 0 and inflow else None
+        for mean, inflow in zip(means, statistics.inflow)
+    ]
+    return {
+        'seed': seed,
+        'time': result.time,
+        'events': result.events,
+        'deadlock': result.stopped == 'deadlock',
+        'stopped': result.stopped,
+        'means': means,
+        'throughput': throughput,
+        'waits': waits,
+    }
+
+
+def _run_in_worker(seed):
+    return run_replication(_worker_net, seed, **_worker_options)
+
+
+def replication_seeds(seed, replications):
+    """Independent, reproducible per-replication seeds derived from one base seed."""
+    rng = random.Random(seed)
+    return [rng.getrandbits(63) for _ in range(replications)]
+
+
+def replicate(net, replications, seed=None, until=None, max_events=None, delays=None,
+              server='single', workers=None, confidence=0.95, schedule=None, warm_state=None, warmup=0.0):
+    """
+    Run ``replications`` independent timed runs of ``net`` and aggregate them, all started
+    from ``warm_state`` when given (each with its own seed, so they still diverge).
+
+    Replications are spread over a ``ProcessPoolExecutor`` of ``workers``
+    processes (default: one per CPU); ``workers=1`` runs them in process.
+    """
+    if warmup and until is not None and warmup >= until:
+        raise ValueError('warmup must be shorter than until')
+    options = {'until': until, 'max_events': max_events, 'delays': delays, 'server': server, 'schedule': schedule,
+               'warm_state': warm_state, 'warmup': warmup}
+    # Fail fast on bad delay or server options instead of inside every worker
+    TimedSimulator(net, delays=delays, server=server, schedule=schedule, warm_state=warm_state)
+    seeds = replication_seeds(seed, replications)
+    workers = min(workers or os.cpu_count() or 1, replications)
+    if workers <= 1:
+        runs = [run_replication(net, s, **options) for s in seeds]
+    else:
+        chunksize = max(1, replications // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(net, options)) as pool:
+            runs = list(pool.map(_run_in_worker, seeds, chunksize=chunksize))
+    return aggregate_replications(net, runs, confidence)
+
+
+def aggregate_replications(net, runs, confidence=0.95):
+    """
+    Mean and confidence interval across replications of queue lengths
+    (time-average marking), waiting times, resource occupancy and throughput.
+
+    Occupancy is reported for places that start with tokens (resources):
+    the share of the initial tokens that is, on average, in use.
+    """
+    places = {}
+    for p, pid in enumerate(net.place_ids):
+        means = [run['means'][p] for run in runs]
+        entry = {
+            'marking': confidence_interval(means, confidence),
+            'waiting_time': confidence_interval([run['waits'][p] for run in runs], confidence),
+        }
+        initial = net.initial_marking[p]
+        if initial > 0:
+            entry['occupancy'] = confidence_interval([1 - m / initial for m in means], confidence)
+        places[pid] = entry
+    throughput = {
+        tid: confidence_interval([run['throughput'][t] for run in runs], confidence)
+        for t, tid in enumerate(net.transition_ids)
+    }
+    return {
+        'replications': len(runs),
+        'confidence': confidence,
+        'seeds': [run['seed'] for run in runs],
+        'deadlocks': sum(run['deadlock'] for run in runs),
+        'stopped': dict(Counter(run['stopped'] for run in runs)),
+        'time': confidence_interval([run['time'] for run in runs], confidence),
+        'places': places,
+        'throughput': throughput,
+    }
@@ -0,0 +1,70 @@
+import heapq
+
+
+ACTIONS = ('set', 'add', 'reset', 'capacity')
+UNBOUNDED = 2 ** 31 - 1  # capacity of a scheduled place while it has no bound
+
+
+class CompiledSchedule:
+    """
+    Calendar of marking and capacity changes applied by :class:`TimedSimulator` between firings,
+    instead of control transitions (``Debut_Jour``, ``Reset_Quotidien``...) that have to be
+    evaluated at every step.
+
+    Each entry acts on one place at time ``at`` and, with ``every`` set, again every ``every``
+    time units:
+
+    * ``set``: the place holds ``value`` tokens (credits, a shift's staff when nobody is busy);
+    * ``add``: ``value`` tokens are added, or removed when negative; tokens that are not there
+      yet are removed as they come back (staff leaving once their current patient is done);
+    * ``reset``: the place is emptied;
+    * ``capacity``: the place's capacity becomes ``value`` (0 or ``None``: unbounded).
+
+    ``profile: [[at, value], ...]`` is a shorthand for several entries sharing place, action and
+    period, e.g. a day/night staffing profile. Entries due at the same instant apply in the
+    order given, before any timed firing at that instant.
+    """
+
+    def __init__(self, net, entries):
+        self.entries = []
+        for entry in entries:
+            place = entry.get('place')
+            if place not in net.place_index:
+                raise ValueError(f"Unknown place '{place}' in schedule")
+            action = entry.get('action', 'set')
+            if action not in ACTIONS:
+                raise ValueError(f"Unknown schedule action '{action}'")
+            every = entry.get('every')
+            if every is not None and every <= 0:
+                raise ValueError('every must be positive')
+            points = entry.get('profile') or [(entry.get('at', 0.0), entry.get('value'))]
+            for at, value in points:
+                if at < 0:
+                    raise ValueError('Schedule times must be >= 0')
+                if action in ('set', 'capacity') and value is not None and value < 0:
+                    raise ValueError(f"{action} value must be >= 0")
+                if action in ('set', 'add') and value is None:
+                    raise ValueError(f"A value is required for '{action}'")
+                self.entries.append((float(at), every, net.place_index[place], action, value or 0))
+        self.capacity_places = tuple(sorted({p for _, _, p, action, _ in self.entries if action == 'capacity'}))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def agenda(self):
+        """Fresh ``(time, entry)`` heap; the schedule itself is never mutated."""
+        agenda = [(at, i) for i, (at, *_) in enumerate(self.entries)]
+        heapq.heapify(agenda)
+        return agenda
+
+    def due(self, agenda):
+        """Pop the entries due at the earliest time off ``agenda``, re-queueing periodic ones."""
+        time = agenda[0][0]
+        due = []
+        while agenda and agenda[0][0] == time:
+            due.append(heapq.heappop(agenda)[1])
+        for i in due:
+            every = self.entries[i][1]
+            if every is not None:
+                heapq.heappush(agenda, (time + every, i))
+        return time, [self.entries[i][2:] for i in due]
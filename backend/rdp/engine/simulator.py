@@ -0,0 +1,92 @@
+import random
+from array import array
+
+from .index import EnabledIndex
+
+
+POLICIES = ('first', 'random')
+
+
+class Simulator:
+    """
+    Untimed token game on a :class:`CompiledNet`.
+
+    ``policy`` picks which enabled transition fires at each step: ``first``
+    (lowest index, i.e. the editor's behaviour) or ``random`` (uniform, seeded).
+    """
+
+    timed = False
+
+    def __init__(self, net, marking=None, policy='first', seed=None, observers=()):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy '{policy}'")
+        self.net = net
+        self.marking = array('l', net.initial_marking if marking is None else marking)
+        self.policy = policy
+        self.rng = random.Random(seed)
+        self.index = EnabledIndex(net, self.marking)
+        self.steps = 0
+        self.observers = list(observers)
+
+    @property
+    def now(self):
+        """Untimed clock for observers: one unit per firing."""
+        return float(self.steps)
+
+    def enabled_transitions(self):
+        return sorted(self.index.members)
+
+    def step(self):
+        """Fire one transition; return its index, or ``None`` on deadlock."""
+        index = self.index
+        t = index.first() if self.policy == 'first' else index.choice(self.rng)
+        if t is None:
+            return None
+        changed = index.fire(t)
+        self.steps += 1
+        for observer in self.observers:
+            observer.on_fire(self, t, changed)
+        return t
+
+    def run(self, steps, trace=True):
+        net = self.net
+        counts = [0] * net.transition_count
+        fired = array('l')
+        deadlock = False
+        for observer in self.observers:
+            observer.start(self)
+        for _ in range(steps):
+            t = self.step()
+            if t is None:
+                deadlock = True
+                break
+            counts[t] += 1
+            if trace:
+                fired.append(t)
+        for observer in self.observers:
+            observer.finish(self)
+        return SimulationResult(net, self.marking, self.steps, deadlock, counts, fired if trace else None)
+
+
+class SimulationResult:
+    def __init__(self, net, marking, steps, deadlock, counts, trace):
+        self.net = net
+        self.marking = array('l', marking)
+        self.steps = steps
+        self.deadlock = deadlock
+        self.counts = counts
+        self.trace = trace
+
+    def as_dict(self):
+        net = self.net
+        data = {
+            'steps': self.steps,
+            'deadlock': self.deadlock,
+            'marking': net.marking_dict(self.marking),
+            'firings': {tid: n for tid, n in zip(net.transition_ids, self.counts) if n},
+        }
+        if self.trace is not None:
+            # Compact trace: indices into ``transitions`` rather than repeated ids
+            data['transitions'] = list(net.transition_ids)
+            data['trace'] = self.trace.tolist()
+        return data
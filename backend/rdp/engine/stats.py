@@ -0,0 +1,109 @@
+import math
+from statistics import NormalDist
+
+
+class Observer:
+    """Hooks called by the engines; subclasses override what they need."""
+
+    def start(self, sim):
+        pass
+
+    def on_fire(self, sim, t, changed):
+        pass
+
+    def on_schedule(self, sim, changed):
+        """Tokens or capacities of ``changed`` were set by the timed engine's schedule."""
+
+    def finish(self, sim):
+        pass
+
+
+class MarkingStatistics(Observer):
+    """
+    Time-weighted marking statistics, updated only for the places a firing changed.
+
+    ``waiting_time`` is the Little's law estimate ``L / lambda`` (mean tokens over
+    token arrival rate), which is the mean sojourn time of a token in a queue place.
+    """
+
+    def start(self, sim):
+        net = sim.net
+        self.net = net
+        self.start_time = sim.now
+        self.current = list(sim.marking)
+        self.peak = list(sim.marking)
+        self.last = [sim.now] * net.place_count
+        self.area = [0.0] * net.place_count
+        self.inflow = [0] * net.place_count
+
+    def on_fire(self, sim, t, changed):
+        self._record(sim, changed)
+        inflow = self.inflow
+        for p, w in self.net.post[t]:
+            inflow[p] += w
+
+    def on_schedule(self, sim, changed):
+        self._record(sim, changed)
+
+    def _record(self, sim, changed):
+        now, marking = sim.now, sim.marking
+        current, last, area, peak = self.current, self.last, self.area, self.peak
+        for p in changed:
+            area[p] += current[p] * (now - last[p])
+            last[p] = now
+            current[p] = value = marking[p]
+            if value > peak[p]:
+                peak[p] = value
+
+    def finish(self, sim):
+        self.end_time = sim.now
+        for p in range(self.net.place_count):
+            self.area[p] += self.current[p] * (sim.now - self.last[p])
+            self.last[p] = sim.now
+
+    def as_dict(self):
+        duration = self.end_time - self.start_time
+        places = {}
+        for p, pid in enumerate(self.net.place_ids):
+            mean = self.area[p] / duration if duration > 0 else float(self.current[p])
+            rate = self.inflow[p] / duration if duration > 0 else 0.0
+            places[pid] = {
+                'mean': mean,
+                'max': self.peak[p],
+                'arrival_rate': rate,
+                'waiting_time': mean / rate if rate > 0 else None,
+            }
+        return places
+
+
+def student_t_quantile(p, df):
+    """Quantile of Student's t distribution (exact for df <= 2, Cornish-Fisher expansion above)."""
+    if df == 1:
+        return math.tan(math.pi * (p - 0.5))
+    if df == 2:
+        return (2 * p - 1) / math.sqrt(2 * p * (1 - p))
+    z = NormalDist().inv_cdf(p)
+    z3, z5, z7 = z ** 3, z ** 5, z ** 7
+    return (
+        z
+        + (z3 + z) / (4 * df)
+        + (5 * z5 + 16 * z3 + 3 * z) / (96 * df ** 2)
+        + (3 * z7 + 19 * z5 + 17 * z3 - 15 * z) / (384 * df ** 3)
+    )
+
+
+def confidence_interval(values, level=0.95):
+    """Mean, standard deviation and Student-t interval of independent samples."""
+    values = [v for v in values if v is not None]
+    n = len(values)
+    if n == 0:
+        return {'n': 0, 'mean': None, 'std': None, 'low': None, 'high': None, 'half_width': None}
+    mean = math.fsum(values) / n
+    if n == 1:
+        return {'n': 1, 'mean': mean, 'std': None, 'low': None, 'high': None, 'half_width': None}
+    std = math.sqrt(math.fsum((v - mean) ** 2 for v in values) / (n - 1))
+    half_width = student_t_quantile(0.5 + level / 2, n - 1) * std / math.sqrt(n)
+    return {
+        'n': n, 'mean': mean, 'std': std,
+        'low': mean - half_width, 'high': mean + half_width, 'half_width': half_width,
+    }
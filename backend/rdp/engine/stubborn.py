@@ -0,0 +1,113 @@
+class StubbornSets:
+    """
+    Deadlock-preserving stubborn sets for a :class:`CompiledNet`.
+
+    From a marking, :meth:`select` returns a subset of the enabled transitions
+    such that exploring only those still reaches every deadlock. The set is
+    the closure of one enabled seed transition under:
+
+    * an enabled transition pulls in every transition dependent on it (one
+      writes a place the other reads, or one resets a place the other writes);
+    * a disabled transition pulls in the transitions able to remove one
+      reason it is disabled (its "scapegoat"): the producers of a short input
+      place, or the consumers of a place blocking an inhibitor or a capacity.
+
+    Independent parts of the net (consultation, maternity, surgery, shift
+    counters...) then stop being interleaved in every possible order.
+    """
+
+    def __init__(self, net):
+        self.net = net
+        size = net.place_count
+        effect = [dict() for _ in range(net.transition_count)]
+        readers = [set() for _ in range(size)]
+        writers = [set() for _ in range(size)]
+        resetters = [set() for _ in range(size)]
+        self.increasers = [[] for _ in range(size)]
+        self.decreasers = [[] for _ in range(size)]
+        self.reads = []
+        for t in range(net.transition_count):
+            for p, w in net.pre[t]:
+                effect[t][p] = effect[t].get(p, 0) - w
+            for p, w in net.post[t]:
+                effect[t][p] = effect[t].get(p, 0) + w
+            reads = {p for p, _ in net.pre[t]} | {p for p, _ in net.inhibitors[t]} | {
+                p for p, *_ in net.capacity_checks[t]
+            }
+            self.reads.append(reads)
+            for p in reads:
+                readers[p].add(t)
+            for p in net.changed[t]:
+                writers[p].add(t)
+            for p in net.resets[t]:
+                resetters[p].add(t)
+                self.decreasers[p].append(t)
+            for p, delta in effect[t].items():
+                if delta > 0:
+                    self.increasers[p].append(t)
+                elif delta < 0 and p not in net.resets[t]:
+                    self.decreasers[p].append(t)
+        self._readers = readers
+        self._writers = writers
+        self._resetters = resetters
+        self._dependents = {}
+
+    def dependents(self, t):
+        """Transitions that do not commute with ``t`` (cached)."""
+        dependents = self._dependents.get(t)
+        if dependents is None:
+            net = self.net
+            dependents = set()
+            for p in net.changed[t]:
+                dependents |= self._readers[p]
+                dependents |= self._resetters[p]
+            for p in self.reads[t]:
+                dependents |= self._writers[p]
+            for p in net.resets[t]:
+                dependents |= self._writers[p]
+            dependents.discard(t)
+            dependents = self._dependents[t] = tuple(dependents)
+        return dependents
+
+    def scapegoat(self, marking, t):
+        """Smallest set of transitions that must fire before disabled ``t`` can become enabled."""
+        net = self.net
+        best = None
+        for p, w in net.pre[t]:
+            if marking[p] < w and (best is None or len(self.increasers[p]) < len(best)):
+                best = self.increasers[p]
+        for p, w in net.inhibitors[t]:
+            if marking[p] >= w and (best is None or len(self.decreasers[p]) < len(best)):
+                best = self.decreasers[p]
+        capacity = net.capacity
+        for p, consumed, produced, reset in net.capacity_checks[t]:
+            if (0 if reset else marking[p] - consumed) + produced > capacity[p]:
+                if best is None or len(self.decreasers[p]) < len(best):
+                    best = self.decreasers[p]
+        return best or ()
+
+    def closure(self, marking, seed, enabled):
+        stubborn = {seed}
+        work = [seed]
+        while work:
+            t = work.pop()
+            pulled = self.dependents(t) if t in enabled else self.scapegoat(marking, t)
+            for u in pulled:
+                if u not in stubborn:
+                    stubborn.add(u)
+                    work.append(u)
+        return stubborn
+
+    def select(self, marking, enabled):
+        """Enabled transitions of the smallest stubborn set found over all seeds."""
+        if len(enabled) <= 1:
+            return list(enabled)
+        enabled_set = set(enabled)
+        best = enabled
+        for seed in enabled:
+            chosen = [t for t in self.closure(marking, seed, enabled_set) if t in enabled_set]
+            if len(chosen) < len(best):
+                best = chosen
+                if len(best) == 1:
+                    break
+        return sorted(best)
@@ -0,0 +1,367 @@
+import heapq
+import random
+from array import array
+from itertools import count
+
+from .distributions import make_sampler
+from .index import EnabledIndex
+from .schedule import UNBOUNDED
+from .stats import MarkingStatistics
+
+
+SERVER_SEMANTICS = ('single', 'infinite')
+
+# Default bounds of :meth:`TimedSimulator.run`: total firings, and firings without the clock moving
+MAX_EVENTS = 1_000_000
+MAX_INSTANT = 100_000
+
+
+class TimedSimulator:
+    """
+    Discrete-event simulation of a stochastic timed Petri net (GSPN semantics).
+
+    * Immediate transitions fire in zero time, before the clock may advance,
+      highest ``priority`` first; equal-priority conflicts are drawn uniformly.
+    * A timed transition samples a delay when it becomes enabled and is put on
+      the event calendar (a binary heap). Events of transitions that get
+      disabled before they come up are cancelled.
+    * ``server='single'``: a timed transition has at most one pending firing.
+      ``server='infinite'``: it has one per unit of enabling degree, e.g. four
+      doctors serve four patients in parallel.
+    * Timed events falling at the same instant fire by decreasing ``priority``.
+
+    Runs are reproducible: every draw comes from a ``random.Random(seed)``.
+    ``delays`` overrides the per-transition delay settings, keyed by ``id_in_net``
+    (``{'distribution': 'erlang', 'mean': 30, 'shape': 3}``).
+
+    ``schedule`` (a :class:`CompiledSchedule` of the same net) changes tokens and capacities
+    at given times, e.g. shift changes. Its entries only apply while a timed firing is pending
+    or up to the ``until`` horizon, so a dead net still stops.
+
+    ``warm_state`` (from :meth:`snapshot`, possibly of an earlier version of the net: nodes are
+    matched by id) resumes a warmed-up run at clock 0: its marking, pending timed firings,
+    schedule agenda and, when no ``seed`` is given, random generator state. An observer can end
+    :meth:`run` early by setting ``stop_requested`` to a reason.
+
+    A cycle of immediate (or zero-delay) transitions never lets the clock advance: :meth:`run`
+    stops with ``'timeless'`` after ``max_instant`` firings at the same time.
+    """
+
+    timed = True
+
+    def __init__(self, net, marking=None, seed=None, delays=None, server='single', observers=(),
+                 schedule=None, warm_state=None):
+        if server not in SERVER_SEMANTICS:
+            raise ValueError(f"Unknown server semantics '{server}'")
+        if schedule is not None and schedule.capacity_places:
+            # Private copy: scheduled places get capacity checks, and their bound changes during the run
+            capacity = array('l', net.capacity)
+            for p in schedule.capacity_places:
+                capacity[p] = capacity[p] or UNBOUNDED
+            net = net.with_capacity(capacity)
+        self.net = net
+        self.schedule = schedule
+        self._agenda = schedule.agenda() if schedule is not None else []
+        self._debt = {}  # place -> tokens still to withdraw as they come back (``add`` below zero)
+        warm = warm_state or {}
+        if marking is None and warm:
+            marking = array('l', net.initial_marking)
+            for pid, tokens in warm.get('marking', {}).items():
+                if pid in net.place_index:
+                    marking[net.place_index[pid]] = tokens
+        self.marking = array('l', net.initial_marking if marking is None else marking)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        if seed is None and warm.get('rng'):
+            version, internal, gauss = warm['rng']
+            self.rng.setstate((version, tuple(internal), gauss))
+        if warm.get('agenda') and schedule is not None and warm.get('schedule_entries') == len(schedule):
+            self._agenda = [(remaining, i) for remaining, i in warm['agenda']]
+            heapq.heapify(self._agenda)
+        for pid, owed in warm.get('debt', {}).items():
+            if pid in net.place_index:
+                self._debt[net.place_index[pid]] = owed
+        self.stop_requested = None
+        self.server = server
+        self.now = 0.0
+        self.events = 0
+        self.instant = 0  # firings since the clock last moved
+        self.counts = [0] * net.transition_count
+        self.observers = list(observers)
+        self._observers = self.observers
+
+        delays = delays or {}
+        self.samplers = []
+        for t, tid in enumerate(net.transition_ids):
+            options = dict(delays.get(tid, {}))
+            distribution = options.pop('distribution', net.distribution[t])
+            mean = options.pop('mean', net.delay_mean[t])
+            self.samplers.append(make_sampler(distribution, mean, **options))
+
+        # Immediate transitions rank before timed ones, then by decreasing priority
+        order = sorted(
+            range(net.transition_count),
+            key=lambda t: (net.timed[t], -net.priority[t], t),
+        )
+        rank = [0] * net.transition_count
+        for r, t in enumerate(order):
+            rank[t] = r
+        groups = {}
+        for t in order:
+            if not net.timed[t]:
+                groups.setdefault(net.priority[t], []).append(t)
+        self._ties = [
+            () if net.timed[t] else tuple(groups[net.priority[t]])
+            for t in range(net.transition_count)
+        ]
+        self._timed_dependents = tuple(
+            tuple(t for t in ts if net.timed[t]) for ts in net.dependents
+        )
+
+        self._calendar = []
+        self._sequence = count()
+        self._live = [[] for _ in range(net.transition_count)]
+        self._cancelled = set()
+        self._stamp = [0] * net.transition_count
+        self._clock = 0
+        self.index = EnabledIndex(net, self.marking, rank=rank)
+        for remaining, tid in warm.get('events', ()):
+            t = net.transition_index.get(tid)
+            if t is not None and net.timed[t] and len(self._live[t]) < self.degree(t):
+                self._push(t, remaining)
+        for t in range(net.transition_count):
+            if net.timed[t]:
+                self._reconcile(t)
+
+    def degree(self, t):
+        """Number of firings of ``t`` that may be pending at once."""
+        if not self.index.flags[t]:
+            return 0
+        if self.server == 'single':
+            return 1
+        marking = self.marking
+        return min((marking[p] // w for p, w in self.net.pre[t]), default=1)
+
+    def _push(self, t, delay):
+        seq = next(self._sequence)
+        self._live[t].append(seq)
+        heapq.heappush(self._calendar, (self.now + delay, -self.net.priority[t], seq, t))
+
+    def _reconcile(self, t):
+        live = self._live[t]
+        wanted = self.degree(t)
+        while len(live) < wanted:
+            self._push(t, self.samplers[t](self.rng))
+        while len(live) > wanted:
+            # Drop the most recently started firing; its event is skipped when it surfaces
+            self._cancelled.add(live.pop())
+
+    def _reconcile_places(self, changed):
+        self._clock += 1
+        clock, stamp = self._clock, self._stamp
+        for p in changed:
+            for u in self._timed_dependents[p]:
+                if stamp[u] != clock:
+                    stamp[u] = clock
+                    self._reconcile(u)
+
+    def _fire(self, t, time=None):
+        if time is None or time == self.now:
+            self.instant += 1
+        else:
+            self.now, self.instant = time, 1
+        changed = self.index.fire(t)
+        self.events += 1
+        self.counts[t] += 1
+        self._reconcile_places(changed)
+        for observer in self._observers:
+            observer.on_fire(self, t, changed)
+        if self._debt:
+            self._settle(changed)
+
+    def next_schedule_time(self):
+        """Time of the next schedule entry, or ``None`` without a schedule."""
+        return self._agenda[0][0] if self._agenda else None
+
+    def _apply_schedule(self):
+        time, due = self.schedule.due(self._agenda)
+        if time > self.now:
+            self.now, self.instant = time, 0
+        marking, capacity, debt = self.marking, self.net.capacity, self._debt
+        changed = set()
+        for p, action, value in due:
+            if action == 'capacity':
+                capacity[p] = value or UNBOUNDED
+                changed.add(p)
+                continue
+            if action == 'add':
+                # Tokens that cannot be removed now (busy staff) leave when they come back
+                owed = debt.pop(p, 0) - value
+                tokens = max(0, marking[p] - owed)
+                if owed > marking[p]:
+                    debt[p] = owed - marking[p]
+            else:
+                debt.pop(p, None)
+                tokens = value if action == 'set' else 0
+            if tokens != marking[p]:
+                marking[p] = tokens
+                changed.add(p)
+        self._changed(tuple(sorted(changed)))
+
+    def _settle(self, changed):
+        marking, debt = self.marking, self._debt
+        settled = []
+        for p in changed:
+            owed = debt.get(p)
+            if owed and marking[p]:
+                taken = min(owed, marking[p])
+                marking[p] -= taken
+                if taken == owed:
+                    del debt[p]
+                else:
+                    debt[p] = owed - taken
+                settled.append(p)
+        if settled:
+            self._changed(tuple(settled))
+
+    def _changed(self, changed):
+        """Propagate marking or capacity changes made outside a firing."""
+        self.index.update(changed)
+        self._reconcile_places(changed)
+        for observer in self._observers:
+            observer.on_schedule(self, changed)
+
+    def _next_event(self):
+        calendar, cancelled = self._calendar, self._cancelled
+        while calendar:
+            if calendar[0][2] in cancelled:
+                cancelled.discard(heapq.heappop(calendar)[2])
+                continue
+            return calendar[0]
+        return None
+
+    def snapshot(self):
+        """
+        JSON-serialisable warm state: marking, pending timed firings and schedule agenda (as delays
+        from ``now``) and the random generator state. See ``warm_state``.
+        """
+        now, net, cancelled = self.now, self.net, self._cancelled
+        events = sorted((time - now, net.transition_ids[t]) for time, _, seq, t in self._calendar if seq not in cancelled)
+        version, internal, gauss = self.rng.getstate()
+        return {
+            'time': now,
+            'marking': net.marking_dict(self.marking),
+            'events': [[remaining, tid] for remaining, tid in events],
+            'agenda': [[time - now, i] for time, i in sorted(self._agenda)],
+            'schedule_entries': len(self.schedule) if self.schedule is not None else 0,
+            'debt': {net.place_ids[p]: owed for p, owed in self._debt.items()},
+            'rng': [version, list(internal), gauss],
+        }
+
+    def next_event_time(self):
+        """Time of the next scheduled timed firing, or ``None`` when the calendar is empty."""
+        event = self._next_event()
+        return None if event is None else event[0]
+
+    def step(self, until=None):
+        """
+        Fire the next transition and return it, or ``None`` on deadlock or past ``until``.
+        Schedule entries due before that firing are applied on the way.
+        """
+        index = self.index
+        while True:
+            t = index.first()
+            if t is not None and not self.net.timed[t]:
+                ties = self._ties[t]
+                if len(ties) > 1:
+                    flags = index.flags
+                    candidates = [u for u in ties if flags[u]]
+                    if len(candidates) > 1:
+                        t = self.rng.choice(candidates)
+                self._fire(t)
+                return t
+
+            event = self._next_event()
+            due = self._agenda[0][0] if self._agenda else None
+            if due is None:
+                break
+            if until is not None:
+                if due > until or (event is not None and event[0] < due):
+                    break
+            elif event is None or event[0] < due:
+                break
+            self._apply_schedule()
+
+        if event is None or (until is not None and event[0] > until):
+            return None
+        time, _, seq, t = heapq.heappop(self._calendar)
+        self._live[t].remove(seq)
+        self._fire(t, time)
+        if self.net.timed[t]:
+            self._reconcile(t)
+        return t
+
+    def run(self, until=None, max_events=None, max_instant=MAX_INSTANT):
+        """
+        Run until the clock reaches ``until``, ``max_events`` firings happened (default
+        ``MAX_EVENTS``, even with a horizon), ``max_instant`` firings happened without the clock
+        moving, the net deadlocks or an observer sets ``stop_requested``. Returns a :class:`TimedResult`.
+        """
+        if max_events is None:
+            max_events = MAX_EVENTS
+        statistics = MarkingStatistics()
+        self.stop_requested = None
+        self._observers = [statistics, *self.observers]
+        for observer in self._observers:
+            observer.start(self)
+
+        stopped = 'deadlock'
+        fired = 0
+        self.instant = 0
+        while fired < max_events:
+            if self.step(until) is None:
+                if self._next_event() is not None or (until is not None and self._agenda):
+                    stopped = 'horizon'
+                break
+            fired += 1
+            if self.instant >= max_instant:
+                stopped = 'timeless'
+                break
+            if self.stop_requested:
+                stopped = self.stop_requested
+                break
+        else:
+            stopped = 'max_events'
+
+        if stopped in ('deadlock', 'horizon') and until is not None:
+            self.now = max(self.now, until)
+        for observer in self._observers:
+            observer.finish(self)
+        self._observers = self.observers
+        return TimedResult(self, stopped, statistics)
+
+
+class TimedResult:
+    def __init__(self, sim, stopped, statistics):
+        self.net = sim.net
+        self.seed = sim.seed
+        self.time = sim.now
+        self.events = sim.events
+        self.stopped = stopped
+        self.marking = array('l', sim.marking)
+        self.counts = list(sim.counts)
+        self.statistics = statistics
+
+    def as_dict(self):
+        net = self.net
+        return {
+            'mode': 'timed',
+            'seed': self.seed,
+            'time': self.time,
+            'events': self.events,
+            'stopped': self.stopped,
+            'deadlock': self.stopped == 'deadlock',
+            'marking': net.marking_dict(self.marking),
+            'firings': {tid: n for tid, n in zip(net.transition_ids, self.counts) if n},
+            'places': self.statistics.as_dict(),
+        }
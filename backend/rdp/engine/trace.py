@@ -0,0 +1,171 @@
+import math
+import struct
+import sys
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+
+from .stats import Observer
+
+
+MAGIC = b'RDPT1'
+
+
+def pack_arrays(*arrays):
+    """Serialise arrays as ``typecode, length, little-endian items`` records, zlib-compressed."""
+    chunks = [MAGIC]
+    for values in arrays:
+        if sys.byteorder != 'little':
+            values = array(values.typecode, values)
+            values.byteswap()
+        chunks.append(struct.pack('<cQ', values.typecode.encode(), len(values)))
+        chunks.append(values.tobytes())
+    return zlib.compress(b''.join(chunks))
+
+
+def unpack_arrays(data):
+    data = zlib.decompress(bytes(data))
+    if not data.startswith(MAGIC):
+        raise ValueError('Not a packed trace')
+    arrays, offset = [], len(MAGIC)
+    while offset < len(data):
+        typecode, length = struct.unpack_from('<cQ', data, offset)
+        offset += struct.calcsize('<cQ')
+        values = array(typecode.decode())
+        end = offset + length * values.itemsize
+        values.frombytes(data[offset:end])
+        if sys.byteorder != 'little':
+            values.byteswap()
+        arrays.append(values)
+        offset = end
+    return arrays
+
+
+class TraceRecorder(Observer):
+    """
+    Records a run as full marking checkpoints every ``interval`` firings plus, per firing, the
+    transition, the clock (timed engines) and the new token count of each place it changed.
+    Memory is a few machine words per firing instead of a marking per firing. Schedule entries
+    are recorded like firings of transition ``-1``.
+    """
+
+    def __init__(self, interval=1000):
+        if interval < 1:
+            raise ValueError('interval must be >= 1')
+        self.interval = interval
+
+    def start(self, sim):
+        self.net = sim.net
+        self.timed = sim.timed
+        self.checkpoints = array('q', sim.marking)
+        self.transitions = array('q')
+        self.times = array('d')
+        self.delta_ptr = array('q', [0])
+        self.delta_place = array('q')
+        self.delta_value = array('q')
+
+    def on_schedule(self, sim, changed):
+        self.on_fire(sim, -1, changed)
+
+    def on_fire(self, sim, t, changed):
+        marking = sim.marking
+        self.transitions.append(t)
+        if self.timed:
+            self.times.append(sim.now)
+        place, value = self.delta_place, self.delta_value
+        for p in changed:
+            place.append(p)
+            value.append(marking[p])
+        self.delta_ptr.append(len(place))
+        if len(self.transitions) % self.interval == 0:
+            self.checkpoints.extend(iter(marking))  # typecodes differ, so not the array fast path
+
+    def trace(self):
+        return Trace(
+            self.net.place_ids, self.net.transition_ids, self.interval, self.checkpoints,
+            self.transitions, self.times if self.timed else None,
+            self.delta_ptr, self.delta_place, self.delta_value,
+        )
+
+
+class Trace:
+    """
+    Read side of a recorded run. Step ``k`` is the marking after ``k`` firings (0 is the
+    initial marking); it is rebuilt from the closest checkpoint, so at most ``interval``
+    deltas are replayed. Untimed runs use the step number as their clock.
+    """
+
+    def __init__(self, place_ids, transition_ids, interval, checkpoints, transitions, times,
+                 delta_ptr, delta_place, delta_value):
+        self.place_ids = tuple(place_ids)
+        self.transition_ids = tuple(transition_ids)
+        self.interval = interval
+        self.checkpoints = checkpoints
+        self.transitions = transitions
+        self.times = times
+        self.delta_ptr = delta_ptr
+        self.delta_place = delta_place
+        self.delta_value = delta_value
+
+    def __len__(self):
+        return len(self.transitions)
+
+    @property
+    def timed(self):
+        return self.times is not None
+
+    def to_bytes(self):
+        """``(checkpoints, deltas)`` blobs for storage."""
+        header = array('q', [self.interval, len(self.place_ids)])
+        checkpoints = pack_arrays(header, self.checkpoints)
+        times = self.times if self.timed else array('d')
+        deltas = pack_arrays(self.transitions, times, self.delta_ptr, self.delta_place, self.delta_value)
+        return checkpoints, deltas
+
+    @classmethod
+    def from_bytes(cls, place_ids, transition_ids, checkpoints, deltas, timed):
+        header, marks = unpack_arrays(checkpoints)
+        transitions, times, ptr, place, value = unpack_arrays(deltas)
+        return cls(place_ids, transition_ids, header[0], marks, transitions, times if timed else None,
+                   ptr, place, value)
+
+    def marking_at(self, step):
+        if not 0 <= step <= len(self):
+            raise IndexError(f"step {step} outside 0..{len(self)}")
+        size = len(self.place_ids)
+        c = step // self.interval
+        marking = self.checkpoints[c * size:(c + 1) * size]
+        ptr, place, value = self.delta_ptr, self.delta_place, self.delta_value
+        for i in range(ptr[c * self.interval], ptr[step]):
+            marking[place[i]] = value[i]
+        return marking
+
+    def time_of(self, step):
+        if not self.timed:
+            return float(step)
+        return self.times[step - 1] if step else 0.0
+
+    def step_at(self, time):
+        """Number of firings that happened at or before ``time``."""
+        if not self.timed:
+            return max(0, min(len(self), int(time)))
+        return bisect_right(self.times, time)
+
+    def firings(self, start, end, limit=None):
+        """Firings with ``start <= time <= end`` (steps for untimed runs), oldest first."""
+        if self.timed:
+            first, last = bisect_left(self.times, start), bisect_right(self.times, end)
+        else:
+            first, last = max(0, math.ceil(start) - 1), max(0, min(len(self), math.floor(end)))
+        if limit is not None:
+            last = min(last, first + limit)
+        ptr, place, value = self.delta_ptr, self.delta_place, self.delta_value
+        return [
+            {
+                'step': i + 1,
+                'time': self.times[i] if self.timed else float(i + 1),
+                'transition': self.transition_ids[self.transitions[i]] if self.transitions[i] >= 0 else None,
+                'changed': {self.place_ids[place[j]]: value[j] for j in range(ptr[i], ptr[i + 1])},
+            }
+            for i in range(first, last)
+        ]
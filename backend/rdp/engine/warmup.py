@@ -0,0 +1,135 @@
+import math
+
+from .stats import Observer, confidence_interval
+
+
+def mser(values, batch=5):
+    """
+    MSER-``batch`` warm-up truncation (White, 1997): number of leading ``values`` to discard, chosen
+    to minimise the squared standard error of the remaining mean. Values are first averaged in
+    batches of ``batch``; at most half of the batches are ever truncated.
+    """
+    batches = [
+        math.fsum(values[i:i + batch]) / batch for i in range(0, len(values) - len(values) % batch, batch)
+    ]
+    n = len(batches)
+    if n < 2:
+        return 0
+    # Suffix sums make every candidate truncation O(1)
+    total = total_sq = 0.0
+    best, best_d = None, 0
+    for d in range(n - 1, -1, -1):
+        total += batches[d]
+        total_sq += batches[d] * batches[d]
+        if d > n // 2:
+            continue
+        k = n - d
+        mean = total / k
+        statistic = max(0.0, total_sq - k * mean * mean) / (k * k)
+        if best is None or statistic <= best:
+            best, best_d = statistic, d
+    return best_d * batch
+
+
+class SteadyStateMonitor(Observer):
+    """
+    Window means of the marking of ``places`` (ids), every ``window`` time units, with MSER-5
+    warm-up truncation. With ``relative_width`` set, the run is stopped (``stop_requested``) as soon
+    as every place's steady-state mean is known to that relative confidence-interval half-width,
+    using batches of five windows past the truncation point as the independent samples.
+    ``min_batches`` guards against stopping on a handful of lucky batches.
+    """
+
+    BATCH = 5
+
+    def __init__(self, places, window, relative_width=None, confidence=0.95, min_batches=10):
+        if window <= 0:
+            raise ValueError('window must be positive')
+        self.place_ids = list(places)
+        self.window = window
+        self.relative_width = relative_width
+        self.confidence = confidence
+        self.min_batches = min_batches
+
+    def start(self, sim):
+        net = sim.net
+        unknown = [pid for pid in self.place_ids if pid not in net.place_index]
+        if unknown:
+            raise ValueError(f"Unknown places: {', '.join(unknown)}")
+        self.places = [net.place_index[pid] for pid in self.place_ids]
+        self.tracked = {p: k for k, p in enumerate(self.places)}
+        self.start_time = sim.now
+        self.window_end = sim.now + self.window
+        self.current = [sim.marking[p] for p in self.places]
+        self.last = [sim.now] * len(self.places)
+        self.area = [0.0] * len(self.places)
+        self.series = [[] for _ in self.places]
+        self.precise = False
+        self.next_check = self.BATCH * self.min_batches
+
+    def _advance(self, sim):
+        while sim.now >= self.window_end:
+            end = self.window_end
+            for k in range(len(self.places)):
+                self.area[k] += self.current[k] * (end - self.last[k])
+                self.last[k] = end
+                self.series[k].append(self.area[k] / self.window)
+                self.area[k] = 0.0
+            self.window_end = end + self.window
+            if self.relative_width is not None and len(self.series[0]) >= self.next_check:
+                # Checkpoints grow by ~10%, so re-estimating stays linear overall on long runs
+                windows = len(self.series[0])
+                self.next_check = windows + max(self.BATCH, windows // 10 // self.BATCH * self.BATCH)
+                self.precise = all(estimate['precise'] for estimate in self.estimates())
+                if self.precise:
+                    sim.stop_requested = 'precision'
+
+    def on_schedule(self, sim, changed):
+        self._advance(sim)
+        now, marking, tracked = sim.now, sim.marking, self.tracked
+        for p in changed:
+            k = tracked.get(p)
+            if k is not None:
+                self.area[k] += self.current[k] * (now - self.last[k])
+                self.last[k] = now
+                self.current[k] = marking[p]
+
+    def on_fire(self, sim, t, changed):
+        self.on_schedule(sim, changed)
+
+    def finish(self, sim):
+        self._advance(sim)
+
+    def estimates(self):
+        estimates = []
+        for series in self.series:
+            truncated = mser(series, self.BATCH)
+            kept = series[truncated:]
+            batches = [
+                math.fsum(kept[i:i + self.BATCH]) / self.BATCH
+                for i in range(0, len(kept) - len(kept) % self.BATCH, self.BATCH)
+            ]
+            interval = confidence_interval(batches, self.confidence)
+            half_width, mean = interval['half_width'], interval['mean']
+            precise = (
+                half_width is not None and len(batches) >= self.min_batches and self.relative_width is not None
+                and half_width <= self.relative_width * abs(mean)
+            )
+            estimates.append({
+                'warmup_time': truncated * self.window,
+                'windows': len(series),
+                'batches': len(batches),
+                **interval,
+                'relative_width': half_width / abs(mean) if half_width is not None and mean else None,
+                'precise': precise,
+            })
+        return estimates
+
+    def as_dict(self):
+        estimates = self.estimates()
+        return {
+            'window': self.window,
+            'warmup_time': max((e['warmup_time'] for e in estimates), default=0.0),
+            'precise': self.precise,
+            'places': dict(zip(self.place_ids, estimates)),
+        }
@@ -0,0 +1,272 @@
+"""
+Whole-net import/export as a stream of records, one per line (NDJSON) or per msgpack object:
+
+    {"kind": "net", "format": 2, "name": "Urgences", "theme": 3}
+    {"kind": "layer", "name": "Maternité"}
+    {"kind": "place", "id_in_net": "p1", "label": "File", "position": {"x": 0, "y": 0}, "layer": "Maternité", ...}
+    {"kind": "transition", ...}
+    {"kind": "arc", ...}
+
+Neither side ever holds the whole net in memory: exports iterate the tables with ``.iterator()`` and
+imports ``bulk_create`` in chunks as records arrive. Layers belong to the theme, so nodes name theirs
+and ``layer`` records for the layers in use come before any node. ``clone_subnet`` replicates part of
+a net (a maternity room, an operating theatre) the same way.
+"""
+import json
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+
+from .models import Theme, Layer, PetriNet, Place, Transition, Arc
+
+try:
+    import msgpack
+except ImportError:  # optional, only needed for the binary variant
+    msgpack = None
+
+FORMAT_VERSION = 2
+SUPPORTED_FORMATS = (1, 2)  # 1: no layers
+NDJSON = 'application/x-ndjson'
+MSGPACK = 'application/x-msgpack'
+
+MODELS = {'place': Place, 'transition': Transition, 'arc': Arc}
+FIELDS = {
+    'place': ('id_in_net', 'label', 'position', 'tokens', 'colored_tokens', 'capacity', 'token_color'),
+    'transition': (
+        'id_in_net', 'label', 'position', 'type', 'delay_mean', 'delay_distribution', 'priority', 'orientation'
+    ),
+    'arc': (
+        'id_in_net', 'source_id', 'target_id', 'control_points', 'weight', 'is_inhibitor', 'is_reset',
+        'color', 'guard', 'source_direction', 'mode'
+    ),
+}
+LAYERED = ('place', 'transition')
+
+
+class NetImportError(ValueError):
+    def __init__(self, message, record=None):
+        super().__init__(message)
+        self.message = message
+        self.record = record
+
+    def as_dict(self):
+        error = {'error': self.message}
+        if self.record is not None:
+            error['record'] = self.record
+        return error
+
+
+def export_records(petri_net, chunk_size=2000):
+    yield {'kind': 'net', 'format': FORMAT_VERSION, 'name': petri_net.name, 'theme': petri_net.theme_id}
+    used = Layer.objects.filter(Q(places__petri_net=petri_net) | Q(transitions__petri_net=petri_net))
+    for name in used.order_by('name').values_list('name', flat=True).distinct():
+        yield {'kind': 'layer', 'name': name}
+    for kind, model in MODELS.items():
+        fields = FIELDS[kind] + ('layer__name',) if kind in LAYERED else FIELDS[kind]
+        rows = model.objects.filter(petri_net=petri_net).order_by('id_in_net').values(*fields)
+        for row in rows.iterator(chunk_size=chunk_size):
+            if kind in LAYERED:
+                row['layer'] = row.pop('layer__name')
+            row['kind'] = kind
+            yield row
+
+
+def encode_ndjson(records):
+    for record in records:
+        yield json.dumps(record, separators=(',', ':')) + '\n'
+
+
+def encode_msgpack(records):
+    for record in records:
+        yield msgpack.packb(record, use_bin_type=True)
+
+
+def decode_ndjson(stream):
+    for number, line in enumerate(iter(stream.readline, b''), 1):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                raise NetImportError(f"Invalid JSON on line {number}: {e}")
+
+
+def decode_msgpack(stream):
+    try:
+        yield from msgpack.Unpacker(stream, raw=False)
+    except (ValueError, msgpack.UnpackException) as e:
+        raise NetImportError(f"Invalid msgpack stream: {e}")
+
+
+def decode_document(stream):
+    """The editor's "Export JSON" file, ``{"places": [...], "transitions": [...], "arcs": [...]}``."""
+    try:
+        document = json.load(stream)
+    except ValueError as e:
+        raise NetImportError(f"Invalid JSON: {e}")
+    if not isinstance(document, dict):
+        raise NetImportError('Expected a JSON object')
+    yield {'kind': 'net', 'format': FORMAT_VERSION, 'name': document.get('name')}
+    for row in document.get('layers') or []:
+        yield {**row, 'kind': 'layer'}
+    for kind in MODELS:
+        for row in document.get(f'{kind}s') or []:
+            yield {**row, 'kind': kind}
+
+
+def import_net(records, theme=None, name=None, chunk_size=1000):
+    """
+    Create a net from ``records`` (the first one being the ``net`` header). ``theme``/``name`` override
+    the header. ``layer`` records create the layers the theme lacks and nodes name their layer; the
+    editor's export gives layer ids instead, kept when the layer belongs to the theme. Run it inside
+    ``transaction.atomic()``: a NetImportError half-way leaves rows behind. Returns ``(petri_net, counts)``.
+    """
+    records = iter(records)
+    header = next(records, None)
+    if not isinstance(header, dict) or header.get('kind') != 'net':
+        raise NetImportError('The document must start with a {"kind": "net"} record', 0)
+    if header.get('format', FORMAT_VERSION) not in SUPPORTED_FORMATS:
+        raise NetImportError(f"Unsupported format {header['format']!r}", 0)
+
+    theme = theme if theme is not None else header.get('theme')
+    name = name or header.get('name')
+    if not name:
+        raise NetImportError('A net name is required')
+    try:
+        theme = theme if isinstance(theme, Theme) else Theme.objects.get(pk=int(theme))
+    except (TypeError, ValueError, Theme.DoesNotExist):
+        raise NetImportError(f"Theme {theme!r} not found")
+    if PetriNet.objects.filter(theme=theme, name=name).exists():
+        raise NetImportError(f"A net named {name!r} already exists in theme {theme.name!r}")
+    petri_net = PetriNet.objects.create(name=name, theme=theme)
+
+    pending = {kind: [] for kind in MODELS}
+    seen = {kind: set() for kind in MODELS}
+    layers = {}
+
+    def layer(value, number):
+        if value is None:
+            return None
+        if isinstance(value, int) and not isinstance(value, bool):
+            # The editor's JSON export: layers of another theme have no equivalent here
+            return Layer.objects.filter(theme=theme, pk=value).first()
+        if not isinstance(value, str) or value not in layers:
+            raise NetImportError(f"Unknown layer {value!r}", number)
+        return layers[value]
+
+    def flush(kind):
+        if kind != 'arc':
+            for obj in pending[kind]:
+                obj.locate()
+        MODELS[kind].objects.bulk_create(pending[kind])
+        pending[kind].clear()
+
+    for number, record in enumerate(records, 1):
+        kind = record.get('kind') if isinstance(record, dict) else None
+        if kind == 'layer':
+            layer_name = record.get('name')
+            if not isinstance(layer_name, str) or not layer_name or len(layer_name) > 100:
+                raise NetImportError(f"Invalid layer name {layer_name!r}", number)
+            layers[layer_name], _ = Layer.objects.get_or_create(theme=theme, name=layer_name)
+            continue
+        if kind not in MODELS:
+            raise NetImportError(f"Unknown record kind {kind!r}", number)
+        fields = {f: record[f] for f in FIELDS[kind] if f in record}
+        if kind in LAYERED:
+            fields['layer'] = layer(record.get('layer'), number)
+        obj = MODELS[kind](petri_net=petri_net, **fields)
+        try:
+            obj.full_clean(exclude=['petri_net'], validate_unique=False, validate_constraints=False)
+        except DjangoValidationError as e:
+            raise NetImportError(e.message_dict, number)
+        if obj.id_in_net in seen[kind]:
+            raise NetImportError(f"Duplicate {kind} {obj.id_in_net!r}", number)
+        seen[kind].add(obj.id_in_net)
+        pending[kind].append(obj)
+        if len(pending[kind]) >= chunk_size:
+            flush(kind)
+
+    for kind in MODELS:
+        flush(kind)
+    petri_net.resolve_arcs()
+    return petri_net, {'layers': len(layers), **{f'{kind}s': len(ids) for kind, ids in seen.items()}}
+
+
+class SubnetCloneError(ValueError):
+    pass
+
+
+def _shift(point, dx, dy):
+    if isinstance(point, dict) and isinstance(point.get('x'), (int, float)) and isinstance(point.get('y'), (int, float)):
+        return {**point, 'x': point['x'] + dx, 'y': point['y'] + dy}
+    return point
+
+
+def clone_subnet(petri_net, nodes, copies, find='', replace='_{n}', start=2, offset=None, external_arcs=False):
+    """
+    Copy the places and transitions named in ``nodes``, with the arcs between them, ``copies``
+    times in three ``bulk_create`` calls. Copy ``n`` (``start``, ``start + 1``...) renames ids and
+    labels by replacing ``find`` with ``replace.format(n=n)``, or appending it when ``find`` does
+    not occur, and moves positions by ``n - start + 1`` times ``offset``; copies stay in the
+    layer of their original. Arcs crossing the selection boundary are left out unless
+    ``external_arcs`` is set: then arcs from a cloned node to a shared one (a common queue, the
+    midwives pool) are copied too, still pointing at the shared node. Run it inside ``transaction.atomic()``.
+    Returns ``{original id: [copy ids]}``.
+    """
+    def rename(value, n):
+        suffix = replace.format(n=n)
+        return value.replace(find, suffix) if find and find in value else value + suffix
+
+    selected = set(nodes)
+    rows = {
+        kind: list(
+            MODELS[kind].objects.filter(petri_net=petri_net, id_in_net__in=selected).values(*FIELDS[kind], 'layer_id')
+        )
+        for kind in ('place', 'transition')
+    }
+    missing = selected - {row['id_in_net'] for kind_rows in rows.values() for row in kind_rows}
+    if missing:
+        raise SubnetCloneError(f"Unknown nodes: {', '.join(sorted(missing))}")
+    arc_filter = Q(source_id__in=selected) | Q(target_id__in=selected) if external_arcs else (
+        Q(source_id__in=selected) & Q(target_id__in=selected))
+    rows['arc'] = list(Arc.objects.filter(arc_filter, petri_net=petri_net).values(*FIELDS['arc']))
+
+    dx, dy = (offset or {}).get('x', 0), (offset or {}).get('y', 0)
+    objects = {kind: [] for kind in MODELS}
+    copied = {node: [] for node in sorted(selected)}
+    for k, n in enumerate(range(start, start + copies), 1):
+        for kind in ('place', 'transition'):
+            for row in rows[kind]:
+                new_id = rename(row['id_in_net'], n)
+                copied[row['id_in_net']].append(new_id)
+                objects[kind].append(MODELS[kind](
+                    petri_net=petri_net,
+                    **{**row, 'id_in_net': new_id, 'label': rename(row['label'], n),
+                       'position': _shift(row['position'], dx * k, dy * k)},
+                ))
+        for row in rows['arc']:
+            points = row['control_points']
+            objects['arc'].append(Arc(
+                petri_net=petri_net,
+                **{**row, 'id_in_net': rename(row['id_in_net'], n),
+                   'source_id': rename(row['source_id'], n) if row['source_id'] in selected else row['source_id'],
+                   'target_id': rename(row['target_id'], n) if row['target_id'] in selected else row['target_id'],
+                   'control_points': [_shift(p, dx * k, dy * k) for p in points] if isinstance(points, list) else points},
+            ))
+
+    for kind, model in MODELS.items():
+        ids = [obj.id_in_net for obj in objects[kind]]
+        if len(set(ids)) != len(ids):
+            raise SubnetCloneError(f"The renaming rule gives several {kind}s the same id")
+        taken = sorted(set(ids).intersection(
+            model.objects.filter(petri_net=petri_net).values_list('id_in_net', flat=True).iterator()
+        ))[:10]
+        if taken:
+            raise SubnetCloneError(f"Ids already used by {kind}s: {', '.join(taken)}")
+
+    for kind, model in MODELS.items():
+        if kind != 'arc':
+            for obj in objects[kind]:
+                obj.locate()
+        model.objects.bulk_create(objects[kind], batch_size=1000)
+    petri_net.resolve_arcs(names=[i for ids in copied.values() for i in ids])
+    return copied
@@ -0,0 +1,56 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from rdp import benchmarks
+
+
+class Command(BaseCommand):
+    help = "Benchmark the simulation engine on synthetic hospital nets and compare with a baseline"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'scenarios', nargs='*', default=list(benchmarks.SCENARIOS),
+            help="Scenarios to run: 'admission' or 'hospital-N' (N blocks) (default: %(default)s)",
+        )
+        parser.add_argument('--steps', type=int, default=20_000, help="Firings per simulation measurement")
+        parser.add_argument('--max-states', type=int, default=2_000, help="States per exploration measurement")
+        parser.add_argument('--repeat', type=int, default=3, help="Keep the best of this many runs")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('-o', '--output', help="Write the JSON results to this file (e.g. to store a baseline)")
+        parser.add_argument('--baseline', help="Results file to compare against; regressions make the command fail")
+        parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed relative slowdown (default: 0.2)")
+
+    def handle(self, *args, **options):
+        try:
+            results = benchmarks.run_benchmarks(
+                options['scenarios'],
+                steps=options['steps'],
+                max_states=options['max_states'],
+                repeat=options['repeat'],
+                seed=options['seed'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        payload = json.dumps(results, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(payload)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+        else:
+            self.stdout.write(payload)
+
+        if options['baseline']:
+            try:
+                baseline = benchmarks.load(options['baseline'])
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Cannot read baseline: {e}")
+            regressions = benchmarks.compare(results, baseline, options['tolerance'])
+            for r in regressions:
+                self.stderr.write(
+                    f"{r['scenario']} {r['metric']}: {r['baseline']:.4g} -> {r['value']:.4g} ({r['change']:+.0%})"
+                )
+            if regressions:
+                raise CommandError(f"{len(regressions)} benchmark regression(s) beyond {options['tolerance']:.0%}")
+            self.stdout.write(self.style.SUCCESS("No regression against the baseline"))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from rdp.models import PetriNet, Place, Transition
+from rdp.signals import bump_version
+
+
+class Command(BaseCommand):
+    help = "Fill the grid cells of existing places and transitions so viewport queries find them"
+
+    def add_arguments(self, parser):
+        parser.add_argument('petri_nets', type=int, nargs='*', help="PetriNet ids (default: every net)")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        nets = PetriNet.objects.order_by('pk')
+        if options['petri_nets']:
+            nets = nets.filter(pk__in=options['petri_nets'])
+            missing = set(options['petri_nets']) - set(nets.values_list('pk', flat=True))
+            if missing:
+                raise CommandError(f"PetriNet {', '.join(map(str, sorted(missing)))} not found")
+
+        for petri_net_id in nets.values_list('pk', flat=True):
+            moved = 0
+            for model in (Place, Transition):
+                stale = []
+                for node in model.objects.filter(petri_net_id=petri_net_id).only('pk', 'position', 'grid_x', 'grid_y'):
+                    cell = node.grid_x, node.grid_y
+                    node.locate()
+                    if (node.grid_x, node.grid_y) != cell:
+                        stale.append(node)
+                model.objects.bulk_update(stale, ['grid_x', 'grid_y'], batch_size=options['batch_size'])
+                moved += len(stale)
+            if moved:
+                # bulk_update skips the signals: drop the cached payloads of the net
+                bump_version(petri_net_id)
+            self.stdout.write(f"PetriNet {petri_net_id}: {moved} nodes indexed")
@@ -0,0 +1,116 @@
+import json
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+
+from rdp.engine import optimize
+from rdp.engine.loader import load_compiled_net, load_schedule
+from rdp.models import PetriNet, Schedule
+
+
+TARGET = re.compile(r'^(?P<node>[^:]+):(?P<metric>\w+)(?P<op><=|>=)(?P<value>[-+.\deE]+)$')
+
+
+def resource(value):
+    """``Medecins_Generaux_libres=2:8`` (inclusive range) or ``=2,4,6`` (levels)."""
+    name, _, levels = value.partition('=')
+    try:
+        if ':' in levels:
+            low, high = (int(x) for x in levels.split(':'))
+            return name, list(range(low, high + 1))
+        return name, [int(x) for x in levels.split(',')]
+    except ValueError:
+        raise CommandError(f"Invalid resource '{value}', expected NAME=MIN:MAX or NAME=A,B,C")
+
+
+def target(value):
+    """``File_Attente_Consultation:waiting_time<=20`` or ``Sortie:throughput>=0.1``."""
+    match = TARGET.match(value)
+    if not match:
+        raise CommandError(f"Invalid target '{value}', expected NODE:METRIC<=VALUE or NODE:METRIC>=VALUE")
+    kind = 'transition' if match['metric'] == 'throughput' else 'place'
+    bound = 'max' if match['op'] == '<=' else 'min'
+    return {kind: match['node'], 'metric': match['metric'], bound: float(match['value'])}
+
+
+class Command(BaseCommand):
+    help = "Search the cheapest resource levels that meet KPI targets, by successive halving over replications"
+
+    def add_arguments(self, parser):
+        parser.add_argument('petri_net', type=int, help="PetriNet id")
+        parser.add_argument('-R', '--resource', action='append', required=True,
+                            help="Resource place and levels, e.g. Medecins_Generaux_libres=2:8 (repeatable)")
+        parser.add_argument('-T', '--target', action='append', required=True,
+                            help="KPI target, e.g. File_Attente_Consultation:waiting_time<=20 (repeatable)")
+        parser.add_argument('--cost', action='append', default=[],
+                            help="Cost of one token of a resource, e.g. Salles_Operation_libres=5 (default: 1)")
+        parser.add_argument('--until', type=float, required=True, help="Simulated horizon of each replication")
+        parser.add_argument('--warmup', type=float, default=0.0,
+                            help="Leading time of each replication left out of the targets")
+        parser.add_argument('--min-replications', type=int, default=4)
+        parser.add_argument('--max-replications', type=int, default=64)
+        parser.add_argument('--eta', type=int, default=2, help="Keep 1/eta of the candidates per round")
+        parser.add_argument('--seed', type=int, default=None)
+        parser.add_argument('--max-events', type=int, default=None)
+        parser.add_argument('--server', choices=['single', 'infinite'], default='single')
+        parser.add_argument('--schedule', type=int, default=None, help="Schedule id of the net")
+        parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: one per CPU)")
+        parser.add_argument('--confidence', type=float, default=0.95)
+        parser.add_argument('--monotone', action='store_true',
+                            help="Assume that more resources never worsen the KPIs (prunes below infeasible levels)")
+        parser.add_argument('-o', '--output', help="Write the JSON result to this file instead of stdout")
+
+    def handle(self, *args, **options):
+        try:
+            petri_net = PetriNet.objects.get(pk=options['petri_net'])
+        except PetriNet.DoesNotExist:
+            raise CommandError(f"PetriNet {options['petri_net']} not found")
+
+        costs = {}
+        for value in options['cost']:
+            name, _, cost = value.partition('=')
+            try:
+                costs[name] = float(cost)
+            except ValueError:
+                raise CommandError(f"Invalid cost '{value}', expected NAME=COST")
+
+        net = load_compiled_net(petri_net)
+        try:
+            result = optimize(
+                net,
+                dict(resource(value) for value in options['resource']),
+                [target(value) for value in options['target']],
+                options['until'],
+                costs=costs,
+                min_replications=options['min_replications'],
+                max_replications=options['max_replications'],
+                eta=options['eta'],
+                seed=options['seed'],
+                max_events=options['max_events'],
+                server=options['server'],
+                schedule=load_schedule(petri_net, options['schedule'], net),
+                workers=options['workers'],
+                confidence=options['confidence'],
+                monotone=options['monotone'],
+                warmup=options['warmup'],
+            )
+        except Schedule.DoesNotExist:
+            raise CommandError(f"Schedule {options['schedule']} not found on this net")
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        payload = json.dumps(result, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(payload)
+        else:
+            self.stdout.write(payload)
+        best = result['best']
+        if best is None:
+            self.stderr.write("No configuration meets the targets")
+        else:
+            verdict = 'meets the targets' if result['proven'] else 'is the closest, not proven to meet the targets'
+            self.stderr.write(
+                f"{best['marking']} (cost {best['cost']:g}) {verdict}; "
+                f"{result['runs']} replications instead of {result['grid_runs']} for the full grid"
+            )
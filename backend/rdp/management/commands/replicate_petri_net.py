@@ -0,0 +1,52 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from rdp.engine import replicate
+from rdp.engine.loader import load_compiled_net
+from rdp.models import PetriNet
+
+
+class Command(BaseCommand):
+    help = "Run seeded Monte Carlo replications of a Petri net across a process pool"
+
+    def add_arguments(self, parser):
+        parser.add_argument('petri_net', type=int, help="PetriNet id")
+        parser.add_argument('--until', type=float, required=True, help="Simulated horizon of each replication")
+        parser.add_argument('-r', '--replications', type=int, default=30)
+        parser.add_argument('--seed', type=int, default=None)
+        parser.add_argument('--max-events', type=int, default=None)
+        parser.add_argument('--server', choices=['single', 'infinite'], default='single')
+        parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: one per CPU)")
+        parser.add_argument('--confidence', type=float, default=0.95)
+        parser.add_argument('-o', '--output', help="Write the JSON summary to this file instead of stdout")
+
+    def handle(self, *args, **options):
+        try:
+            petri_net = PetriNet.objects.get(pk=options['petri_net'])
+        except PetriNet.DoesNotExist:
+            raise CommandError(f"PetriNet {options['petri_net']} not found")
+
+        try:
+            summary = replicate(
+                load_compiled_net(petri_net),
+                options['replications'],
+                seed=options['seed'],
+                until=options['until'],
+                max_events=options['max_events'],
+                server=options['server'],
+                workers=options['workers'],
+                confidence=options['confidence'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        payload = json.dumps(summary, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(payload)
+            self.stdout.write(self.style.SUCCESS(
+                f"{summary['replications']} replications written to {options['output']}"
+            ))
+        else:
+            self.stdout.write(payload)
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from rdp.models import PetriNet
+from rdp.signals import bump_version
+
+
+class Command(BaseCommand):
+    help = "Point existing arcs at the places and transitions their source_id/target_id name"
+
+    def add_arguments(self, parser):
+        parser.add_argument('petri_nets', type=int, nargs='*', help="PetriNet ids (default: every net)")
+
+    def handle(self, *args, **options):
+        nets = PetriNet.objects.order_by('pk')
+        if options['petri_nets']:
+            nets = nets.filter(pk__in=options['petri_nets'])
+            missing = set(options['petri_nets']) - set(nets.values_list('pk', flat=True))
+            if missing:
+                raise CommandError(f"PetriNet {', '.join(map(str, sorted(missing)))} not found")
+
+        for petri_net in nets.only('pk'):
+            petri_net.resolve_arcs()
+            # update() skips the signals: drop the cached payloads of the net
+            bump_version(petri_net.pk)
+            unresolved = petri_net.arcs.filter(source_place=None, source_transition=None).count()
+            message = f"PetriNet {petri_net.pk}: arcs resolved"
+            if unresolved:
+                message += f" ({unresolved} dangling)"
+            self.stdout.write(message)
@@ -1,7 +1,28 @@
+import math
+
 from django.db import models
+from django.db.models import Exists, OuterRef, Q, Subquery
+from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
 
 
+def validate_colored_tokens(value):
+    """``{colour: count}`` with non-negative integer counts."""
+    if not isinstance(value, dict):
+        raise ValidationError('Expected an object mapping colours to token counts.')
+    for color, count in value.items():
+        if not color or len(color) > 50:
+            raise ValidationError(f"Invalid colour {color!r}.")
+        if not isinstance(count, int) or isinstance(count, bool) or count < 0:
+            raise ValidationError(f"Token count of {color!r} must be a non-negative integer.")
+
+
+def validate_guard(value):
+    """List of the colours an arc lets through."""
+    if not isinstance(value, list) or not all(isinstance(c, str) and c and len(c) <= 50 for c in value):
+        raise ValidationError('Expected a list of colour names.')
+
+
 class Theme(models.Model):
     name = models.CharField(max_length=100, unique=True)
     description = models.TextField(blank=True)
@@ -25,50 +46,183 @@ class Layer(models.Model):
     class Meta:
         unique_together = ['name', 'theme']
         ordering = ['name']
+        indexes = [models.Index(fields=['theme', 'name'])]
 
 
 class PetriNet(models.Model):
     name = models.CharField(max_length=100)
     theme = models.ForeignKey(Theme, on_delete=models.CASCADE, related_name='petri_nets')
+    version = models.PositiveIntegerField(default=0, editable=False)  # bumped on every write to the net or its nodes
+    structure_version = models.PositiveIntegerField(default=0, editable=False)  # bumped when the compiled net changes
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f"{self.name} ({self.theme.name} - {self.layer.name})"
+        return f"{self.name} ({self.theme.name})"
+
+    def save(self, *args, **kwargs):
+        # The counters are only ever incremented in the database (see rdp.signals); writing back a
+        # stale in-memory value could hand an old cache key to new content.
+        if self.pk and not kwargs.get('force_insert') and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in ('version', 'structure_version')
+            ]
+        super().save(*args, **kwargs)
+
+    def sweep(self, parameters, steps=1000, policy='first', seed=None):
+        """
+        Simulate every combination of initial tokens in ``parameters``
+        (``{'Medecins_Generaux_libres': range(2, 9), ...}``) in lockstep with NumPy.
+        """
+        from rdp.engine.loader import load_compiled_net
+        from rdp.engine.vectorized import sweep
+
+        return sweep(load_compiled_net(self), parameters, steps=steps, policy=policy, seed=seed)
+
+    def resolve_arcs(self, names=None):
+        """
+        Point every arc at the nodes its ``source_id``/``target_id`` name, in three queries
+        whatever the size of the net (for writes that bypass ``Arc.save``, e.g. bulk_create).
+        ``names`` limits it to the arcs touching those node ids. Arcs that do not join a place
+        and a transition are left unresolved.
+        """
+        places = Place.objects.filter(petri_net=OuterRef('petri_net'))
+        transitions = Transition.objects.filter(petri_net=OuterRef('petri_net'))
+
+        def pk_of(nodes, field):
+            return Subquery(nodes.filter(id_in_net=OuterRef(field)).values('pk')[:1])
+
+        consuming = Q(Exists(places.filter(id_in_net=OuterRef('source_id')))) & Q(
+            Exists(transitions.filter(id_in_net=OuterRef('target_id'))))
+        producing = Q(Exists(transitions.filter(id_in_net=OuterRef('source_id')))) & Q(
+            Exists(places.filter(id_in_net=OuterRef('target_id'))))
+        arcs = Arc.objects.filter(petri_net=self)
+        if names is not None:
+            arcs = arcs.filter(Q(source_id__in=names) | Q(target_id__in=names))
+        arcs.filter(consuming).update(
+            source_place=pk_of(places, 'source_id'), target_transition=pk_of(transitions, 'target_id'),
+            source_transition=None, target_place=None,
+        )
+        arcs.filter(producing & ~consuming).update(
+            source_transition=pk_of(transitions, 'source_id'), target_place=pk_of(places, 'target_id'),
+            source_place=None, target_transition=None,
+        )
+        arcs.filter(~consuming & ~producing).update(
+            source_place=None, source_transition=None, target_place=None, target_transition=None,
+        )
 
     class Meta:
         unique_together = ['name', 'theme']
         ordering = ['name']
 
 
-class Place(models.Model):
+# Side of the square cells that bucket node positions for viewport queries, in editor units
+GRID_CELL = 500.0
+
+
+def grid_cell(position):
+    """``(column, row)`` of the cell holding ``position``, or ``None`` when it has no numeric x/y."""
+    if not isinstance(position, dict):
+        return None
+    x, y = position.get('x'), position.get('y')
+    if not all(isinstance(v, (int, float)) and not isinstance(v, bool) and math.isfinite(v) for v in (x, y)):
+        return None
+    return math.floor(x / GRID_CELL), math.floor(y / GRID_CELL)
+
+
+class GridIndexedMixin:
+    """
+    Keeps ``grid_x``/``grid_y`` (the ``GRID_CELL`` holding ``position``) in step with the position,
+    so a bounding box is an indexed range query instead of a scan of every node's JSON.
+    Writes that bypass ``save`` (bulk_create) must call ``locate()`` first.
+    """
+
+    def locate(self):
+        self.grid_x, self.grid_y = grid_cell(self.position) or (None, None)
+
+    def save(self, *args, **kwargs):
+        self.locate()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'position' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'grid_x', 'grid_y'}
+        super().save(*args, **kwargs)
+
+
+class StructuralSnapshotMixin:
+    """
+    Remembers the engine-relevant fields (``STRUCTURAL_FIELDS``) as loaded from the database,
+    so a save can tell a structural edit from a cosmetic one (label, position, tokens...).
+    """
+    STRUCTURAL_FIELDS = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._structure = instance.structure()
+        return instance
+
+    def structure(self):
+        # __dict__ rather than getattr: deferred fields (``.only()``) must not trigger a query
+        return tuple(self.__dict__.get(self._meta.get_field(name).attname) for name in self.STRUCTURAL_FIELDS)
+
+    def structure_changed(self):
+        return getattr(self, '_structure', None) != self.structure()
+
+
+class Place(GridIndexedMixin, StructuralSnapshotMixin, models.Model):
+    STRUCTURAL_FIELDS = ('id_in_net', 'capacity')
+
     petri_net = models.ForeignKey(PetriNet, on_delete=models.CASCADE, related_name='places')
+    layer = models.ForeignKey(Layer, on_delete=models.SET_NULL, null=True, blank=True, related_name='places')
     id_in_net = models.CharField(max_length=50)  # ex: p123
     label = models.CharField(max_length=100)
     position = models.JSONField()  # {x: float, y: float}
+    grid_x = models.IntegerField(null=True, blank=True, editable=False)
+    grid_y = models.IntegerField(null=True, blank=True, editable=False)
     tokens = models.IntegerField(default=0, validators=[MinValueValidator(0)])
     capacity = models.IntegerField(null=True, blank=True)
     token_color = models.CharField(max_length=7, default="#000000")  # ex: #000000
+    # Coloured marking, ex: {"urgent": 2, "normal": 5}; ``tokens`` then holds the total
+    colored_tokens = models.JSONField(null=True, blank=True, validators=[validate_colored_tokens])
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
         return f"{self.label} ({self.petri_net.name})"
 
+    def clean(self):
+        if self.colored_tokens:
+            self.tokens = sum(self.colored_tokens.values())
+
     class Meta:
         unique_together = ['petri_net', 'id_in_net']
         ordering = ['id_in_net']
+        indexes = [
+            models.Index(fields=['petri_net', 'grid_x', 'grid_y']),
+            models.Index(fields=['petri_net', 'layer', 'grid_x', 'grid_y']),
+        ]
+
 
+class Transition(GridIndexedMixin, StructuralSnapshotMixin, models.Model):
+    STRUCTURAL_FIELDS = ('id_in_net', 'type', 'delay_mean', 'delay_distribution', 'priority')
 
-class Transition(models.Model):
     petri_net = models.ForeignKey(PetriNet, on_delete=models.CASCADE, related_name='transitions')
+    layer = models.ForeignKey(Layer, on_delete=models.SET_NULL, null=True, blank=True, related_name='transitions')
     id_in_net = models.CharField(max_length=50)  # ex: t123
     label = models.CharField(max_length=100)
     position = models.JSONField()  # {x: float, y: float}
+    grid_x = models.IntegerField(null=True, blank=True, editable=False)
+    grid_y = models.IntegerField(null=True, blank=True, editable=False)
     type = models.CharField(
         max_length=20,
         choices=[('immediate', 'Immediate'), ('timed', 'Timed')],
         default='immediate'
     )
     delay_mean = models.FloatField(default=1.0, validators=[MinValueValidator(0.0)])
+    delay_distribution = models.CharField(
+        max_length=20,
+        choices=[(x, x.capitalize()) for x in ['exponential', 'deterministic', 'uniform', 'erlang', 'lognormal']],
+        default='exponential'
+    )
     priority = models.IntegerField(default=1, validators=[MinValueValidator(1)])
     orientation = models.CharField(
         max_length=20,
@@ -83,9 +237,15 @@ class Transition(models.Model):
     class Meta:
         unique_together = ['petri_net', 'id_in_net']
         ordering = ['id_in_net']
+        indexes = [
+            models.Index(fields=['petri_net', 'grid_x', 'grid_y']),
+            models.Index(fields=['petri_net', 'layer', 'grid_x', 'grid_y']),
+        ]
 
 
-class Arc(models.Model):
+class Arc(StructuralSnapshotMixin, models.Model):
+    STRUCTURAL_FIELDS = ('source_id', 'target_id', 'weight', 'is_inhibitor', 'is_reset')
+
     petri_net = models.ForeignKey(PetriNet, on_delete=models.CASCADE, related_name='arcs')
     id_in_net = models.CharField(max_length=50)
     source_id = models.CharField(max_length=50)
@@ -94,6 +254,22 @@ class Arc(models.Model):
     weight = models.IntegerField(default=1, validators=[MinValueValidator(1)])
     is_inhibitor = models.BooleanField(default=False)
     is_reset = models.BooleanField(default=False)
+    # Endpoints resolved from source_id/target_id on save: place -> transition or transition -> place
+    source_place = models.ForeignKey(
+        Place, on_delete=models.CASCADE, null=True, blank=True, editable=False, related_name='outputs'
+    )
+    source_transition = models.ForeignKey(
+        Transition, on_delete=models.CASCADE, null=True, blank=True, editable=False, related_name='outputs'
+    )
+    target_place = models.ForeignKey(
+        Place, on_delete=models.CASCADE, null=True, blank=True, editable=False, related_name='inputs'
+    )
+    target_transition = models.ForeignKey(
+        Transition, on_delete=models.CASCADE, null=True, blank=True, editable=False, related_name='inputs'
+    )
+    # Colour inscription: '' plain tokens, a colour name, or '*' for the transition's colour
+    color = models.CharField(max_length=50, blank=True, default='')
+    guard = models.JSONField(null=True, blank=True, validators=[validate_guard])  # ex: ["urgent"]
     source_direction = models.CharField(
         max_length=10,
         choices=[('HAUT', 'Haut'), ('GAUCHE', 'Gauche'), ('DROITE', 'Droite'), ('BAS', 'Bas')],
@@ -105,6 +281,118 @@ class Arc(models.Model):
     def __str__(self):
         return f"Arc {self.id_in_net} ({self.petri_net.name})"
 
+    def save(self, *args, **kwargs):
+        if self.pk is None or self.structure()[:2] != getattr(self, '_structure', (None, None))[:2]:
+            self.resolve_endpoints()
+        super().save(*args, **kwargs)
+
+    def resolve_endpoints(self):
+        """Set the endpoint references from ``source_id``/``target_id`` (``None`` when they do not resolve)."""
+        def node(model, id_in_net):
+            return model.objects.filter(petri_net_id=self.petri_net_id, id_in_net=id_in_net).first()
+
+        self.source_place = self.source_transition = self.target_place = self.target_transition = None
+        source, target = node(Place, self.source_id), node(Transition, self.target_id)
+        if source and target:
+            self.source_place, self.target_transition = source, target
+            return
+        source, target = node(Transition, self.source_id), node(Place, self.target_id)
+        if source and target:
+            self.source_transition, self.target_place = source, target
+
     class Meta:
         unique_together = ['petri_net', 'id_in_net']
-        ordering = ['id_in_net']
\ No newline at end of file
+        ordering = ['id_in_net']
+        indexes = [
+            models.Index(fields=['petri_net', 'source_id']),
+            models.Index(fields=['petri_net', 'target_id']),
+            models.Index(fields=['petri_net', 'source_place']),
+            models.Index(fields=['petri_net', 'target_place']),
+            models.Index(fields=['petri_net', 'source_transition']),
+            models.Index(fields=['petri_net', 'target_transition']),
+        ]
+
+
+class Schedule(models.Model):
+    """
+    Shift calendar of a net: token and capacity changes applied by timed simulations
+    (see ``rdp.engine.schedule`` for the entry format).
+    """
+    petri_net = models.ForeignKey(PetriNet, on_delete=models.CASCADE, related_name='schedules')
+    name = models.CharField(max_length=100)
+    # ex: [{"place": "Medecins_Generaux_libres", "action": "add", "every": 1440, "profile": [[480, 2], [1200, -2]]}]
+    entries = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.petri_net.name})"
+
+    def places(self):
+        """Ids of the places the entries act on."""
+        return sorted({entry['place'] for entry in self.entries})
+
+    class Meta:
+        unique_together = ['petri_net', 'name']
+        ordering = ['name']
+
+
+class WarmState(models.Model):
+    """
+    Marking, pending timed firings and random state of a warmed-up timed run
+    (``TimedSimulator.snapshot()``), reused as the starting point of later runs.
+    """
+    petri_net = models.ForeignKey(PetriNet, on_delete=models.CASCADE, related_name='warm_states')
+    name = models.CharField(max_length=100)
+    time = models.FloatField(default=0.0)  # simulated time of the warm-up run
+    state = models.JSONField()
+    parameters = models.JSONField(default=dict)
+    steady_state = models.JSONField(null=True, blank=True)  # rdp.engine.warmup.SteadyStateMonitor.as_dict()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.petri_net.name})"
+
+    class Meta:
+        unique_together = ['petri_net', 'name']
+        ordering = ['name']
+
+
+class SimulationRun(models.Model):
+    """
+    A recorded simulation: marking checkpoints and per-firing deltas, packed by
+    ``rdp.engine.trace`` into two compressed binary columns.
+    """
+    petri_net = models.ForeignKey(PetriNet, on_delete=models.CASCADE, related_name='runs')
+    mode = models.CharField(max_length=10, choices=[('untimed', 'Untimed'), ('timed', 'Timed')])
+    parameters = models.JSONField(default=dict)
+    steps = models.PositiveIntegerField(default=0)
+    end_time = models.FloatField(default=0.0)
+    stopped = models.CharField(max_length=20)
+    place_ids = models.JSONField()
+    transition_ids = models.JSONField()
+    checkpoints = models.BinaryField()
+    deltas = models.BinaryField()
+    kpis = models.JSONField(null=True, blank=True)  # rdp.engine.kpi.KPICollector.as_dict()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Run {self.pk} ({self.petri_net.name})"
+
+    @classmethod
+    def from_recorder(cls, petri_net, recorder, mode, parameters, stopped, end_time, kpis=None):
+        trace = recorder.trace()
+        checkpoints, deltas = trace.to_bytes()
+        return cls.objects.create(
+            petri_net=petri_net, mode=mode, parameters=parameters, steps=len(trace), end_time=end_time,
+            stopped=stopped, place_ids=list(trace.place_ids), transition_ids=list(trace.transition_ids),
+            checkpoints=checkpoints, deltas=deltas, kpis=kpis,
+        )
+
+    def trace(self):
+        from rdp.engine.trace import Trace
+
+        return Trace.from_bytes(self.place_ids, self.transition_ids, self.checkpoints, self.deltas,
+                                timed=self.mode == 'timed')
+
+    class Meta:
+        ordering = ['-created_at']
@@ -1,27 +1,71 @@
+from django.core.cache import cache
+from django.db.models import prefetch_related_objects
 from rest_framework import serializers
-from rdp.models import Theme, Layer, PetriNet, Place, Transition, Arc
+from rdp.engine import MAX_EVENTS
+from rdp.models import Theme, Layer, PetriNet, Place, Transition, Arc, Schedule, WarmState, SimulationRun
 
-class ArcSerializer(serializers.ModelSerializer):
+class DynamicFieldsMixin:
+    """Sparse fieldsets: ``Serializer(..., fields=['id_in_net', 'tokens'])`` keeps only those fields."""
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields:
+            unknown = set(fields) - set(self.fields)
+            if unknown:
+                raise serializers.ValidationError({'fields': f"Unknown fields: {', '.join(sorted(unknown))}"})
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+class ArcSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Arc
         fields = [
             'id', 'petri_net', 'id_in_net', 'source_id', 'target_id', 'control_points', 'weight',
-            'is_inhibitor', 'is_reset', 'source_direction', 'mode', 'created_at'
+            'is_inhibitor', 'is_reset', 'color', 'guard', 'source_direction', 'mode', 'created_at'
         ]
 
-class PlaceSerializer(serializers.ModelSerializer):
+def validate_layer(serializer, data):
+    """A node's layer must belong to the theme of its net."""
+    layer = data.get('layer')
+    petri_net = data.get('petri_net') or getattr(serializer.instance, 'petri_net', None)
+    if layer is not None and petri_net is not None and layer.theme_id != petri_net.theme_id:
+        raise serializers.ValidationError({'layer': "The layer belongs to another theme than the net."})
+
+class PlaceSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Place
-        fields = ['id', 'petri_net', 'id_in_net', 'label', 'position', 'tokens', 'capacity', 'token_color', 'created_at']
+        fields = [
+            'id', 'petri_net', 'layer', 'id_in_net', 'label', 'position', 'tokens', 'colored_tokens', 'capacity',
+            'token_color', 'created_at'
+        ]
+
+    def validate(self, data):
+        validate_layer(self, data)
+        # The P/T engine sees the colour-blind total
+        if data.get('colored_tokens'):
+            data['tokens'] = sum(data['colored_tokens'].values())
+        elif 'tokens' in data and 'colored_tokens' not in data and self.instance is not None:
+            # A bare total cannot be split over the colours already held
+            colored = self.instance.colored_tokens
+            if colored and data['tokens'] != sum(colored.values()):
+                raise serializers.ValidationError(
+                    {'tokens': "The place holds coloured tokens: update colored_tokens instead."}
+                )
+        return data
 
-class TransitionSerializer(serializers.ModelSerializer):
+class TransitionSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Transition
         fields = [
-            'id', 'petri_net', 'id_in_net', 'label', 'position', 'type', 'delay_mean',
-            'priority', 'orientation', 'created_at'
+            'id', 'petri_net', 'layer', 'id_in_net', 'label', 'position', 'type', 'delay_mean',
+            'delay_distribution', 'priority', 'orientation', 'created_at'
         ]
 
+    def validate(self, data):
+        validate_layer(self, data)
+        return data
+
 class PetriNetSerializer(serializers.ModelSerializer):
     places = PlaceSerializer(many=True, read_only=True)
     transitions = TransitionSerializer(many=True, read_only=True)
@@ -29,9 +73,30 @@ class PetriNetSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = PetriNet
-        fields = ['id', 'name', 'theme', 'created_at', 'places', 'transitions', 'arcs']
+        fields = ['id', 'name', 'theme', 'version', 'created_at', 'places', 'transitions', 'arcs']
+        read_only_fields = ['version']
+
+def petri_net_cache_key(petri_net):
+    # created_at guards against a deleted net's entries being served to a new net reusing its pk
+    return f"rdp:petri-net:{petri_net.pk}:{petri_net.created_at.timestamp():.6f}:v{petri_net.version}"
+
+def serialize_petri_nets(petri_nets):
+    """
+    ``PetriNetSerializer(..., many=True).data`` served from the cache where possible; the misses are
+    serialized with their nodes prefetched, so the cost is one cache round trip plus three queries at most.
+    """
+    petri_nets = list(petri_nets)
+    keys = [petri_net_cache_key(petri_net) for petri_net in petri_nets]
+    cached = cache.get_many(keys)
+    missing = [petri_net for petri_net, key in zip(petri_nets, keys) if key not in cached]
+    if missing:
+        prefetch_related_objects(missing, 'places', 'transitions', 'arcs')
+        fresh = {petri_net_cache_key(petri_net): PetriNetSerializer(petri_net).data for petri_net in missing}
+        cache.set_many(fresh)
+        cached.update(fresh)
+    return [cached[key] for key in keys]
 
-class LayerSerializer(serializers.ModelSerializer):
+class LayerSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Layer
         fields = ['id', 'name', 'theme', 'created_at']
@@ -43,8 +108,268 @@ class ThemeSerializer(serializers.ModelSerializer):
 
 class ThemeDetailSerializer(serializers.ModelSerializer):
     layers = LayerSerializer(many=True, read_only=True)
-    petri_nets = PetriNetSerializer(many=True, read_only=True)
+    petri_nets = serializers.SerializerMethodField()
 
     class Meta:
         model = Theme
-        fields = ['id', 'name', 'description', 'created_at', 'layers', 'petri_nets']
\ No newline at end of file
+        fields = ['id', 'name', 'description', 'created_at', 'layers', 'petri_nets']
+
+    def get_petri_nets(self, theme):
+        return serialize_petri_nets(theme.petri_nets.all())
+
+class ScheduleEntrySerializer(serializers.Serializer):
+    place = serializers.CharField(max_length=50)
+    action = serializers.ChoiceField(choices=['set', 'add', 'reset', 'capacity'], default='set')
+    value = serializers.IntegerField(required=False, allow_null=True, default=None)
+    at = serializers.FloatField(min_value=0.0, default=0.0)
+    every = serializers.FloatField(required=False, allow_null=True, default=None)
+    profile = serializers.ListField(
+        child=serializers.ListField(child=serializers.FloatField(), min_length=2, max_length=2),
+        required=False, allow_null=True, default=None,
+    )
+
+    def validate(self, data):
+        if data['every'] is not None and data['every'] <= 0:
+            raise serializers.ValidationError({'every': 'Must be positive.'})
+        if data['profile']:
+            for at, value in data['profile']:
+                if at < 0 or value != int(value):
+                    raise serializers.ValidationError({'profile': 'Expected [[time >= 0, integer], ...].'})
+            data['profile'] = [[at, int(value)] for at, value in data['profile']]
+            points = [value for _, value in data['profile']]
+        else:
+            points = [data['value']]
+        for value in points:
+            if value is None and data['action'] in ('set', 'add'):
+                raise serializers.ValidationError({'value': f"Required for '{data['action']}'."})
+            if value is not None and value < 0 and data['action'] in ('set', 'capacity'):
+                raise serializers.ValidationError({'value': 'Must be >= 0.'})
+        return {key: value for key, value in data.items() if value is not None}
+
+class ScheduleSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    entries = serializers.ListField(child=ScheduleEntrySerializer(), required=False)
+
+    class Meta:
+        model = Schedule
+        fields = ['id', 'petri_net', 'name', 'entries', 'created_at']
+
+    def validate(self, data):
+        petri_net = data.get('petri_net') or self.instance.petri_net
+        names = {entry['place'] for entry in data.get('entries', [])}
+        known = set(Place.objects.filter(petri_net=petri_net, id_in_net__in=names).values_list('id_in_net', flat=True))
+        if names - known:
+            raise serializers.ValidationError({'entries': f"Unknown places: {', '.join(sorted(names - known))}"})
+        return data
+
+class PrecisionSerializer(serializers.Serializer):
+    places = serializers.ListField(child=serializers.CharField(max_length=50), min_length=1, max_length=100)
+    window = serializers.FloatField()
+    relative_width = serializers.FloatField(min_value=0.0, max_value=1.0, required=False, allow_null=True, default=None)
+    confidence = serializers.FloatField(min_value=0.5, max_value=0.999, default=0.95)
+    min_batches = serializers.IntegerField(min_value=2, max_value=10_000, default=10)
+
+    def validate_window(self, value):
+        if value <= 0:
+            raise serializers.ValidationError('Must be positive.')
+        return value
+
+class SimulationRequestSerializer(serializers.Serializer):
+    mode = serializers.ChoiceField(choices=['untimed', 'timed', 'colored'], default='untimed')
+    steps = serializers.IntegerField(min_value=1, max_value=10_000_000, required=False)
+    until = serializers.FloatField(min_value=0.0, required=False, allow_null=True, default=None)
+    policy = serializers.ChoiceField(choices=['first', 'random'], default='first')
+    server = serializers.ChoiceField(choices=['single', 'infinite'], default='single')
+    seed = serializers.IntegerField(required=False, allow_null=True, default=None)
+    trace = serializers.BooleanField(default=True)
+    delays = serializers.DictField(child=serializers.DictField(), required=False, default=dict)
+    record = serializers.BooleanField(default=False)
+    checkpoint_interval = serializers.IntegerField(min_value=1, max_value=1_000_000, default=1000)
+    schedule = serializers.IntegerField(required=False, allow_null=True, default=None)
+    warm_state = serializers.IntegerField(required=False, allow_null=True, default=None)
+    precision = PrecisionSerializer(required=False, allow_null=True, default=None)
+    reduce = serializers.BooleanField(default=False)
+
+    def validate(self, data):
+        if data['reduce'] and (data['mode'] == 'colored' or data['record'] or data['warm_state'] is not None):
+            raise serializers.ValidationError({'reduce': 'Not available for coloured, recorded or warm-started runs.'})
+        for name, label in (('schedule', 'Schedules'), ('warm_state', 'Warm states'), ('precision', 'Precision stops')):
+            if data[name] is not None and data['mode'] != 'timed':
+                raise serializers.ValidationError({name: f'{label} only apply to timed runs.'})
+        if data['mode'] == 'colored' and data['record']:
+            raise serializers.ValidationError({'record': 'Coloured runs cannot be recorded.'})
+        # Timed runs bounded by a horizon get a much larger, but still finite, event budget
+        if 'steps' not in data:
+            data['steps'] = MAX_EVENTS if data['mode'] == 'timed' and data['until'] is not None else 1000
+        return data
+
+class WarmStateSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    class Meta:
+        model = WarmState
+        fields = ['id', 'petri_net', 'name', 'time', 'state', 'parameters', 'steady_state', 'created_at']
+
+class WarmUpRequestSerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=100)
+    until = serializers.FloatField(min_value=0.0)
+    max_events = serializers.IntegerField(min_value=1, required=False, allow_null=True, default=None)
+    seed = serializers.IntegerField(required=False, allow_null=True, default=None)
+    server = serializers.ChoiceField(choices=['single', 'infinite'], default='single')
+    delays = serializers.DictField(child=serializers.DictField(), required=False, default=dict)
+    schedule = serializers.IntegerField(required=False, allow_null=True, default=None)
+    warm_state = serializers.IntegerField(required=False, allow_null=True, default=None)
+    precision = PrecisionSerializer(required=False, allow_null=True, default=None)
+
+class CloneSubnetRequestSerializer(serializers.Serializer):
+    nodes = serializers.ListField(child=serializers.CharField(max_length=50), min_length=1, max_length=10_000)
+    copies = serializers.IntegerField(min_value=1, max_value=1000)
+    find = serializers.CharField(max_length=50, required=False, allow_blank=True, default='')
+    replace = serializers.CharField(max_length=50, default='_{n}')
+    start = serializers.IntegerField(min_value=0, default=2)
+    offset = serializers.DictField(child=serializers.FloatField(), required=False, default=dict)
+    external_arcs = serializers.BooleanField(default=False)
+
+    def validate_replace(self, value):
+        try:
+            numbered = value.format(n=0) != value.format(n=1)
+        except (IndexError, KeyError, ValueError):
+            raise serializers.ValidationError("Only the copy number '{n}' may appear between braces.")
+        if not numbered:
+            raise serializers.ValidationError("Must contain the copy number, e.g. '_{n}'.")
+        return value
+
+    def validate_offset(self, value):
+        unknown = set(value) - {'x', 'y'}
+        if unknown:
+            raise serializers.ValidationError(f"Unknown keys: {', '.join(sorted(unknown))}")
+        return value
+
+class SimulationRunSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SimulationRun
+        fields = ['id', 'petri_net', 'mode', 'parameters', 'steps', 'end_time', 'stopped', 'created_at']
+
+class ViewportRequestSerializer(serializers.Serializer):
+    x_min = serializers.FloatField()
+    y_min = serializers.FloatField()
+    x_max = serializers.FloatField()
+    y_max = serializers.FloatField()
+    layers = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+
+    def validate(self, data):
+        if data['x_min'] > data['x_max'] or data['y_min'] > data['y_max']:
+            raise serializers.ValidationError('Expected x_min <= x_max and y_min <= y_max.')
+        return data
+
+class RunMarkingRequestSerializer(serializers.Serializer):
+    step = serializers.IntegerField(min_value=0, required=False)
+    time = serializers.FloatField(required=False)
+
+    def validate(self, data):
+        if ('step' in data) == ('time' in data):
+            raise serializers.ValidationError("Give exactly one of 'step' or 'time'")
+        return data
+
+class RunFiringsRequestSerializer(serializers.Serializer):
+    start = serializers.FloatField(default=0.0)
+    end = serializers.FloatField(required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=100_000, default=1000)
+
+class ReplicationRequestSerializer(serializers.Serializer):
+    replications = serializers.IntegerField(min_value=1, max_value=10_000, default=30)
+    until = serializers.FloatField(min_value=0.0)
+    max_events = serializers.IntegerField(min_value=1, required=False, allow_null=True, default=None)
+    seed = serializers.IntegerField(required=False, allow_null=True, default=None)
+    server = serializers.ChoiceField(choices=['single', 'infinite'], default='single')
+    delays = serializers.DictField(child=serializers.DictField(), required=False, default=dict)
+    workers = serializers.IntegerField(min_value=1, max_value=256, required=False, allow_null=True, default=None)
+    confidence = serializers.FloatField(min_value=0.5, max_value=0.999, default=0.95)
+    schedule = serializers.IntegerField(required=False, allow_null=True, default=None)
+    warm_state = serializers.IntegerField(required=False, allow_null=True, default=None)
+    warmup = serializers.FloatField(min_value=0.0, default=0.0)
+
+    def validate(self, data):
+        if data['warmup'] and data['warmup'] >= data['until']:
+            raise serializers.ValidationError({'warmup': 'Must be shorter than until.'})
+        return data
+
+class SweepRequestSerializer(serializers.Serializer):
+    parameters = serializers.DictField(
+        child=serializers.ListField(child=serializers.IntegerField(min_value=0), min_length=1)
+    )
+    steps = serializers.IntegerField(min_value=1, max_value=1_000_000, default=1000)
+    policy = serializers.ChoiceField(choices=['first', 'random'], default='first')
+    seed = serializers.IntegerField(required=False, allow_null=True, default=None)
+
+    def validate_parameters(self, value):
+        variants = 1
+        for values in value.values():
+            variants *= len(values)
+        if variants > 10_000:
+            raise serializers.ValidationError(f"{variants} variants requested, at most 10000 allowed")
+        return value
+
+class OptimizationTargetSerializer(serializers.Serializer):
+    place = serializers.CharField(max_length=50, required=False)
+    transition = serializers.CharField(max_length=50, required=False)
+    metric = serializers.ChoiceField(choices=['marking', 'waiting_time', 'occupancy', 'throughput'], required=False)
+    min = serializers.FloatField(required=False)
+    max = serializers.FloatField(required=False)
+
+    def validate(self, data):
+        if ('place' in data) == ('transition' in data):
+            raise serializers.ValidationError('Give exactly one of place or transition.')
+        if 'min' not in data and 'max' not in data:
+            raise serializers.ValidationError('Give a min or a max.')
+        return data
+
+class OptimizationRequestSerializer(serializers.Serializer):
+    resources = serializers.DictField(
+        child=serializers.ListField(child=serializers.IntegerField(min_value=0), min_length=1), allow_empty=False
+    )
+    targets = serializers.ListField(child=OptimizationTargetSerializer(), min_length=1)
+    costs = serializers.DictField(child=serializers.FloatField(min_value=0.0), required=False, default=dict)
+    until = serializers.FloatField(min_value=0.0)
+    max_events = serializers.IntegerField(min_value=1, required=False, allow_null=True, default=None)
+    min_replications = serializers.IntegerField(min_value=2, max_value=1000, default=4)
+    max_replications = serializers.IntegerField(min_value=2, max_value=1000, default=64)
+    eta = serializers.IntegerField(min_value=2, max_value=10, default=2)
+    seed = serializers.IntegerField(required=False, allow_null=True, default=None)
+    server = serializers.ChoiceField(choices=['single', 'infinite'], default='single')
+    delays = serializers.DictField(child=serializers.DictField(), required=False, default=dict)
+    schedule = serializers.IntegerField(required=False, allow_null=True, default=None)
+    workers = serializers.IntegerField(min_value=1, max_value=256, required=False, allow_null=True, default=None)
+    confidence = serializers.FloatField(min_value=0.5, max_value=0.999, default=0.95)
+    monotone = serializers.BooleanField(default=False)
+    warmup = serializers.FloatField(min_value=0.0, default=0.0)
+
+    def validate(self, data):
+        if data['warmup'] and data['warmup'] >= data['until']:
+            raise serializers.ValidationError({'warmup': 'Must be shorter than until.'})
+        if data['max_replications'] < data['min_replications']:
+            raise serializers.ValidationError({'max_replications': 'Must be >= min_replications.'})
+        candidates = 1
+        for levels in data['resources'].values():
+            candidates *= len(set(levels))
+        if candidates > 10_000:
+            raise serializers.ValidationError({'resources': f"{candidates} configurations, at most 10000 allowed"})
+        return data
+
+class ValidationRequestSerializer(serializers.Serializer):
+    max_states = serializers.IntegerField(min_value=1, max_value=10_000_000, default=100_000)
+    max_memory_mb = serializers.IntegerField(min_value=1, max_value=64_000, required=False, allow_null=True, default=None)
+    reduction = serializers.ChoiceField(choices=['none', 'stubborn'], default='none')
+    structural_only = serializers.BooleanField(default=False)
+    reduce = serializers.BooleanField(default=False)
+
+class FireRequestSerializer(serializers.Serializer):
+    transition = serializers.CharField(max_length=50, required=False)
+    transitions = serializers.ListField(
+        child=serializers.CharField(max_length=50), required=False, max_length=100_000
+    )
+
+    def validate(self, data):
+        sequence = list(data.get('transitions', []))
+        if 'transition' in data:
+            sequence.insert(0, data['transition'])
+        if not sequence:
+            raise serializers.ValidationError("Provide 'transition' or a non-empty 'transitions' list")
+        return {'transitions': sequence}
@@ -0,0 +1,54 @@
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import PetriNet, Place, Transition, Arc
+
+
+def bump_version(petri_net_id, structure=False):
+    """
+    Invalidate every cached payload of a net, and with ``structure=True`` its compiled form too.
+    Call it after writes that bypass signals (bulk_update, update()).
+    """
+    counters = {'version': F('version') + 1}
+    if structure:
+        counters['structure_version'] = F('structure_version') + 1
+        from .engine.loader import compiled_nets
+        compiled_nets.discard(petri_net_id)
+    PetriNet.objects.filter(pk=petri_net_id).update(**counters)
+
+
+@receiver(post_save, sender=PetriNet)
+def petri_net_saved(sender, instance, created, **kwargs):
+    if not created:
+        bump_version(instance.pk)
+
+
+def relink_arcs(node, previous_id):
+    """Carry a renamed node's arcs along, and attach the arcs already naming it."""
+    if previous_id is not None and previous_id != node.id_in_net:
+        Arc.objects.filter(**{f'source_{node._meta.model_name}': node}).update(source_id=node.id_in_net)
+        Arc.objects.filter(**{f'target_{node._meta.model_name}': node}).update(target_id=node.id_in_net)
+    PetriNet(pk=node.petri_net_id).resolve_arcs(names=[node.id_in_net])
+
+
+@receiver(post_save, sender=Place)
+@receiver(post_save, sender=Transition)
+@receiver(post_save, sender=Arc)
+def node_saved(sender, instance, created, **kwargs):
+    changed = created or instance.structure_changed()
+    if sender is not Arc and changed:
+        previous = getattr(instance, '_structure', None)
+        relink_arcs(instance, previous[sender.STRUCTURAL_FIELDS.index('id_in_net')] if previous else None)
+    bump_version(instance.petri_net_id, structure=changed)
+    instance._structure = instance.structure()
+
+
+@receiver(post_delete, sender=Place)
+@receiver(post_delete, sender=Transition)
+@receiver(post_delete, sender=Arc)
+def node_deleted(sender, instance, origin=None, **kwargs):
+    # Arcs cascading from a node or net deletion: the origin's own signal already invalidates
+    if sender is Arc and isinstance(origin, (PetriNet, Place, Transition)):
+        return
+    bump_version(instance.petri_net_id, structure=True)
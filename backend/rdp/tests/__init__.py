@@ -0,0 +1,44 @@
+from rdp.engine import CompiledNet
+
+
+def compile_net(places, transitions, arcs):
+    """
+    Compile a small net from shorthand: ``places`` maps ids to tokens (or ``(tokens, capacity)``),
+    ``transitions`` maps ids to transition fields, ``arcs`` are ``(source, target[, weight[, kind]])``
+    with ``kind`` ``'inhibitor'`` or ``'reset'``.
+    """
+    place_rows = [
+        {'id_in_net': pid, 'tokens': value[0], 'capacity': value[1]} if isinstance(value, tuple)
+        else {'id_in_net': pid, 'tokens': value, 'capacity': 0}
+        for pid, value in places.items()
+    ]
+    transition_rows = [{'id_in_net': tid, **fields} for tid, fields in transitions.items()]
+    arc_rows = []
+    for source, target, *rest in arcs:
+        weight = rest[0] if rest else 1
+        kind = rest[1] if len(rest) > 1 else None
+        arc_rows.append({
+            'source_id': source, 'target_id': target, 'weight': weight,
+            'is_inhibitor': kind == 'inhibitor', 'is_reset': kind == 'reset',
+        })
+    return CompiledNet.from_rows(place_rows, transition_rows, arc_rows)
+
+
+def create_net(name, places, transitions, arcs):
+    """Save a net built from the same shorthand as :func:`compile_net`, nodes laid out on a row."""
+    from rdp.models import Theme, PetriNet, Place, Transition, Arc
+
+    petri_net = PetriNet.objects.create(name=name, theme=Theme.objects.create(name=name))
+    for i, (pid, value) in enumerate(places.items()):
+        tokens, capacity = value if isinstance(value, tuple) else (value, None)
+        Place.objects.create(petri_net=petri_net, id_in_net=pid, label=pid, position={'x': i * 100, 'y': 0},
+                             tokens=tokens, capacity=capacity or None)
+    for i, (tid, fields) in enumerate(transitions.items()):
+        Transition.objects.create(petri_net=petri_net, id_in_net=tid, label=tid,
+                                  position={'x': i * 100, 'y': 100}, **fields)
+    for i, (source, target, *rest) in enumerate(arcs):
+        weight = rest[0] if rest else 1
+        kind = rest[1] if len(rest) > 1 else None
+        Arc.objects.create(petri_net=petri_net, id_in_net=f'a{i}', source_id=source, target_id=target, weight=weight,
+                           is_inhibitor=kind == 'inhibitor', is_reset=kind == 'reset')
+    return petri_net
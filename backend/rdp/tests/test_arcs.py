@@ -0,0 +1,37 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.urls import reverse
+
+from rdp.models import Arc, Place
+from rdp.tests import create_net
+
+
+class ResolveArcsCommandTests(TestCase):
+    def setUp(self):
+        self.net = create_net('arcs', {'p': 1, 'q': 0}, {'t': {}}, [('p', 't'), ('t', 'q'), ('t', 'ghost')])
+        # Rows written before the endpoint columns existed
+        Arc.objects.update(source_place=None, source_transition=None, target_place=None, target_transition=None)
+
+    def test_backfills_existing_arcs(self):
+        out = StringIO()
+        call_command('resolve_arcs', stdout=out)
+        self.assertIn('1 dangling', out.getvalue())
+
+        consuming = Arc.objects.get(id_in_net='a0')
+        self.assertEqual((consuming.source_place.id_in_net, consuming.target_transition.id_in_net), ('p', 't'))
+        producing = Arc.objects.get(id_in_net='a1')
+        self.assertEqual((producing.source_transition.id_in_net, producing.target_place.id_in_net), ('t', 'q'))
+
+        place = Place.objects.get(petri_net=self.net, id_in_net='p')
+        response = self.client.get(reverse('place-adjacency', args=[place.pk]))
+        self.assertEqual(response.json()['postset'], ['t'])
+
+        place.delete()
+        self.assertFalse(Arc.objects.filter(id_in_net='a0').exists())
+
+    def test_unknown_net(self):
+        with self.assertRaises(CommandError):
+            call_command('resolve_arcs', str(self.net.pk + 1), stdout=StringIO())
@@ -0,0 +1,64 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from rdp.engine import loader
+from rdp.engine.loader import compiled_nets, load_compiled_net
+from rdp.models import Arc, PetriNet, Place, Transition
+from rdp.tests import create_net
+
+
+class CompiledNetCacheTests(TestCase):
+    def setUp(self):
+        compiled_nets.clear()
+        self.net = create_net('ward', {'queue': 2, 'bed': 0}, {'admit': {}}, [('queue', 'admit'), ('admit', 'bed')])
+        self.load()
+
+    def load(self):
+        """Compiled net of the stored net, and whether it had to be compiled again."""
+        petri_net = PetriNet.objects.get(pk=self.net.pk)
+        with mock.patch.object(loader, 'compile_net', wraps=loader.compile_net) as compile_net:
+            net = load_compiled_net(petri_net)
+        return net, compile_net.called, petri_net
+
+    def assert_recompiled(self, edit):
+        _, _, before = self.load()
+        edit()
+        net, compiled, after = self.load()
+        self.assertEqual(after.structure_version, before.structure_version + 1)
+        self.assertTrue(compiled)
+        return net
+
+    def test_unchanged_net_is_served_from_the_cache(self):
+        _, compiled, _ = self.load()
+        self.assertFalse(compiled)
+
+    def test_place_capacity_edit_recompiles(self):
+        place = Place.objects.get(petri_net=self.net, id_in_net='bed')
+        place.capacity = 5
+        net = self.assert_recompiled(place.save)
+        self.assertEqual(net.capacity[net.place_index['bed']], 5)
+
+    def test_arc_weight_edit_recompiles(self):
+        arc = Arc.objects.get(petri_net=self.net, source_id='queue')
+        arc.weight = 2
+        net = self.assert_recompiled(arc.save)
+        self.assertEqual(net.pre[net.transition_index['admit']], ((net.place_index['queue'], 2),))
+
+    def test_transition_priority_edit_recompiles(self):
+        transition = Transition.objects.get(petri_net=self.net, id_in_net='admit')
+        transition.priority = 3
+        net = self.assert_recompiled(transition.save)
+        self.assertEqual(net.priority[net.transition_index['admit']], 3)
+
+    def test_marking_edit_keeps_the_compiled_structure(self):
+        _, _, before = self.load()
+        place = Place.objects.get(petri_net=self.net, id_in_net='queue')
+        place.tokens = 7
+        place.label = 'Waiting room'
+        place.save()
+        net, compiled, after = self.load()
+        self.assertEqual(after.structure_version, before.structure_version)
+        self.assertGreater(after.version, before.version)
+        self.assertFalse(compiled)
+        self.assertEqual(net.initial_marking[net.place_index['queue']], 7)
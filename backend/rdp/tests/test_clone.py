@@ -0,0 +1,79 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from rdp.models import Arc, Place, Transition
+from rdp.tests import create_net
+
+
+class CloneSubnetTests(TestCase):
+    def setUp(self):
+        # Room 1 (a bed and its discharge) draws patients from a shared queue
+        self.net = create_net(
+            'maternity', {'queue': 3, 'bed_1': 0, 'home': 0}, {'admit_1': {}, 'discharge_1': {}},
+            [('queue', 'admit_1'), ('admit_1', 'bed_1'), ('bed_1', 'discharge_1'), ('discharge_1', 'home')],
+        )
+
+    def clone(self, **params):
+        response = self.client.post(
+            reverse('petri-net-clone-subnet', args=[self.net.pk]),
+            {'nodes': ['bed_1', 'admit_1', 'discharge_1'], 'copies': 2, 'find': '_1', 'offset': {'y': 200}, **params},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.json()['copies']
+
+    def arcs(self):
+        return {
+            (arc.source_id, arc.target_id): arc
+            for arc in Arc.objects.filter(petri_net=self.net).select_related(
+                'source_place', 'target_place', 'source_transition', 'target_transition')
+        }
+
+    def test_copies_get_fresh_ids_and_positions(self):
+        copies = self.clone()
+        self.assertEqual(copies, {
+            'admit_1': ['admit_2', 'admit_3'], 'bed_1': ['bed_2', 'bed_3'], 'discharge_1': ['discharge_2', 'discharge_3'],
+        })
+        beds = {place.id_in_net: place for place in Place.objects.filter(petri_net=self.net, id_in_net__startswith='bed')}
+        self.assertEqual(sorted(beds), ['bed_1', 'bed_2', 'bed_3'])
+        self.assertEqual(len({place.pk for place in beds.values()}), 3)
+        self.assertEqual(beds['bed_3'].label, 'bed_3')
+        self.assertEqual(beds['bed_3'].position['y'], beds['bed_1'].position['y'] + 400)
+        self.assertEqual(Transition.objects.filter(petri_net=self.net).count(), 6)
+        arc_ids = list(Arc.objects.filter(petri_net=self.net).values_list('id_in_net', flat=True))
+        self.assertEqual(len(arc_ids), len(set(arc_ids)))
+
+    def test_arcs_inside_the_selection_are_remapped(self):
+        self.clone()
+        arcs = self.arcs()
+        for n in (2, 3):
+            admit = arcs[(f'admit_{n}', f'bed_{n}')]
+            self.assertEqual(admit.source_transition.id_in_net, f'admit_{n}')
+            self.assertEqual(admit.target_place.id_in_net, f'bed_{n}')
+            discharge = arcs[(f'bed_{n}', f'discharge_{n}')]
+            self.assertEqual(discharge.source_place.id_in_net, f'bed_{n}')
+            self.assertEqual(discharge.target_transition.id_in_net, f'discharge_{n}')
+
+    def test_arcs_crossing_the_selection_are_dropped(self):
+        self.clone()
+        arcs = self.arcs()
+        self.assertEqual(len(arcs), 4 + 2 * 2)
+        self.assertFalse({(source, target) for source, target in arcs if source == 'queue'} - {('queue', 'admit_1')})
+        self.assertFalse({(source, target) for source, target in arcs if target == 'home'} - {('discharge_1', 'home')})
+
+    def test_external_arcs_keep_pointing_at_the_shared_node(self):
+        self.clone(external_arcs=True)
+        arcs = self.arcs()
+        self.assertEqual(len(arcs), 4 * 3)
+        for n in (2, 3):
+            self.assertEqual(arcs[('queue', f'admit_{n}')].source_place.id_in_net, 'queue')
+            self.assertEqual(arcs[(f'discharge_{n}', 'home')].target_place.id_in_net, 'home')
+
+    def test_clashing_ids_are_rejected(self):
+        response = self.client.post(
+            reverse('petri-net-clone-subnet', args=[self.net.pk]),
+            {'nodes': ['bed_1'], 'copies': 1, 'find': '_1', 'replace': '_{n}', 'start': 1},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Place.objects.filter(petri_net=self.net).count(), 3)
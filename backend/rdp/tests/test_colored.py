@@ -0,0 +1,34 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from rdp.models import Place
+from rdp.tests import create_net
+
+
+class ColoredMarkingTests(TestCase):
+    def setUp(self):
+        self.net = create_net('triage', {'queue': 0, 'seen': 0}, {'see': {}}, [('queue', 'see'), ('see', 'seen')])
+        self.queue = Place.objects.get(petri_net=self.net, id_in_net='queue')
+        self.queue.colored_tokens = {'urgent': 1, 'normal': 2}
+        self.queue.tokens = 3
+        self.queue.save()
+
+    def test_plain_firing_leaves_coloured_places_alone(self):
+        response = self.client.post(
+            reverse('petri-net-fire', args=[self.net.pk]), {'transitions': ['see']}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 409, response.content)
+        self.assertEqual(response.json()['places'], ['queue'])
+        self.queue.refresh_from_db()
+        self.assertEqual(self.queue.tokens, 3)
+        self.assertEqual(Place.objects.get(petri_net=self.net, id_in_net='seen').tokens, 0)
+
+    def test_tokens_alone_cannot_change_a_coloured_total(self):
+        url = reverse('place-update', args=[self.queue.pk])
+        response = self.client.put(url, {'tokens': 1}, content_type='application/json')
+        self.assertEqual(response.status_code, 400, response.content)
+        self.assertIn('tokens', response.json())
+
+        response = self.client.put(url, {'colored_tokens': {'normal': 1}}, content_type='application/json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()['tokens'], 1)
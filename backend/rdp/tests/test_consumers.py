@@ -0,0 +1,57 @@
+import asyncio
+import json
+
+from django.test import TestCase
+
+from rdp.consumers import simulation_websocket
+from rdp.tests import create_net
+
+
+class SimulationWebSocketTests(TestCase):
+    def setUp(self):
+        self.net = create_net('loop', {'a': 1, 'b': 0}, {'t1': {}, 't2': {}},
+                              [('a', 't1'), ('t1', 'b'), ('b', 't2'), ('t2', 'a')])
+
+    async def open(self, path):
+        self.inbox, self.outbox = asyncio.Queue(), asyncio.Queue()
+        scope = {'type': 'websocket', 'path': path, 'query_string': b'fps=60'}
+        self.session = asyncio.create_task(simulation_websocket(scope, self.inbox.get, self.outbox.put))
+        await self.inbox.put({'type': 'websocket.connect'})
+
+    async def receive(self):
+        message = await asyncio.wait_for(self.outbox.get(), timeout=5)
+        return json.loads(message['text']) if message['type'] == 'websocket.send' else message
+
+    async def send(self, command):
+        await self.inbox.put({'type': 'websocket.receive', 'text': json.dumps(command)})
+
+    async def close(self):
+        await self.inbox.put({'type': 'websocket.disconnect'})
+        await asyncio.wait_for(self.session, timeout=5)
+
+    async def test_session_pushes_markings(self):
+        await self.open(f'/ws/rdp/petri-nets/{self.net.pk}/simulate/')
+        self.assertEqual((await self.receive())['type'], 'websocket.accept')
+        init = await self.receive()
+        self.assertEqual(init['type'], 'init')
+        self.assertEqual(init['marking'], {'a': 1, 'b': 0})
+        self.assertEqual(init['enabled'], ['t1'])
+
+        await self.send({'action': 'step', 'count': 1})
+        frame = await self.receive()
+        self.assertEqual(frame['type'], 'frame')
+        self.assertEqual(frame['fired'], ['t1'])
+        self.assertEqual(frame['changed'], {'a': 0, 'b': 1})
+        self.assertEqual((await self.receive())['type'], 'state')
+
+        await self.send({'action': 'play'})
+        messages = [await self.receive() for _ in range(3)]
+        frames = [m for m in messages if m['type'] == 'frame']
+        self.assertTrue(frames)
+        self.assertEqual(frames[0]['fired'], ['t2'])
+        await self.close()
+
+    async def test_unknown_net_is_refused(self):
+        await self.open('/ws/rdp/petri-nets/999999/simulate/')
+        self.assertEqual(await self.receive(), {'type': 'websocket.close', 'code': 4404})
+        await asyncio.wait_for(self.session, timeout=5)
@@ -0,0 +1,44 @@
+import json
+
+from django.test import TestCase
+from django.urls import reverse
+
+from rdp import interchange
+from rdp.models import Layer, Place, Theme, Transition
+from rdp.tests import create_net
+
+
+class InterchangeTests(TestCase):
+    def setUp(self):
+        self.net = create_net('ward', {'queue': 1, 'bed': 0}, {'admit': {}}, [('queue', 'admit'), ('admit', 'bed')])
+        layer = Layer.objects.create(name='maternity', theme=self.net.theme)
+        Place.objects.filter(petri_net=self.net, id_in_net='bed').update(layer=layer)
+        Transition.objects.filter(petri_net=self.net, id_in_net='admit').update(layer=layer)
+
+    def test_round_trip_keeps_layers(self):
+        response = self.client.get(reverse('petri-net-export', args=[self.net.pk]))
+        body = b''.join(response.streaming_content)
+        records = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(records[1], {'kind': 'layer', 'name': 'maternity'})
+
+        other = Theme.objects.create(name='other')
+        response = self.client.post(
+            f"{reverse('petri-net-import')}?theme={other.pk}", body, content_type=interchange.NDJSON
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.json()['layers'], 1)
+        layers = {
+            place.id_in_net: place.layer.name if place.layer else None
+            for place in Place.objects.filter(petri_net_id=response.json()['id']).select_related('layer')
+        }
+        self.assertEqual(layers, {'queue': None, 'bed': 'maternity'})
+        admit = Transition.objects.select_related('layer').get(petri_net_id=response.json()['id'])
+        self.assertEqual((admit.layer.name, admit.layer.theme), ('maternity', other))
+
+    def test_undeclared_layer_is_rejected(self):
+        records = [
+            {'kind': 'net', 'name': 'copy', 'theme': self.net.theme_id},
+            {'kind': 'place', 'id_in_net': 'p', 'label': 'p', 'position': {'x': 0, 'y': 0}, 'layer': 'icu'},
+        ]
+        with self.assertRaises(interchange.NetImportError):
+            interchange.import_net(records)
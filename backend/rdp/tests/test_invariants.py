@@ -0,0 +1,100 @@
+import itertools
+import random
+
+from django.test import SimpleTestCase
+
+from rdp.engine import farkas, structural_analysis
+from rdp.tests import compile_net
+
+
+def supports(solutions):
+    return {frozenset(i for i, c in enumerate(y) if c) for y in solutions}
+
+
+class FarkasTests(SimpleTestCase):
+    def test_solutions_are_all_minimal_invariants(self):
+        rng = random.Random(8)
+        for _ in range(40):
+            rows, columns = rng.randint(2, 5), rng.randint(1, 3)
+            matrix = [[rng.randint(-2, 2) for _ in range(columns)] for _ in range(rows)]
+            solutions = farkas(matrix)
+            for y in solutions:
+                self.assertTrue(all(c >= 0 for c in y) and any(y), matrix)
+                for column in zip(*matrix):
+                    self.assertEqual(sum(c * v for c, v in zip(y, column)), 0, matrix)
+            # Brute force over small multipliers: every invariant contains a returned support
+            found = supports(solutions)
+            for y in itertools.product(range(3), repeat=rows):
+                if any(y) and all(sum(c * v for c, v in zip(y, column)) == 0 for column in zip(*matrix)):
+                    support = frozenset(i for i, c in enumerate(y) if c)
+                    self.assertTrue(any(s <= support for s in found), (matrix, y))
+            for a, b in itertools.permutations(found, 2):
+                self.assertFalse(a < b, matrix)
+
+    def test_explosion_is_reported_as_incomplete(self):
+        # Every place feeds every transition: the pairwise combinations outgrow a tiny budget
+        places = {f'p{i}': 1 for i in range(6)}
+        arcs = [(p, f't{j}') for p in places for j in range(3)] + [(f't{j}', 'sink') for j in range(3)]
+        report = structural_analysis(compile_net({**places, 'sink': 0}, {f't{j}': {} for j in range(3)}, arcs), max_rows=5)
+        self.assertFalse(report['complete'])
+        self.assertEqual(report['p_invariants'], [])
+
+
+class StructuralAnalysisTests(SimpleTestCase):
+    def test_nurses_and_beds_are_conserved(self):
+        net = compile_net(
+            {'idle': 2, 'busy': 0, 'bed': 1, 'used': 0}, {'start': {}, 'end': {}},
+            [('idle', 'start'), ('bed', 'start'), ('start', 'busy'), ('start', 'used'),
+             ('busy', 'end'), ('used', 'end'), ('end', 'idle'), ('end', 'bed')],
+        )
+        report = structural_analysis(net)
+        self.assertTrue(report['complete'])
+        invariants = {tuple(sorted(y['weights'].items())): y['tokens'] for y in report['p_invariants']}
+        self.assertEqual(invariants, {
+            (('busy', 1), ('idle', 1)): 2, (('bed', 1), ('busy', 1)): 1,
+            (('idle', 1), ('used', 1)): 2, (('bed', 1), ('used', 1)): 1,
+        })
+        self.assertEqual(report['t_invariants'], [{'start': 1, 'end': 1}])
+        self.assertTrue(report['conservative'])
+        self.assertTrue(report['consistent'])
+        self.assertTrue(report['bounded'])
+        # The tightest invariant bounds each place: only one bed, so one busy nurse
+        self.assertEqual({pid: place['bound'] for pid, place in report['places'].items()},
+                         {'idle': 2, 'busy': 1, 'bed': 1, 'used': 1})
+
+    def test_weighted_invariant_bounds(self):
+        net = compile_net(
+            {'a': 5, 'b': 0}, {'pair': {}, 'split': {}},
+            [('a', 'pair', 2), ('pair', 'b'), ('b', 'split'), ('split', 'a', 2)],
+        )
+        report = structural_analysis(net)
+        self.assertEqual(report['p_invariants'], [{'weights': {'a': 1, 'b': 2}, 'tokens': 5}])
+        self.assertEqual(report['places']['a']['bound'], 5)
+        self.assertEqual(report['places']['b']['bound'], 2)
+
+    def test_source_transition_leaves_a_place_unbounded(self):
+        net = compile_net({'src': 1, 'queue': 0}, {'arrive': {}}, [('src', 'arrive'), ('arrive', 'src'), ('arrive', 'queue')])
+        report = structural_analysis(net)
+        self.assertEqual(report['p_invariants'], [{'weights': {'src': 1}, 'tokens': 1}])
+        self.assertEqual(report['t_invariants'], [])
+        self.assertIsNone(report['places']['queue']['bound'])
+        self.assertFalse(report['bounded'])
+        self.assertFalse(report['conservative'])
+        self.assertFalse(report['consistent'])
+
+    def test_capacity_bounds_a_place_outside_any_invariant(self):
+        net = compile_net({'src': 1, 'queue': (0, 4)}, {'arrive': {}}, [('src', 'arrive'), ('arrive', 'src'), ('arrive', 'queue')])
+        report = structural_analysis(net)
+        self.assertEqual(report['places']['queue'], {'bound': 4, 'covered': False})
+        self.assertTrue(report['bounded'])
+
+    def test_invariants_through_resets_are_discarded(self):
+        # q + r would be conserved by move alone, but clear empties r
+        net = compile_net(
+            {'q': 1, 'r': 0}, {'move': {}, 'clear': {}},
+            [('q', 'move'), ('move', 'r'), ('r', 'clear', 1, 'reset')],
+        )
+        report = structural_analysis(net)
+        self.assertEqual(report['p_invariants'], [])
+        self.assertEqual(report['t_invariants'], [])
+        self.assertFalse(report['bounded'])
@@ -0,0 +1,53 @@
+import random
+
+from django.test import SimpleTestCase
+
+from rdp.engine import TimedSimulator
+from rdp.engine.kpi import KPICollector, P2Quantile
+from rdp.tests import compile_net
+
+
+class P2QuantileTests(SimpleTestCase):
+    def test_weighted_add_tracks_the_expanded_stream(self):
+        rng = random.Random(3)
+        batches = [(rng.expovariate(1.0), rng.choice((1, 1, 5, 50, 400))) for _ in range(2000)]
+        expanded = sorted(x for x, count in batches for _ in range(count))
+        for p in (0.5, 0.9):
+            sketch = P2Quantile(p)
+            for x, count in batches:
+                sketch.add(x, count)
+            self.assertEqual(sketch.count, len(expanded))
+            exact = expanded[int(p * len(expanded))]
+            self.assertAlmostEqual(sketch.value(), exact, delta=0.1 * exact)
+
+    def test_batch_smaller_than_the_markers(self):
+        sketch = P2Quantile(0.5)
+        sketch.add(1.0, 3)
+        sketch.add(2.0, 4)
+        self.assertEqual(sketch.count, 7)
+        self.assertEqual(sketch.heights[0], 1.0)
+        self.assertEqual(sketch.heights[4], 2.0)
+
+
+class KPICollectorTests(SimpleTestCase):
+    def test_growing_queue_keeps_bounded_batches(self):
+        # Arrivals twice as fast as service: the queue grows by about 1000 tokens over the run
+        net = compile_net(
+            {'src': 1, 'queue': 0, 'server': 1, 'done': 0},
+            {'arrive': {'type': 'timed', 'delay_mean': 1.0}, 'serve': {'type': 'timed', 'delay_mean': 2.0}},
+            [
+                ('src', 'arrive'), ('arrive', 'src'), ('arrive', 'queue'),
+                ('queue', 'serve'), ('server', 'serve'), ('serve', 'server'), ('serve', 'done'),
+            ],
+        )
+        queue = net.place_index['queue']
+        exact, bounded = KPICollector(), KPICollector(max_batches=16)
+        TimedSimulator(net, seed=6, observers=[exact, bounded]).run(until=2000)
+        self.assertGreater(len(exact.batches[queue]), 500)
+        self.assertLessEqual(len(bounded.batches[queue]), 16)
+        self.assertEqual(sum(n for *_, n in bounded.batches[queue]), sum(n for *_, n in exact.batches[queue]))
+
+        exact, bounded = exact.as_dict()['places']['queue']['sojourn'], bounded.as_dict()['places']['queue']['sojourn']
+        self.assertEqual(bounded['count'], exact['count'])
+        for key in ('mean', 'p50', 'p90'):
+            self.assertAlmostEqual(bounded[key], exact[key], delta=0.02 * exact[key])
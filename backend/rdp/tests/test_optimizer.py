@@ -0,0 +1,35 @@
+from collections import Counter
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from rdp.engine import optimize
+from rdp.tests import compile_net
+
+
+class OptimizerTests(SimpleTestCase):
+    def test_halving_keeps_a_feasible_candidate_behind_cheaper_uncertain_ones(self):
+        net = compile_net(
+            {'src': 1, 'queue': 0, 'staff': 1},
+            {'arrive': {'type': 'timed', 'delay_mean': 1.0}, 'serve': {'type': 'timed', 'delay_mean': 1.0}},
+            [('src', 'arrive'), ('arrive', 'src'), ('arrive', 'queue'),
+             ('queue', 'serve'), ('staff', 'serve'), ('serve', 'staff')],
+        )
+        calls = Counter()
+
+        def evaluate(net, marking, seed, options, targets):
+            staff = marking[net.place_index['staff']]
+            calls[staff] += 1
+            if staff == 3:
+                return [0.5]
+            # Mean 0.9 with a spread wide enough to straddle the bound: never settled
+            return [0.4 if calls[staff] % 2 else 1.4]
+
+        with mock.patch('rdp.engine.optimizer.evaluate', evaluate):
+            result = optimize(
+                net, {'staff': [1, 2, 3]}, [{'place': 'queue', 'metric': 'marking', 'max': 1.0}],
+                until=10, min_replications=4, max_replications=16, workers=1,
+            )
+        self.assertTrue(result['proven'])
+        self.assertEqual(result['best']['marking'], {'staff': 3})
+        self.assertEqual(result['best']['status'], 'feasible')
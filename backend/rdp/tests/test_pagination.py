@@ -0,0 +1,69 @@
+import base64
+import json
+
+from django.test import TestCase
+from django.urls import reverse
+
+from rdp.models import Place
+from rdp.tests import create_net
+
+
+def cursor(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        # Both nets use the same place ids, so an unfiltered list ties on id_in_net
+        places = {f'p{i}': i for i in range(7)}
+        self.ward = create_net('ward', places, {}, [])
+        self.icu = create_net('icu', places, {}, [])
+
+    def get(self, **params):
+        return self.client.get(reverse('place-list'), params)
+
+    def walk(self, **params):
+        """Follow ``next_cursor`` to the end; ``(id_in_net, pk)`` of every row and the number of pages."""
+        rows, pages, next_cursor = [], 0, None
+        while True:
+            query = {**params, 'cursor': next_cursor} if next_cursor else params
+            response = self.get(**query)
+            self.assertEqual(response.status_code, 200, response.content)
+            body = response.json()
+            rows += [(place['id_in_net'], place['id']) for place in body['results']]
+            pages += 1
+            next_cursor = body['next_cursor']
+            if next_cursor is None:
+                return rows, pages
+
+    def test_pages_continue_where_the_previous_one_stopped(self):
+        rows, pages = self.walk(petri_net=self.ward.pk, limit=3)
+        self.assertEqual(pages, 3)
+        self.assertEqual([pid for pid, _ in rows], [f'p{i}' for i in range(7)])
+
+    def test_ties_on_the_ordering_are_broken_by_pk(self):
+        expected = list(Place.objects.order_by('id_in_net', 'pk').values_list('id_in_net', 'pk'))
+        for limit in (1, 2, 3, 5):
+            rows, _ = self.walk(limit=limit)
+            self.assertEqual(rows, expected, limit)
+
+    def test_filters_apply_to_every_page(self):
+        rows, _ = self.walk(petri_net=self.icu.pk, limit=2)
+        self.assertEqual({pk for _, pk in rows}, set(Place.objects.filter(petri_net=self.icu).values_list('pk', flat=True)))
+
+    def test_edits_between_pages_do_not_repeat_rows(self):
+        first = self.get(petri_net=self.ward.pk, limit=3).json()
+        Place.objects.create(petri_net=self.ward, id_in_net='p0a', label='p0a', position={'x': 0, 'y': 0})
+        second = self.get(petri_net=self.ward.pk, limit=3, cursor=first['next_cursor']).json()
+        self.assertEqual([place['id_in_net'] for place in second['results']], ['p3', 'p4', 'p5'])
+
+    def test_invalid_cursor_is_a_bad_request(self):
+        for bad in ('!!!', 'not-base64', cursor(5), cursor(['p1']), cursor(['p1', 'x']), cursor([None, 1]),
+                    cursor([{'a': 1}, 1]), cursor(['p1', 1.5]), cursor(['p1', 10 ** 30]), cursor(['p1', -1])):
+            response = self.get(cursor=bad)
+            self.assertEqual(response.status_code, 400, bad)
+            self.assertIn('cursor', response.json())
+
+    def test_invalid_limit_and_filter_are_bad_requests(self):
+        for params in ({'limit': 'ten'}, {'limit': 0}, {'petri_net': 'ward'}):
+            self.assertEqual(self.get(**params).status_code, 400, params)
@@ -0,0 +1,53 @@
+import time
+
+from django.test import SimpleTestCase
+
+from rdp.engine import analyse
+from rdp.tests import compile_net
+
+
+class CoverabilityTests(SimpleTestCase):
+    def test_plain_unbounded_place_is_accelerated(self):
+        net = compile_net({'src': 1, 'p': 0}, {'t': {}}, [('src', 't'), ('t', 'src'), ('t', 'p')])
+        report = analyse(net)
+        self.assertTrue(report['complete'])
+        self.assertIs(report['bounded'], False)
+        self.assertIsNone(report['places']['p']['bound'])
+
+    def test_place_read_by_an_inhibitor_is_not_accelerated(self):
+        # t stops producing once p holds 3 tokens: bounded, with a deadlock
+        net = compile_net(
+            {'src': 1, 'p': 0}, {'t': {}},
+            [('src', 't'), ('t', 'src'), ('t', 'p'), ('p', 't', 3, 'inhibitor')],
+        )
+        report = analyse(net)
+        self.assertTrue(report['complete'])
+        self.assertIs(report['bounded'], True)
+        self.assertEqual(report['places']['p']['bound'], 3)
+        self.assertIs(report['deadlock'], True)
+
+    def test_place_read_by_a_reset_is_not_accelerated(self):
+        net = compile_net(
+            {'src': 1, 'p': 0}, {'t': {}, 'clear': {}},
+            [('src', 't'), ('t', 'src'), ('t', 'p'), ('src', 'clear'), ('clear', 'src'), ('p', 'clear', 1, 'reset')],
+        )
+        report = analyse(net, max_states=200)
+        self.assertFalse(report['complete'])
+        self.assertIsNone(report['bounded'])
+        self.assertIsNone(report['deadlock'])
+
+    def test_growing_inhibitor_read_place_explores_in_linear_time(self):
+        # p grows forever and is never accelerated: the ancestor walk must not visit the whole path
+        net = compile_net(
+            {'src': 1, 'p': 0, 'a': 1, 'b': 0, 'c': 0},
+            {'arrive': {}, 'ab': {}, 'bc': {}, 'ca': {}},
+            [
+                ('src', 'arrive'), ('arrive', 'src'), ('arrive', 'p'), ('p', 'ab', 1, 'inhibitor'),
+                ('a', 'ab'), ('ab', 'b'), ('b', 'bc'), ('bc', 'c'), ('c', 'ca'), ('ca', 'a'),
+            ],
+        )
+        start = time.perf_counter()
+        report = analyse(net, max_states=20_000)
+        self.assertLess(time.perf_counter() - start, 5.0)
+        self.assertEqual(report['truncated'], 'max_states')
+        self.assertIsNone(report['bounded'])
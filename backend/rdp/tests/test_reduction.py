@@ -0,0 +1,46 @@
+from django.test import SimpleTestCase
+
+from rdp.engine import Simulator, analyse, reduce_net
+from rdp.tests import compile_net
+
+
+class ReductionTests(SimpleTestCase):
+    def test_duplicate_place_keeps_a_valid_mapping(self):
+        # b duplicates a; merging a into c afterwards would lose b's mapping
+        net = compile_net(
+            {'a': 0, 'b': 0, 'c': 0, 'd': 1},
+            {'t0': {}, 't1': {}, 't2': {}},
+            [('d', 't0'), ('t0', 'a'), ('t0', 'b'), ('a', 't1'), ('b', 't1'), ('t1', 'c'), ('c', 't2'), ('t2', 'd')],
+        )
+        reduction = reduce_net(net)
+        self.assertEqual(reduction.implicit['b'], ('a', 0))
+        self.assertIn('a', reduction.net.place_ids)
+
+        simulator = Simulator(reduction.net)
+        for _ in range(5):
+            marking = reduction.expand_marking(simulator.marking)
+            self.assertIsNotNone(marking['b'])
+            self.assertEqual(marking['b'], marking['a'])
+            simulator.step()
+
+    def test_analysis_matches_the_original_net(self):
+        net = compile_net(
+            {'queue': 0, 'copy': 0, 'staff': 2, 'in_care': 0, 'out': 0, 'src': 1},
+            {'arrive': {}, 'start': {}, 'finish': {}, 'leave': {}},
+            [
+                ('src', 'arrive'), ('arrive', 'queue'), ('arrive', 'copy'),
+                ('queue', 'start'), ('copy', 'start'), ('staff', 'start'), ('start', 'in_care'),
+                ('in_care', 'finish'), ('finish', 'staff'), ('finish', 'out'), ('out', 'leave'), ('leave', 'src'),
+            ],
+        )
+        original = analyse(net)
+        reduction = reduce_net(net)
+        self.assertLess(reduction.net.place_count, net.place_count)
+        report = reduction.analysis(analyse(reduction.net))
+        self.assertEqual(report['deadlock'], original['deadlock'])
+        # Unknown once transitions were fused in series
+        self.assertIn(report['bounded'], (None, original['bounded']))
+        for pid, value in report['places'].items():
+            # Merged places are reported under 'A+B', places between fused transitions as None
+            if value is not None and pid in original['places'] and value['bound'] is not None:
+                self.assertEqual(value['bound'], original['places'][pid]['bound'], pid)
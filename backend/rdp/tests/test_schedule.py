@@ -0,0 +1,75 @@
+from django.test import SimpleTestCase
+
+from rdp.engine import CompiledSchedule, TimedSimulator
+from rdp.engine.stats import Observer
+from rdp.tests import compile_net
+
+
+class Log(Observer):
+    """``(time, transition or None for the schedule, marking)`` after every change."""
+
+    def start(self, sim):
+        self.places = sim.net.place_index
+        self.events = []
+
+    def on_fire(self, sim, t, changed):
+        self.events.append((sim.now, sim.net.transition_ids[t], list(sim.marking)))
+
+    def on_schedule(self, sim, changed):
+        self.events.append((sim.now, None, list(sim.marking)))
+
+    def firings(self, tid):
+        return [time for time, t, _ in self.events if t == tid]
+
+    def tokens(self, pid):
+        return [(time, marking[self.places[pid]]) for time, _, marking in self.events]
+
+
+def run(net, entries, until, **kwargs):
+    log = Log()
+    simulator = TimedSimulator(net, seed=2, schedule=CompiledSchedule(net, entries), observers=[log], **kwargs)
+    simulator.run(until=until)
+    return simulator, log
+
+
+class ScheduleTests(SimpleTestCase):
+    def test_periodic_credits_arrive_on_time(self):
+        net = compile_net({'credits': 0, 'used': 0}, {'use': {}}, [('credits', 'use'), ('use', 'used')])
+        simulator, log = run(net, [{'place': 'credits', 'value': 3, 'at': 5, 'every': 10}], until=38)
+        self.assertEqual(log.firings('use'), [5.0] * 3 + [15.0] * 3 + [25.0] * 3 + [35.0] * 3)
+        self.assertEqual(simulator.marking[net.place_index['used']], 12)
+        self.assertEqual(simulator.next_schedule_time(), 45.0)
+
+    def test_shift_change_sets_the_service_rate(self):
+        # Two nurses from t=100 to t=200, then none: service only happens during the shift
+        net = compile_net(
+            {'queue': 10_000, 'staff': 0, 'done': 0},
+            {'serve': {'type': 'timed', 'delay_mean': 1.0}},
+            [('queue', 'serve'), ('staff', 'serve'), ('serve', 'staff'), ('serve', 'done')],
+        )
+        entries = [{'place': 'staff', 'action': 'set', 'value': 2, 'at': 100},
+                   {'place': 'staff', 'action': 'add', 'value': -2, 'at': 200}]
+        simulator, log = run(net, entries, until=400, server='infinite')
+        served = log.firings('serve')
+        self.assertGreater(served[0], 100.0)
+        during = [time for time in served if time <= 200]
+        self.assertAlmostEqual(len(during) / 100, 2.0, delta=0.4)
+        # Nurses busy at 200 finish their patient, then leave
+        self.assertLessEqual(len(served) - len(during), 2)
+        self.assertEqual(simulator.marking[net.place_index['staff']], 0)
+        self.assertEqual(log.tokens('staff')[0], (100.0, 2))
+
+    def test_capacity_change_takes_effect_at_its_time(self):
+        net = compile_net(
+            {'src': 1, 'ward': (0, 2)},
+            {'arrive': {'type': 'timed', 'delay_mean': 1.0}},
+            [('src', 'arrive'), ('arrive', 'src'), ('arrive', 'ward')],
+        )
+        simulator, log = run(net, [{'place': 'ward', 'action': 'capacity', 'value': 5, 'at': 50}], until=200)
+        ward = log.tokens('ward')
+        self.assertEqual(max(tokens for time, tokens in ward if time < 50), 2)
+        self.assertEqual(min(time for time, tokens in ward if tokens > 2), min(log.firings('arrive')[2:]))
+        self.assertGreater(min(time for time, tokens in ward if tokens > 2), 50.0)
+        self.assertEqual(simulator.marking[net.place_index['ward']], 5)
+        # The compiled net shared with other runs keeps its own bound
+        self.assertEqual(net.capacity[net.place_index['ward']], 2)
@@ -0,0 +1,37 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from rdp.models import PetriNet, Place
+from rdp.serializers import petri_net_cache_key, serialize_petri_nets
+from rdp.tests import create_net
+
+
+class SerializedNetCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.net = create_net('ward', {'queue': 2, 'bed': 0}, {'admit': {}}, [('queue', 'admit'), ('admit', 'bed')])
+
+    def serialize(self):
+        petri_net = PetriNet.objects.get(pk=self.net.pk)
+        return serialize_petri_nets([petri_net])[0], petri_net
+
+    def test_payload_is_cached_under_the_net_version(self):
+        payload, petri_net = self.serialize()
+        self.assertEqual(cache.get(petri_net_cache_key(petri_net)), payload)
+        with self.assertNumQueries(0):
+            self.assertEqual(serialize_petri_nets([petri_net]), [payload])
+
+    def test_stale_entry_is_replaced_after_an_edit(self):
+        stale, before = self.serialize()
+        place = Place.objects.get(petri_net=self.net, id_in_net='queue')
+        place.tokens = 5
+        place.save()
+
+        fresh, after = self.serialize()
+        self.assertGreater(after.version, before.version)
+        self.assertNotEqual(petri_net_cache_key(after), petri_net_cache_key(before))
+        tokens = {p['id_in_net']: p['tokens'] for p in fresh['places']}
+        self.assertEqual(tokens, {'queue': 5, 'bed': 0})
+        self.assertEqual(fresh['version'], after.version)
+        self.assertEqual(cache.get(petri_net_cache_key(after)), fresh)
+        self.assertNotEqual(fresh, stale)
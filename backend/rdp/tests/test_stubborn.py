@@ -0,0 +1,91 @@
+import random
+
+from django.test import SimpleTestCase
+
+from rdp.engine import analyse
+from rdp.tests import compile_net
+
+
+def deadlocks(report):
+    return {tuple(sorted(d['marking'].items())) for d in report['deadlocks']}
+
+
+def compare(net):
+    """Full and stubborn-set reports of ``net``, with every deadlock listed."""
+    return analyse(net, max_witnesses=10_000), analyse(net, max_witnesses=10_000, reduction='stubborn')
+
+
+class StubbornSetTests(SimpleTestCase):
+    def test_independent_rooms_are_not_interleaved(self):
+        # Six rooms admitting then discharging one patient each: 3^6 interleavings, one deadlock
+        places, transitions, arcs = {}, {}, []
+        for i in range(6):
+            places.update({f'wait_{i}': 1, f'bed_{i}': 0, f'home_{i}': 0})
+            transitions.update({f'admit_{i}': {}, f'discharge_{i}': {}})
+            arcs += [(f'wait_{i}', f'admit_{i}'), (f'admit_{i}', f'bed_{i}'),
+                     (f'bed_{i}', f'discharge_{i}'), (f'discharge_{i}', f'home_{i}')]
+        full, reduced = compare(compile_net(places, transitions, arcs))
+        self.assertEqual(full['states'], 3 ** 6)
+        self.assertEqual(reduced['states'], 2 * 6 + 1)
+        self.assertEqual(deadlocks(reduced), deadlocks(full))
+        self.assertEqual(len(deadlocks(full)), 1)
+
+    def test_inhibitor_conflict_keeps_both_deadlocks(self):
+        # Whichever fires first decides the outcome: move disables stay through the inhibitor on b
+        net = compile_net(
+            {'a': 1, 'b': 0, 'c': 1, 'd': 0}, {'move': {}, 'stay': {}},
+            [('a', 'move'), ('move', 'b'), ('c', 'stay'), ('stay', 'd'), ('b', 'stay', 1, 'inhibitor')],
+        )
+        full, reduced = compare(net)
+        self.assertEqual(len(deadlocks(full)), 2)
+        self.assertEqual(deadlocks(reduced), deadlocks(full))
+
+    def test_shared_resource_deadlock_is_found(self):
+        # Two surgeons each take one of two instruments and wait for the other
+        net = compile_net(
+            {'idle_1': 1, 'idle_2': 1, 'left': 1, 'right': 1, 'holds_1': 0, 'holds_2': 0},
+            {'take_1': {}, 'take_2': {}, 'operate_1': {}, 'operate_2': {}},
+            [
+                ('idle_1', 'take_1'), ('left', 'take_1'), ('take_1', 'holds_1'),
+                ('holds_1', 'operate_1'), ('right', 'operate_1'), ('operate_1', 'idle_1'),
+                ('operate_1', 'left'), ('operate_1', 'right'),
+                ('idle_2', 'take_2'), ('right', 'take_2'), ('take_2', 'holds_2'),
+                ('holds_2', 'operate_2'), ('left', 'operate_2'), ('operate_2', 'idle_2'),
+                ('operate_2', 'left'), ('operate_2', 'right'),
+            ],
+        )
+        full, reduced = compare(net)
+        self.assertIs(reduced['deadlock'], True)
+        self.assertEqual(deadlocks(reduced), deadlocks(full))
+        trace = reduced['deadlocks'][0]['trace']
+        self.assertEqual(sorted(trace), ['take_1', 'take_2'])
+
+    def test_properties_not_preserved_are_left_unknown(self):
+        net = compile_net({'a': 1, 'b': 1}, {'t': {}, 'u': {}}, [('a', 't'), ('b', 'u')])
+        _, reduced = compare(net)
+        self.assertTrue(reduced['complete'])
+        self.assertEqual(reduced['reduction'], 'stubborn')
+        self.assertIsNone(reduced['bounded'])
+        self.assertIsNone(reduced['live'])
+        self.assertIsNone(reduced['dead_transitions'])
+
+    def test_random_nets_keep_every_deadlock(self):
+        for seed in range(60):
+            rng = random.Random(seed)
+            places = {f'p{i}': (rng.randint(0, 2), 3) for i in range(5)}
+            arcs = {}
+            for t in (f't{i}' for i in range(5)):
+                for p in rng.sample(sorted(places), rng.randint(1, 2)):
+                    arcs[p, t] = (p, t, rng.randint(1, 2))
+                for p in rng.sample(sorted(places), rng.randint(0, 2)):
+                    arcs[t, p] = (t, p)
+                if rng.random() < 0.3:
+                    p = rng.choice(sorted(places))
+                    arcs.setdefault((p, t), (p, t, rng.randint(1, 2), 'inhibitor'))
+                if rng.random() < 0.15:
+                    p = rng.choice(sorted(places))
+                    arcs.setdefault((p, t), (p, t, 1, 'reset'))
+            net = compile_net(places, {f't{i}': {} for i in range(5)}, list(arcs.values()))
+            full, reduced = compare(net)
+            self.assertEqual(deadlocks(reduced), deadlocks(full), seed)
+            self.assertLessEqual(reduced['states'], full['states'], seed)
@@ -0,0 +1,64 @@
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from rdp.engine import TimedSimulator, run_replication
+from rdp.models import Theme, PetriNet, Place, Transition, Arc
+from rdp.tests import compile_net
+
+
+class TimedSimulatorTests(SimpleTestCase):
+    def test_immediate_cycle_stops_as_timeless(self):
+        net = compile_net({'a': 1, 'b': 0}, {'t1': {}, 't2': {}}, [('a', 't1'), ('t1', 'b'), ('b', 't2'), ('t2', 'a')])
+        result = TimedSimulator(net, seed=1).run(until=10, max_instant=500)
+        self.assertEqual(result.stopped, 'timeless')
+        self.assertEqual(result.events, 500)
+        self.assertEqual(result.time, 0.0)
+
+    def test_zero_delay_timed_cycle_stops_as_timeless(self):
+        net = compile_net(
+            {'a': 1, 'b': 0},
+            {'t1': {'type': 'timed', 'delay_mean': 0.0}, 't2': {'type': 'timed', 'delay_mean': 0.0}},
+            [('a', 't1'), ('t1', 'b'), ('b', 't2'), ('t2', 'a')],
+        )
+        result = TimedSimulator(net, seed=1).run(until=10, max_instant=500)
+        self.assertEqual(result.stopped, 'timeless')
+
+    def test_horizon_run_keeps_a_default_event_budget(self):
+        net = compile_net({'a': 1}, {'t': {'type': 'timed', 'delay_mean': 1.0}}, [('a', 't'), ('t', 'a')])
+        result = TimedSimulator(net, seed=1).run(until=1e12, max_events=50)
+        self.assertEqual(result.stopped, 'max_events')
+        self.assertEqual(result.events, 50)
+
+    def test_bursts_at_one_instant_are_not_timeless(self):
+        # 200 patients cleared by an immediate transition, then the clock moves on
+        net = compile_net(
+            {'src': 1, 'queue': 200, 'done': 0},
+            {'arrive': {'type': 'timed', 'delay_mean': 1.0}, 'serve': {}},
+            [('src', 'arrive'), ('arrive', 'src'), ('arrive', 'queue'), ('queue', 'serve'), ('serve', 'done')],
+        )
+        result = TimedSimulator(net, seed=3).run(until=20, max_instant=250)
+        self.assertEqual(result.stopped, 'horizon')
+        self.assertEqual(result.time, 20)
+
+    def test_replication_reports_its_stop_reason(self):
+        net = compile_net({'a': 1, 'b': 0}, {'t1': {}, 't2': {}}, [('a', 't1'), ('t1', 'b'), ('b', 't2'), ('t2', 'a')])
+        run = run_replication(net, seed=1, until=10, max_events=1000)
+        self.assertEqual(run['stopped'], 'max_events')
+
+
+class TimedSimulationViewTests(TestCase):
+    def test_immediate_cycle_with_horizon_terminates(self):
+        net = PetriNet.objects.create(name='loop', theme=Theme.objects.create(name='loop'))
+        for pid, tokens in (('a', 1), ('b', 0)):
+            Place.objects.create(petri_net=net, id_in_net=pid, label=pid, position={'x': 0, 'y': 0}, tokens=tokens)
+        for tid in ('t1', 't2'):
+            Transition.objects.create(petri_net=net, id_in_net=tid, label=tid, position={'x': 0, 'y': 0})
+        for i, (source, target) in enumerate((('a', 't1'), ('t1', 'b'), ('b', 't2'), ('t2', 'a'))):
+            Arc.objects.create(petri_net=net, id_in_net=f'a{i}', source_id=source, target_id=target)
+
+        response = self.client.post(
+            reverse('petri-net-simulate', args=[net.pk]), {'mode': 'timed', 'until': 10, 'trace': False},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['stopped'], 'timeless')
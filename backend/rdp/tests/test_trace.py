@@ -0,0 +1,71 @@
+from django.test import SimpleTestCase
+
+from rdp.engine import Simulator, TimedSimulator, Trace, TraceRecorder
+from rdp.engine.stats import Observer
+from rdp.tests import compile_net
+
+
+class MarkingLog(Observer):
+    """Full marking after every firing, the replay a trace must reproduce."""
+
+    def start(self, sim):
+        self.markings = [list(sim.marking)]
+        self.times = [0.0]
+
+    def on_fire(self, sim, t, changed):
+        self.markings.append(list(sim.marking))
+        self.times.append(sim.now)
+
+
+def record(simulator_class, interval, **run):
+    net = compile_net(
+        {'src': 1, 'queue': 0, 'server': 1, 'done': 0},
+        {'arrive': {'type': 'timed', 'delay_mean': 1.0}, 'serve': {'type': 'timed', 'delay_mean': 0.8}},
+        [
+            ('src', 'arrive'), ('arrive', 'src'), ('arrive', 'queue'),
+            ('queue', 'serve'), ('server', 'serve'), ('serve', 'server'), ('serve', 'done'),
+        ],
+    )
+    recorder, log = TraceRecorder(interval), MarkingLog()
+    policy = {} if simulator_class is TimedSimulator else {'policy': 'random'}
+    simulator_class(net, seed=5, observers=[recorder, log], **policy).run(**run)
+    return recorder.trace(), log
+
+
+class TraceTests(SimpleTestCase):
+    def assert_replays(self, trace, log):
+        self.assertEqual(len(trace), len(log.markings) - 1)
+        # Every step, so on, just before and just after each checkpoint, in a scrambled order
+        steps = list(range(len(trace) + 1))
+        for step in steps[::-1] + steps[::7] + steps:
+            self.assertEqual(list(trace.marking_at(step)), log.markings[step], step)
+
+    def test_seek_matches_full_replay_timed(self):
+        trace, log = record(TimedSimulator, interval=10, until=200)
+        self.assertGreater(len(trace), 30)
+        self.assert_replays(trace, log)
+        for step in (0, 1, 10, 11, len(trace)):
+            self.assertEqual(trace.time_of(step), log.times[step])
+
+    def test_seek_matches_full_replay_untimed(self):
+        trace, log = record(Simulator, interval=10, steps=95)
+        self.assert_replays(trace, log)
+
+    def test_checkpoint_every_firing(self):
+        trace, log = record(Simulator, interval=1, steps=20)
+        self.assertEqual(len(trace.checkpoints), 21 * len(trace.place_ids))
+        self.assert_replays(trace, log)
+
+    def test_seek_after_storage_round_trip(self):
+        trace, log = record(TimedSimulator, interval=10, until=100)
+        checkpoints, deltas = trace.to_bytes()
+        restored = Trace.from_bytes(trace.place_ids, trace.transition_ids, checkpoints, deltas, timed=True)
+        self.assert_replays(restored, log)
+        self.assertEqual(restored.step_at(log.times[10]), 10)
+
+    def test_seek_outside_the_run(self):
+        trace, _ = record(Simulator, interval=10, steps=5)
+        with self.assertRaises(IndexError):
+            trace.marking_at(6)
+        with self.assertRaises(IndexError):
+            trace.marking_at(-1)
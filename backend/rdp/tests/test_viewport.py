@@ -0,0 +1,54 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from rdp.models import Layer, PetriNet, Place, Transition
+from rdp.tests import create_net
+
+
+class ViewportTests(TestCase):
+    def setUp(self):
+        # Places at x = 0, 100, 200 and one far away; transitions at y = 100
+        self.net = create_net('ward', {'p0': 1, 'p1': 0, 'p2': 0}, {'t0': {}}, [('p0', 't0'), ('t0', 'p1')])
+        Place.objects.create(petri_net=self.net, id_in_net='far', label='far', position={'x': 5000, 'y': 5000})
+
+    def viewport(self, **box):
+        response = self.client.get(reverse('petri-net-viewport', args=[self.net.pk]), box)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def ids(self, payload, kind):
+        return sorted(node['id_in_net'] for node in payload[kind])
+
+    def test_box_returns_the_nodes_inside_and_their_arcs(self):
+        payload = self.viewport(x_min=-10, y_min=-10, x_max=150, y_max=150)
+        self.assertEqual(self.ids(payload, 'places'), ['p0', 'p1'])
+        self.assertEqual(self.ids(payload, 'transitions'), ['t0'])
+        self.assertEqual(sorted(arc['id_in_net'] for arc in payload['arcs']), ['a0', 'a1'])
+
+    def test_layer_filter(self):
+        layer = Layer.objects.create(name='ward', theme=self.net.theme)
+        place = Place.objects.get(petri_net=self.net, id_in_net='p1')
+        place.layer = layer
+        place.save()
+        payload = self.viewport(x_min=-10, y_min=-10, x_max=250, y_max=150, layers=[layer.pk])
+        self.assertEqual(self.ids(payload, 'places'), ['p1'])
+
+    def test_index_positions_backfills_existing_nodes(self):
+        # Rows written before the grid columns existed
+        Place.objects.update(grid_x=None, grid_y=None)
+        Transition.objects.update(grid_x=None, grid_y=None)
+        self.assertEqual(self.viewport(x_min=-10, y_min=-10, x_max=150, y_max=150)['places'], [])
+
+        version = PetriNet.objects.get(pk=self.net.pk).version
+        out = StringIO()
+        call_command('index_positions', stdout=out)
+        self.assertIn('5 nodes indexed', out.getvalue())
+        self.assertGreater(PetriNet.objects.get(pk=self.net.pk).version, version)
+
+        payload = self.viewport(x_min=-10, y_min=-10, x_max=150, y_max=150)
+        self.assertEqual(self.ids(payload, 'places'), ['p0', 'p1'])
+        self.assertEqual(self.ids(payload, 'transitions'), ['t0'])
+        self.assertEqual(Place.objects.get(id_in_net='far').grid_x, 10)
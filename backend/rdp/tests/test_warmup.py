@@ -0,0 +1,42 @@
+from django.test import SimpleTestCase
+
+from rdp.engine import TimedSimulator, mser, run_replication
+from rdp.tests import compile_net
+
+
+def queue_net():
+    """Poisson arrivals (rate 1) served by one server twice as fast."""
+    return compile_net(
+        {'src': 1, 'queue': 0, 'server': 1, 'done': 0},
+        {'arrive': {'type': 'timed', 'delay_mean': 1.0}, 'serve': {'type': 'timed', 'delay_mean': 0.5}},
+        [
+            ('src', 'arrive'), ('arrive', 'src'), ('arrive', 'queue'),
+            ('queue', 'serve'), ('server', 'serve'), ('serve', 'server'), ('serve', 'done'),
+        ],
+    )
+
+
+class WarmUpTests(SimpleTestCase):
+    def test_mser_truncates_the_initial_transient(self):
+        self.assertEqual(mser([10.0] * 20 + [1.0, 2.0] * 40), 20)
+        self.assertEqual(mser([1.0, 2.0] * 40), 0)
+
+    def test_warmup_firings_are_left_out_of_the_throughput(self):
+        net = queue_net()
+        arrive = net.transition_index['arrive']
+        full = run_replication(net, 1, until=2000)
+        warmed = run_replication(net, 1, until=2000, warmup=1500)
+        self.assertAlmostEqual(full['throughput'][arrive], 1.0, delta=0.1)
+        self.assertAlmostEqual(warmed['throughput'][arrive], 1.0, delta=0.2)
+
+    def test_warm_state_resumes_the_run(self):
+        net = queue_net()
+        original = TimedSimulator(net, seed=4)
+        original.run(until=50)
+        state, before = original.snapshot(), list(original.counts)
+        original.run(until=100)
+
+        resumed = TimedSimulator(net, warm_state=state)
+        resumed.run(until=50)
+        self.assertEqual(list(resumed.marking), list(original.marking))
+        self.assertEqual(resumed.counts, [n - m for n, m in zip(original.counts, before)])
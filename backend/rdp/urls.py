@@ -3,8 +3,16 @@ from .views import (
     ThemeListView, ThemeCreateView, ThemeRetrieveView, ThemeUpdateView, ThemeDeleteView,
     LayerListView, LayerCreateView, LayerRetrieveView, LayerUpdateView, LayerDeleteView,
     PetriNetListView, PetriNetCreateView, PetriNetRetrieveView, PetriNetUpdateView, PetriNetDeleteView,
-    PlaceListView, PlaceCreateView, PlaceRetrieveView, PlaceUpdateView, PlaceDeleteView,
+    PetriNetSimulateView, PetriNetReplicateView, PetriNetSweepView, PetriNetValidateView, PetriNetOptimizeView,
+    PetriNetWarmUpView,
+    PetriNetFireView, PetriNetImportView, PetriNetExportView, PetriNetCloneSubnetView, PetriNetViewportView,
+    PetriNetRunListView, SimulationRunRetrieveView, SimulationRunDeleteView, SimulationRunMarkingView,
+    SimulationRunFiringsView, SimulationRunKPIView,
+    WarmStateListView, WarmStateRetrieveView, WarmStateDeleteView,
+    ScheduleListView, ScheduleCreateView, ScheduleRetrieveView, ScheduleUpdateView, ScheduleDeleteView,
+    PlaceListView, PlaceCreateView, PlaceRetrieveView, PlaceUpdateView, PlaceDeleteView, PlaceAdjacencyView,
     TransitionListView, TransitionCreateView, TransitionRetrieveView, TransitionUpdateView, TransitionDeleteView,
+    TransitionAdjacencyView,
     ArcListView, ArcCreateView, ArcRetrieveView, ArcUpdateView, ArcDeleteView
 )
 
@@ -26,9 +34,40 @@ urlpatterns = [
     # PetriNet URLs
     path('petri-nets/', PetriNetListView.as_view(), name='petri-net-list'),
     path('petri-nets/create/', PetriNetCreateView.as_view(), name='petri-net-create'),
+    path('petri-nets/import/', PetriNetImportView.as_view(), name='petri-net-import'),
     path('petri-nets/<int:pk>/', PetriNetRetrieveView.as_view(), name='petri-net-retrieve'),
     path('petri-nets/<int:pk>/update/', PetriNetUpdateView.as_view(), name='petri-net-update'),
     path('petri-nets/<int:pk>/delete/', PetriNetDeleteView.as_view(), name='petri-net-delete'),
+    path('petri-nets/<int:pk>/simulate/', PetriNetSimulateView.as_view(), name='petri-net-simulate'),
+    path('petri-nets/<int:pk>/replicate/', PetriNetReplicateView.as_view(), name='petri-net-replicate'),
+    path('petri-nets/<int:pk>/sweep/', PetriNetSweepView.as_view(), name='petri-net-sweep'),
+    path('petri-nets/<int:pk>/optimize/', PetriNetOptimizeView.as_view(), name='petri-net-optimize'),
+    path('petri-nets/<int:pk>/warm-up/', PetriNetWarmUpView.as_view(), name='petri-net-warm-up'),
+    path('petri-nets/<int:pk>/validate/', PetriNetValidateView.as_view(), name='petri-net-validate'),
+    path('petri-nets/<int:pk>/fire/', PetriNetFireView.as_view(), name='petri-net-fire'),
+    path('petri-nets/<int:pk>/export/', PetriNetExportView.as_view(), name='petri-net-export'),
+    path('petri-nets/<int:pk>/viewport/', PetriNetViewportView.as_view(), name='petri-net-viewport'),
+    path('petri-nets/<int:pk>/clone-subnet/', PetriNetCloneSubnetView.as_view(), name='petri-net-clone-subnet'),
+    path('petri-nets/<int:pk>/runs/', PetriNetRunListView.as_view(), name='petri-net-runs'),
+
+    # SimulationRun URLs
+    path('runs/<int:pk>/', SimulationRunRetrieveView.as_view(), name='run-retrieve'),
+    path('runs/<int:pk>/delete/', SimulationRunDeleteView.as_view(), name='run-delete'),
+    path('runs/<int:pk>/marking/', SimulationRunMarkingView.as_view(), name='run-marking'),
+    path('runs/<int:pk>/firings/', SimulationRunFiringsView.as_view(), name='run-firings'),
+    path('runs/<int:pk>/kpis/', SimulationRunKPIView.as_view(), name='run-kpis'),
+
+    # WarmState URLs
+    path('warm-states/', WarmStateListView.as_view(), name='warm-state-list'),
+    path('warm-states/<int:pk>/', WarmStateRetrieveView.as_view(), name='warm-state-retrieve'),
+    path('warm-states/<int:pk>/delete/', WarmStateDeleteView.as_view(), name='warm-state-delete'),
+
+    # Schedule URLs
+    path('schedules/', ScheduleListView.as_view(), name='schedule-list'),
+    path('schedules/create/', ScheduleCreateView.as_view(), name='schedule-create'),
+    path('schedules/<int:pk>/', ScheduleRetrieveView.as_view(), name='schedule-retrieve'),
+    path('schedules/<int:pk>/update/', ScheduleUpdateView.as_view(), name='schedule-update'),
+    path('schedules/<int:pk>/delete/', ScheduleDeleteView.as_view(), name='schedule-delete'),
 
     # Place URLs
     path('places/', PlaceListView.as_view(), name='place-list'),
@@ -36,6 +75,7 @@ urlpatterns = [
     path('places/<int:pk>/', PlaceRetrieveView.as_view(), name='place-retrieve'),
     path('places/<int:pk>/update/', PlaceUpdateView.as_view(), name='place-update'),
     path('places/<int:pk>/delete/', PlaceDeleteView.as_view(), name='place-delete'),
+    path('places/<int:pk>/adjacency/', PlaceAdjacencyView.as_view(), name='place-adjacency'),
 
     # Transition URLs
     path('transitions/', TransitionListView.as_view(), name='transition-list'),
@@ -43,6 +83,7 @@ urlpatterns = [
     path('transitions/<int:pk>/', TransitionRetrieveView.as_view(), name='transition-retrieve'),
     path('transitions/<int:pk>/update/', TransitionUpdateView.as_view(), name='transition-update'),
     path('transitions/<int:pk>/delete/', TransitionDeleteView.as_view(), name='transition-delete'),
+    path('transitions/<int:pk>/adjacency/', TransitionAdjacencyView.as_view(), name='transition-adjacency'),
 
     # Arc URLs
     path('arcs/', ArcListView.as_view(), name='arc-list'),
@@ -1,11 +1,83 @@
+from array import array
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import ValidationError
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from .models import Theme, Layer, PetriNet, Place, Transition, Arc
+from .models import Theme, Layer, PetriNet, Place, Transition, Arc, Schedule, WarmState, SimulationRun, grid_cell
 from .serializers import (
     ThemeSerializer, LayerSerializer, PetriNetSerializer,
-    PlaceSerializer, TransitionSerializer, ArcSerializer, ThemeDetailSerializer
+    PlaceSerializer, TransitionSerializer, ArcSerializer, ThemeDetailSerializer,
+    SimulationRequestSerializer, ReplicationRequestSerializer, SweepRequestSerializer,
+    ValidationRequestSerializer, FireRequestSerializer, serialize_petri_nets,
+    SimulationRunSerializer, RunMarkingRequestSerializer, RunFiringsRequestSerializer, CloneSubnetRequestSerializer,
+    ScheduleSerializer, OptimizationRequestSerializer, WarmStateSerializer, WarmUpRequestSerializer,
+    ViewportRequestSerializer
+)
+from .signals import bump_version
+from .pagination import KeysetPagination
+from . import interchange
+from .engine import (
+    Simulator, TimedSimulator, ColoredSimulator, TraceRecorder, KPICollector, SteadyStateMonitor, replicate, optimize,
+    analyse, structural_analysis, reduce_net,
 )
+from .engine.loader import load_compiled_net, load_colored_net, load_schedule, load_warm_state
+
+
+def filtered_list(request, queryset, serializer_class, filters=(), ordering='id_in_net'):
+    """
+    Shared GET handler of the node list views: ``?petri_net=``/``?theme=`` filters, ``?fields=a,b``
+    sparse fieldsets and, when ``?limit=``/``?cursor=`` is given, keyset pagination.
+    """
+    for name in filters:
+        value = request.query_params.get(name)
+        if value:
+            if not value.isdigit():
+                raise ValidationError({name: 'A valid integer is required'})
+            queryset = queryset.filter(**{f'{name}_id': int(value)})
+
+    fields = [f for f in request.query_params.get('fields', '').split(',') if f] or None
+    if fields:
+        serializer_class(fields=fields)  # rejects unknown names before querying
+        queryset = queryset.only(*{*fields, ordering} - {'id'})
+
+    paginator = KeysetPagination(ordering)
+    if not paginator.requested(request):
+        return Response(serializer_class(queryset, many=True, fields=fields).data)
+    page, next_cursor = paginator.paginate(queryset, request)
+    return Response({'results': serializer_class(page, many=True, fields=fields).data, 'next_cursor': next_cursor})
+
+
+def run_timed(petri_net, net, params, observers=()):
+    """
+    Timed run of a simulate or warm-up request, from its warm state, with its schedule and,
+    when ``precision`` is given, stopped by a :class:`SteadyStateMonitor` once precise enough.
+    Returns the simulator, its result and the monitor (``None`` without ``precision``).
+    """
+    monitor = SteadyStateMonitor(**params['precision']) if params['precision'] else None
+    simulator = TimedSimulator(
+        net, seed=params['seed'], delays=params['delays'], server=params['server'],
+        observers=[*observers, monitor] if monitor else observers,
+        schedule=load_schedule(petri_net, params['schedule'], net),
+        warm_state=load_warm_state(petri_net, params['warm_state']),
+    )
+    return simulator, simulator.run(until=params['until'], max_events=params['steps']), monitor
+
+
+def adjacency(node):
+    """Pre-set and post-set of a place or transition, through the indexed arc endpoints."""
+    inputs = ArcSerializer(node.inputs.order_by('id_in_net'), many=True).data
+    outputs = ArcSerializer(node.outputs.order_by('id_in_net'), many=True).data
+    return Response({
+        'id_in_net': node.id_in_net,
+        'preset': sorted({arc['source_id'] for arc in inputs}),
+        'postset': sorted({arc['target_id'] for arc in outputs}),
+        'inputs': inputs,
+        'outputs': outputs,
+    })
 
 
 # Theme Views
@@ -28,7 +100,7 @@ class ThemeCreateView(APIView):
 class ThemeRetrieveView(APIView):
     def get(self, request, pk):
         try:
-            theme = Theme.objects.get(pk=pk)
+            theme = Theme.objects.prefetch_related('layers', 'petri_nets').get(pk=pk)
             serializer = ThemeDetailSerializer(theme)
             return Response(serializer.data)
         except Theme.DoesNotExist:
@@ -64,9 +136,7 @@ class ThemeDeleteView(APIView):
 # Layer Views
 class LayerListView(APIView):
     def get(self, request):
-        layers = Layer.objects.all()
-        serializer = LayerSerializer(layers, many=True)
-        return Response(serializer.data)
+        return filtered_list(request, Layer.objects.all(), LayerSerializer, filters=['theme'], ordering='name')
 
 
 class LayerCreateView(APIView):
@@ -115,8 +185,12 @@ class LayerDeleteView(APIView):
 class PetriNetListView(APIView):
     def get(self, request):
         petri_nets = PetriNet.objects.all()
-        serializer = PetriNetSerializer(petri_nets, many=True)
-        return Response(serializer.data)
+        theme = request.query_params.get('theme')
+        if theme:
+            if not theme.isdigit():
+                return Response({'theme': 'A valid integer is required'}, status=status.HTTP_400_BAD_REQUEST)
+            petri_nets = petri_nets.filter(theme_id=int(theme))
+        return Response(serialize_petri_nets(petri_nets))
 
 
 class PetriNetCreateView(APIView):
@@ -132,8 +206,7 @@ class PetriNetRetrieveView(APIView):
     def get(self, request, pk):
         try:
             petri_net = PetriNet.objects.get(pk=pk)
-            serializer = PetriNetSerializer(petri_net)
-            return Response(serializer.data)
+            return Response(serialize_petri_nets([petri_net])[0])
         except PetriNet.DoesNotExist:
             return Response({'error': 'PetriNet not found'}, status=status.HTTP_404_NOT_FOUND)
 
@@ -161,12 +234,522 @@ class PetriNetDeleteView(APIView):
             return Response({'error': 'PetriNet not found'}, status=status.HTTP_404_NOT_FOUND)
 
 
+class PetriNetSimulateView(APIView):
+    def post(self, request, pk):
+        try:
+            petri_net = PetriNet.objects.get(pk=pk)
+        except PetriNet.DoesNotExist:
+            return Response({'error': 'PetriNet not found'}, status=status.HTTP_404_NOT_FOUND)
+        serializer = SimulationRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        params = serializer.validated_data
+        if params['mode'] == 'colored':
+            simulator = ColoredSimulator(load_colored_net(petri_net), policy=params['policy'], seed=params['seed'])
+            return Response(simulator.run(params['steps'], trace=params['trace']).as_dict())
+        net = load_compiled_net(petri_net)
+        observers = [TraceRecorder(params['checkpoint_interval']), KPICollector()] if params['record'] else []
+        reduction = None
+        if params['reduce']:
+            # Nodes a schedule or the precision stop refer to must survive the reduction
+            keep = [place for schedule in Schedule.objects.filter(pk=params['schedule'], petri_net=petri_net)
+                    for place in schedule.places()]
+            keep += params['precision']['places'] if params['precision'] else []
+            reduction = reduce_net(net, timed=params['mode'] == 'timed', keep=keep)
+            net = reduction.net
+            params = {**params, 'delays': reduction.translate_delays(params['delays'])}
+        monitor = None
+        if params['mode'] == 'timed':
+            try:
+                _, result, monitor = run_timed(petri_net, net, params, observers)
+            except Schedule.DoesNotExist:
+                return Response({'error': 'Schedule not found'}, status=status.HTTP_404_NOT_FOUND)
+            except WarmState.DoesNotExist:
+                return Response({'error': 'WarmState not found'}, status=status.HTTP_404_NOT_FOUND)
+            except (ValueError, TypeError) as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            stopped, end_time = result.stopped, result.time
+        else:
+            simulator = Simulator(net, policy=params['policy'], seed=params['seed'], observers=observers)
+            result = simulator.run(params['steps'], trace=params['trace'])
+            stopped, end_time = 'deadlock' if result.deadlock else 'steps', float(result.steps)
+        data = result.as_dict()
+        if reduction is not None:
+            data = reduction.simulation(data)
+        if monitor is not None:
+            data['steady_state'] = monitor.as_dict()
+        if params['record']:
+            recorder, kpis = observers
+            run = SimulationRun.from_recorder(
+                petri_net, recorder, params['mode'], serializer.data, stopped, end_time, kpis=kpis.as_dict()
+            )
+            data['run'] = run.pk
+        return Response(data)
+
+
+class PetriNetReplicateView(APIView):
+    def post(self, request, pk):
+        try:
+            petri_net = PetriNet.objects.get(pk=pk)
+        except PetriNet.DoesNotExist:
+            return Response({'error': 'PetriNet not found'}, status=status.HTTP_404_NOT_FOUND)
+        serializer = ReplicationRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        params = dict(serializer.validated_data)
+        net = load_compiled_net(petri_net)
+        try:
+            params['schedule'] = load_schedule(petri_net, params['schedule'], net)
+            params['warm_state'] = load_warm_state(petri_net, params['warm_state'])
+            summary = replicate(net, **params)
+        except Schedule.DoesNotExist:
+            return Response({'error': 'Schedule not found'}, status=status.HTTP_404_NOT_FOUND)
+        except WarmState.DoesNotExist:
+            return Response({'error': 'WarmState not found'}, status=status.HTTP_404_NOT_FOUND)
+        except (ValueError, TypeError) as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(summary)
+
+
+class PetriNetOptimizeView(APIView):
+    def post(self, request, pk):
+        """Cheapest resource levels meeting the KPI targets (successive halving over replications)."""
+        try:
+            petri_net = PetriNet.objects.get(pk=pk)
+        except PetriNet.DoesNotExist:
+            return Response({'error': 'PetriNet not found'}, status=status.HTTP_404_NOT_FOUND)
+        serializer = OptimizationRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        params = dict(serializer.validated_data)
+        net = load_compiled_net(petri_net)
+        try:
+            params['schedule'] = load_schedule(petri_net, params['schedule'], net)
+            result = optimize(net, **params)
+        except Schedule.DoesNotExist:
+            return Response({'error': 'Schedule not found'}, status=status.HTTP_404_NOT_FOUND)
+        except (ValueError, TypeError) as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result)
+
+
+class PetriNetWarmUpView(APIView):
+    def post(self, request, pk):
+        """Simulate a warm-up and store where it ended as a named warm state of the net."""
+        try:
+            petri_net = PetriNet.objects.get(pk=pk)
+        except PetriNet.DoesNotExist:
+            return Response({'error': 'PetriNet not found'}, status=status.HTTP_404_NOT_FOUND)
+        serializer = WarmUpRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        params = {**serializer.validated_data, 'steps': serializer.validated_data['max_events']}
+        if WarmState.objects.filter(petri_net=petri_net, name=params['name']).exists():
+            return Response({'name': ['A warm state with this name already exists.']},
+                            status=status.HTTP_400_BAD_REQUEST)
+        net = load_compiled_net(petri_net)
+        try:
+            simulator, result, monitor = run_timed(petri_net, net, params)
+        except Schedule.DoesNotExist:
+            return Response({'error': 'Schedule not found'}, status=status.HTTP_404_NOT_FOUND)
+        except WarmState.DoesNotExist:
+            return Response({'error': 'WarmState not found'}, status=status.HTTP_404_NOT_FOUND)
+        except (ValueError, TypeError) as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        warm_state = WarmState.objects.create(
+            petri_net=petri_net, name=params['name'], time=result.time, state=simulator.snapshot(),
+            parameters={**serializer.data, 'stopped': result.stopped},
+            steady_state=monitor.as_dict() if monitor is not None else None,
+        )
+        return Response(WarmStateSerializer(warm_state).data, status=status.HTTP_201_CREATED)
+
+
+class PetriNetSweepView(APIView):
+    def post(self, request, pk):
+        try:
+            petri_net = PetriNet.objects.get(pk=pk)
+        except PetriNet.DoesNotExist:
+            return Response({'error': 'PetriNet not found'}, status=status.HTTP_404_NOT_FOUND)
+        serializer = SweepRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            result = petri_net.sweep(**serializer.validated_data)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result)
+
+
+class PetriNetValidateView(APIView):
+    def get(self, request, pk):
+        try:
+            petri_net = PetriNet.objects.get(pk=pk)
+        except PetriNet.DoesNotExist:
+            return Response({'error': 'PetriNet not found'}, status=status.HTTP_404_NOT_FOUND)
+        serializer = ValidationRequestSerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        params = serializer.validated_data
+        max_memory = params['max_memory_mb'] * 1024 * 1024 if params['max_memory_mb'] else None
+
+        net = load_compiled_net(petri_net)
+        # Cheap structural answers first; the state space is only explored if asked for
+        structure = structural_analysis(net)
+        if params['structural_only']:
+            report = {'bounded': True if structure['bounded'] else None, 'deadlock': None, 'live': None}
+        else:
+            reduction = None if params['reduction'] == 'none' else params['reduction']
+            if params['reduce']:
+                reduced = reduce_net(net)
+                report = reduced.analysis(
+                    analyse(reduced.net, max_states=params['max_states'], max_memory=max_memory, reduction=reduction)
+                )
+            else:
+                report = analyse(net, max_states=params['max_states'], max_memory=max_memory, reduction=reduction)
+        if report['bounded'] is None and structure['bounded']:
+            report['bounded'] = True
+            report['bounded_by'] = 'structure'
+        report['structure'] = structure
+        # Same keys as the editor's local check, for the current marking
+        report['concurrent'] = len(net.enabled(net.initial_marking))
+        return Response(report)
+
+
+class PetriNetFireView(APIView):
+    def post(self, request, pk):
+        serializer = FireRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        sequence = serializer.validated_data['transitions']
+
+        with transaction.atomic():
+            try:
+                # Serialises concurrent firings on the same net (where the backend supports row locks)
+                petri_net = PetriNet.objects.select_for_update().get(pk=pk)
+            except PetriNet.DoesNotExist:
+                return Response({'error': 'PetriNet not found'}, status=status.HTTP_404_NOT_FOUND)
+            net = load_compiled_net(petri_net)
+
+            unknown = sorted({tid for tid in sequence if tid not in net.transition_index})
+            if unknown:
+                return Response({'error': f"Unknown transitions: {', '.join(unknown)}"}, status=status.HTTP_400_BAD_REQUEST)
+
+            marking = array('l', net.initial_marking)
+            for step, tid in enumerate(sequence):
+                t = net.transition_index[tid]
+                if not net.is_enabled(marking, t):
+                    return Response(
+                        {'error': f"Transition {tid} is not enabled", 'step': step, 'fired': sequence[:step]},
+                        status=status.HTTP_409_CONFLICT
+                    )
+                net.fire(marking, t)
+
+            changed = {
+                pid: tokens for pid, tokens, before in zip(net.place_ids, marking, net.initial_marking)
+                if tokens != before
+            }
+            places = list(Place.objects.filter(petri_net=petri_net, id_in_net__in=changed))
+            # A P/T firing cannot tell which colours move: coloured places are only fired by coloured runs
+            colored = sorted(place.id_in_net for place in places if place.colored_tokens)
+            if colored:
+                return Response(
+                    {'error': f"Places hold coloured tokens: {', '.join(colored)}", 'places': colored},
+                    status=status.HTTP_409_CONFLICT
+                )
+            for place in places:
+                place.tokens = changed[place.id_in_net]
+            Place.objects.bulk_update(places, ['tokens'])
+            if places:
+                bump_version(petri_net.pk)
+
+        return Response({
+            'fired': sequence,
+            'changed': changed,
+            'marking': net.marking_dict(marking),
+        })
+
+
+class PetriNetImportView(APIView):
+    def post(self, request):
+        """
+        Body: NDJSON records (``application/x-ndjson``), the same records as msgpack objects
+        (``application/x-msgpack``) or the editor's JSON export (``application/json``, ``?name=`` required).
+        ``?theme=``/``?name=`` override the header record.
+        """
+        content_type = request.content_type.split(';')[0].strip()
+        if content_type == interchange.MSGPACK:
+            if interchange.msgpack is None:
+                return Response({'error': 'msgpack is not installed on the server'}, status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+            decode = interchange.decode_msgpack
+        elif content_type == 'application/json':
+            decode = interchange.decode_document
+        else:
+            decode = interchange.decode_ndjson
+        if request.stream is None:
+            return Response({'error': 'Empty body'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            with transaction.atomic():
+                petri_net, counts = interchange.import_net(
+                    decode(request.stream),
+                    theme=request.query_params.get('theme'),
+                    name=request.query_params.get('name'),
+                )
+        except interchange.NetImportError as e:
+            return Response(e.as_dict(), status=status.HTTP_400_BAD_REQUEST)
+        except IntegrityError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'id': petri_net.pk, 'name': petri_net.name, 'theme': petri_net.theme_id, **counts},
+                        status=status.HTTP_201_CREATED)
+
+
+class PetriNetExportView(APIView):
+    def get(self, request, pk):
+        """Streams the net as NDJSON, or as msgpack with ``?encoding=msgpack``."""
+        try:
+            petri_net = PetriNet.objects.get(pk=pk)
+        except PetriNet.DoesNotExist:
+            return Response({'error': 'PetriNet not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        records = interchange.export_records(petri_net)
+        if request.query_params.get('encoding') == 'msgpack':
+            if interchange.msgpack is None:
+                return Response({'error': 'msgpack is not installed on the server'}, status=status.HTTP_406_NOT_ACCEPTABLE)
+            response = StreamingHttpResponse(interchange.encode_msgpack(records), content_type=interchange.MSGPACK)
+            extension = 'msgpack'
+        else:
+            response = StreamingHttpResponse(interchange.encode_ndjson(records), content_type=interchange.NDJSON)
+            extension = 'ndjson'
+        response['Content-Disposition'] = f'attachment; filename="petri-net-{petri_net.pk}.{extension}"'
+        return response
+
+
+class PetriNetViewportView(APIView):
+    def get(self, request, pk):
+        """
+        Nodes of the net (of ``?layers=``, when given) whose position lies in the box
+        ``x_min..x_max`` x ``y_min..y_max``, and the arcs attached to them. Nodes are found
+        through their grid cell, so the cost follows what is on screen, not the size of the net.
+        """
+        try:
+            petri_net = PetriNet.objects.get(pk=pk)
+        except PetriNet.DoesNotExist:
+            return Response({'error': 'PetriNet not found'}, status=status.HTTP_404_NOT_FOUND)
+        serializer = ViewportRequestSerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        params = serializer.validated_data
+        (column_min, row_min), (column_max, row_max) = (
+            grid_cell({'x': params['x_min'], 'y': params['y_min']}), grid_cell({'x': params['x_max'], 'y': params['y_max']})
+        )
+        cells = {
+            'petri_net': petri_net, 'grid_x__gte': column_min, 'grid_x__lte': column_max,
+            'grid_y__gte': row_min, 'grid_y__lte': row_max,
+        }
+        if params['layers']:
+            cells['layer__in'] = params['layers']
+
+        def inside(node):
+            # Cells at the border of the box are only partly in it
+            x, y = node.position['x'], node.position['y']
+            return params['x_min'] <= x <= params['x_max'] and params['y_min'] <= y <= params['y_max']
+
+        places = [place for place in Place.objects.filter(**cells) if inside(place)]
+        transitions = [transition for transition in Transition.objects.filter(**cells) if inside(transition)]
+        place_pks = [place.pk for place in places]
+        transition_pks = [transition.pk for transition in transitions]
+        arcs = Arc.objects.filter(petri_net=petri_net).filter(
+            Q(source_place__in=place_pks) | Q(target_place__in=place_pks)
+            | Q(source_transition__in=transition_pks) | Q(target_transition__in=transition_pks)
+        )
+        return Response({
+            'places': PlaceSerializer(places, many=True).data,
+            'transitions': TransitionSerializer(transitions, many=True).data,
+            'arcs': ArcSerializer(arcs, many=True).data,
+        })
+
+
+class PetriNetCloneSubnetView(APIView):
+    def post(self, request, pk):
+        try:
+            petri_net = PetriNet.objects.get(pk=pk)
+        except PetriNet.DoesNotExist:
+            return Response({'error': 'PetriNet not found'}, status=status.HTTP_404_NOT_FOUND)
+        serializer = CloneSubnetRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            with transaction.atomic():
+                copies = interchange.clone_subnet(petri_net, **serializer.validated_data)
+        except interchange.SubnetCloneError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except IntegrityError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        bump_version(petri_net.pk, structure=True)
+        return Response({'copies': copies}, status=status.HTTP_201_CREATED)
+
+
+# SimulationRun Views
+class PetriNetRunListView(APIView):
+    def get(self, request, pk):
+        runs = SimulationRun.objects.filter(petri_net_id=pk).defer('checkpoints', 'deltas')
+        serializer = SimulationRunSerializer(runs, many=True)
+        return Response(serializer.data)
+
+
+class SimulationRunRetrieveView(APIView):
+    def get(self, request, pk):
+        try:
+            run = SimulationRun.objects.defer('checkpoints', 'deltas').get(pk=pk)
+            serializer = SimulationRunSerializer(run)
+            return Response(serializer.data)
+        except SimulationRun.DoesNotExist:
+            return Response({'error': 'SimulationRun not found'}, status=status.HTTP_404_NOT_FOUND)
+
+
+class SimulationRunDeleteView(APIView):
+    def delete(self, request, pk):
+        try:
+            run = SimulationRun.objects.get(pk=pk)
+            run.delete()
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        except SimulationRun.DoesNotExist:
+            return Response({'error': 'SimulationRun not found'}, status=status.HTTP_404_NOT_FOUND)
+
+
+class SimulationRunMarkingView(APIView):
+    def get(self, request, pk):
+        """Marking after ``?step=k`` firings, or at ``?time=t``."""
+        try:
+            run = SimulationRun.objects.get(pk=pk)
+        except SimulationRun.DoesNotExist:
+            return Response({'error': 'SimulationRun not found'}, status=status.HTTP_404_NOT_FOUND)
+        serializer = RunMarkingRequestSerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        trace = run.trace()
+        step = serializer.validated_data.get('step')
+        if step is None:
+            step = trace.step_at(serializer.validated_data['time'])
+        elif step > len(trace):
+            return Response({'error': f"Run has {len(trace)} steps"}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'step': step,
+            'time': trace.time_of(step),
+            'marking': dict(zip(trace.place_ids, trace.marking_at(step))),
+        })
+
+
+class SimulationRunKPIView(APIView):
+    def get(self, request, pk):
+        try:
+            run = SimulationRun.objects.defer('checkpoints', 'deltas').get(pk=pk)
+        except SimulationRun.DoesNotExist:
+            return Response({'error': 'SimulationRun not found'}, status=status.HTTP_404_NOT_FOUND)
+        if run.kpis is None:
+            return Response({'error': 'No KPIs were collected for this run'}, status=status.HTTP_404_NOT_FOUND)
+        return Response({'run': run.pk, 'mode': run.mode, 'steps': run.steps, **run.kpis})
+
+
+class SimulationRunFiringsView(APIView):
+    def get(self, request, pk):
+        """Firings with ``start <= time <= end`` and the marking just before the first of them."""
+        try:
+            run = SimulationRun.objects.get(pk=pk)
+        except SimulationRun.DoesNotExist:
+            return Response({'error': 'SimulationRun not found'}, status=status.HTTP_404_NOT_FOUND)
+        serializer = RunFiringsRequestSerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        params = serializer.validated_data
+        trace = run.trace()
+        firings = trace.firings(params['start'], params.get('end', run.end_time), limit=params['limit'])
+        step = firings[0]['step'] - 1 if firings else trace.step_at(params['start'])
+        return Response({
+            'step': step,
+            'marking': dict(zip(trace.place_ids, trace.marking_at(step))),
+            'firings': firings,
+        })
+
+
+# WarmState Views
+class WarmStateListView(APIView):
+    def get(self, request):
+        return filtered_list(request, WarmState.objects.all(), WarmStateSerializer, filters=['petri_net'], ordering='name')
+
+
+class WarmStateRetrieveView(APIView):
+    def get(self, request, pk):
+        try:
+            warm_state = WarmState.objects.get(pk=pk)
+            serializer = WarmStateSerializer(warm_state)
+            return Response(serializer.data)
+        except WarmState.DoesNotExist:
+            return Response({'error': 'WarmState not found'}, status=status.HTTP_404_NOT_FOUND)
+
+
+class WarmStateDeleteView(APIView):
+    def delete(self, request, pk):
+        try:
+            warm_state = WarmState.objects.get(pk=pk)
+            warm_state.delete()
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        except WarmState.DoesNotExist:
+            return Response({'error': 'WarmState not found'}, status=status.HTTP_404_NOT_FOUND)
+
+
+# Schedule Views
+class ScheduleListView(APIView):
+    def get(self, request):
+        return filtered_list(request, Schedule.objects.all(), ScheduleSerializer, filters=['petri_net'], ordering='name')
+
+
+class ScheduleCreateView(APIView):
+    def post(self, request):
+        serializer = ScheduleSerializer(data=request.data)
+        if serializer.is_valid():
+            serializer.save()
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class ScheduleRetrieveView(APIView):
+    def get(self, request, pk):
+        try:
+            schedule = Schedule.objects.get(pk=pk)
+            serializer = ScheduleSerializer(schedule)
+            return Response(serializer.data)
+        except Schedule.DoesNotExist:
+            return Response({'error': 'Schedule not found'}, status=status.HTTP_404_NOT_FOUND)
+
+
+class ScheduleUpdateView(APIView):
+    def put(self, request, pk):
+        try:
+            schedule = Schedule.objects.get(pk=pk)
+            serializer = ScheduleSerializer(schedule, data=request.data, partial=True)
+            if serializer.is_valid():
+                serializer.save()
+                return Response(serializer.data)
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        except Schedule.DoesNotExist:
+            return Response({'error': 'Schedule not found'}, status=status.HTTP_404_NOT_FOUND)
+
+
+class ScheduleDeleteView(APIView):
+    def delete(self, request, pk):
+        try:
+            schedule = Schedule.objects.get(pk=pk)
+            schedule.delete()
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        except Schedule.DoesNotExist:
+            return Response({'error': 'Schedule not found'}, status=status.HTTP_404_NOT_FOUND)
+
+
 # Place Views
 class PlaceListView(APIView):
     def get(self, request):
-        places = Place.objects.all()
-        serializer = PlaceSerializer(places, many=True)
-        return Response(serializer.data)
+        return filtered_list(request, Place.objects.all(), PlaceSerializer, filters=['petri_net', 'layer'])
 
 
 class PlaceCreateView(APIView):
@@ -201,6 +784,14 @@ class PlaceUpdateView(APIView):
             return Response({'error': 'Place not found'}, status=status.HTTP_404_NOT_FOUND)
 
 
+class PlaceAdjacencyView(APIView):
+    def get(self, request, pk):
+        try:
+            return adjacency(Place.objects.get(pk=pk))
+        except Place.DoesNotExist:
+            return Response({'error': 'Place not found'}, status=status.HTTP_404_NOT_FOUND)
+
+
 class PlaceDeleteView(APIView):
     def delete(self, request, pk):
         try:
@@ -214,9 +805,7 @@ class PlaceDeleteView(APIView):
 # Transition Views
 class TransitionListView(APIView):
     def get(self, request):
-        transitions = Transition.objects.all()
-        serializer = TransitionSerializer(transitions, many=True)
-        return Response(serializer.data)
+        return filtered_list(request, Transition.objects.all(), TransitionSerializer, filters=['petri_net', 'layer'])
 
 
 class TransitionCreateView(APIView):
@@ -252,6 +841,14 @@ class TransitionUpdateView(APIView):
             return Response({'error': 'Transition not found'}, status=status.HTTP_404_NOT_FOUND)
 
 
+class TransitionAdjacencyView(APIView):
+    def get(self, request, pk):
+        try:
+            return adjacency(Transition.objects.get(pk=pk))
+        except Transition.DoesNotExist:
+            return Response({'error': 'Transition not found'}, status=status.HTTP_404_NOT_FOUND)
+
+
 class TransitionDeleteView(APIView):
     def delete(self, request, pk):
         try:
@@ -265,9 +862,7 @@ class TransitionDeleteView(APIView):
 # Arc Views
 class ArcListView(APIView):
     def get(self, request):
-        arcs = Arc.objects.all()
-        serializer = ArcSerializer(arcs, many=True)
-        return Response(serializer.data)
+        return filtered_list(request, Arc.objects.all(), ArcSerializer, filters=['petri_net'])
 
 
 class ArcCreateView(APIView):
@@ -13,6 +13,49 @@ import LayerManager from "./LayerManager"
 import apiService from "../services/ApiService"
 import "./PetriEditor.css"
 
+const SIMULATION_FPS = 2
+
+// Arc effects of a transition, read like the server's compiled net (backend/rdp/engine/compiler.py):
+// arcs whose endpoints are not a place of the net are ignored, weights of parallel arcs add up
+// and the tightest inhibitor arc on a place wins. ``arcs``/``places`` may span several nets.
+const transitionEffect = (transition, arcs, places) => {
+  const net = transition.petri_net
+  const known = new Set(places.filter((p) => p.petri_net === net).map((p) => p.id_in_net))
+  arcs = arcs.filter((arc) => arc.petri_net === net)
+  const consumed = {}
+  const inhibitors = {}
+  const resets = new Set()
+  const produced = {}
+  for (const arc of arcs) {
+    if (arc.target_id === transition.id_in_net && known.has(arc.source_id)) {
+      const pid = arc.source_id
+      if (arc.is_inhibitor) inhibitors[pid] = Math.min(arc.weight, inhibitors[pid] ?? arc.weight)
+      if (arc.is_reset) resets.add(pid)
+      if (!arc.is_inhibitor && !arc.is_reset) consumed[pid] = (consumed[pid] || 0) + arc.weight
+    } else if (arc.source_id === transition.id_in_net && known.has(arc.target_id)) {
+      produced[arc.target_id] = (produced[arc.target_id] || 0) + arc.weight
+    }
+  }
+  return { consumed, inhibitors, resets, produced }
+}
+
+// Same enabling rule as CompiledNet.is_enabled: enough input tokens, every inhibited place
+// below its weight, and no bounded output place over capacity once consumed/reset and produced
+const isEnabled = ({ consumed, inhibitors, resets, produced }, tokens, places) => {
+  for (const [pid, weight] of Object.entries(consumed)) {
+    if (tokens[pid] < weight) return false
+  }
+  for (const [pid, weight] of Object.entries(inhibitors)) {
+    if (tokens[pid] >= weight) return false
+  }
+  for (const place of places) {
+    if (!place.capacity || produced[place.id_in_net] === undefined) continue
+    const base = resets.has(place.id_in_net) ? 0 : tokens[place.id_in_net] - (consumed[place.id_in_net] || 0)
+    if (base + produced[place.id_in_net] > place.capacity) return false
+  }
+  return true
+}
+
 const PetriEditor = () => {
   const canvasRef = useRef(null)
 
@@ -21,7 +64,6 @@ const PetriEditor = () => {
   const [arcs, setArcs] = useState([])
   const [selected, setSelected] = useState(null)
   const [selectedType, setSelectedType] = useState(null) // Modified state to include element type with selected element
-  const [simulationInterval, setSimulationInterval] = useState(null)
   const [contextMenu, setContextMenu] = useState({ x: 0, y: 0, visible: false, type: null })
   const [isSimulating, setIsSimulating] = useState(false) // Added to track simulation state
 
@@ -52,9 +94,9 @@ const PetriEditor = () => {
 
   const [isArcDragging, setIsArcDragging] = useState(false) // Added state to track when an arc is being dragged
 
-  const simulationIntervalRef = useRef(null)
-  const getEnabledTransitionsRef = useRef(null)
-  const fireTransitionRef = useRef(null)
+  const simulationSocketRef = useRef(null)
+  const simulationNetRef = useRef({ transitions: [], arcs: [] })
+  const simulationQueueRef = useRef([])
 
   const handleThemeLoad = useCallback((loadedThemeData) => {
     console.log("[v0] Loading theme data:", loadedThemeData)
@@ -162,37 +204,12 @@ const PetriEditor = () => {
 
   const getEnabledTransitions = useCallback(() => {
     return transitions.filter((transition) => {
-      // Get input and output arcs for this transition
-      const inputArcs = arcs.filter((arc) => arc.target_id === transition.id_in_net)
-      const outputArcs = arcs.filter((arc) => arc.source_id === transition.id_in_net)
-
-      // Check if transition is enabled
-      for (const arc of inputArcs) {
-        const sourcePlace = places.find((p) => p.id_in_net === arc.source_id)
-        if (!sourcePlace) continue
-
-        if (arc.is_inhibitor) {
-          // Inhibitor arc: transition disabled if place has tokens
-          if (sourcePlace.tokens > 0) return false
-        } else {
-          // Normal arc: need enough tokens
-          if (sourcePlace.tokens < arc.weight) return false
-        }
-      }
-
-      // Check output places capacity constraints
-      for (const arc of outputArcs) {
-        const targetPlace = places.find((p) => p.id_in_net === arc.target_id)
-        if (!targetPlace) continue
-
-        if (targetPlace.capacity && targetPlace.tokens + arc.weight > targetPlace.capacity) {
-          return false
-        }
-      }
-
-      return true
+      if (transition.petri_net !== currentPetriNet) return false
+      const netPlaces = places.filter((p) => p.petri_net === transition.petri_net)
+      const tokens = Object.fromEntries(netPlaces.map((p) => [p.id_in_net, p.tokens]))
+      return isEnabled(transitionEffect(transition, arcs, places), tokens, netPlaces)
     })
-  }, [arcs, places, transitions])
+  }, [arcs, places, transitions, currentPetriNet])
 
   const fireTransition = useCallback(
     async (transition) => {
@@ -204,61 +221,39 @@ const PetriEditor = () => {
       setFiringTransitionId(transition.id)
       setFiringArcs([...inputArcs.map((a) => a.id), ...outputArcs.map((a) => a.id)])
 
-      addNotification(`Transition ${transition.label} déclenchée`, "success")
-
-      // Update places based on arc effects
-      const updatedPlaces = [...places]
-
-      // Process input arcs (consume tokens)
-      for (const arc of inputArcs) {
-        const placeIndex = updatedPlaces.findIndex((p) => p.id_in_net === arc.source_id)
-        if (placeIndex === -1) continue
-
-        if (arc.is_reset) {
-          // Reset arc: remove all tokens
-          updatedPlaces[placeIndex] = { ...updatedPlaces[placeIndex], tokens: 0 }
-        } else if (!arc.is_inhibitor) {
-          // Normal arc: consume tokens
-          updatedPlaces[placeIndex] = {
-            ...updatedPlaces[placeIndex],
-            tokens: Math.max(0, updatedPlaces[placeIndex].tokens - arc.weight),
-          }
-        }
-        // Inhibitor arcs don't consume tokens
-      }
-
-      // Process output arcs (produce tokens)
-      for (const arc of outputArcs) {
-        const placeIndex = updatedPlaces.findIndex((p) => p.id_in_net === arc.target_id)
-        if (placeIndex === -1) continue
-
-        const newTokens = updatedPlaces[placeIndex].tokens + arc.weight
-        const capacity = updatedPlaces[placeIndex].capacity
-
-        updatedPlaces[placeIndex] = {
-          ...updatedPlaces[placeIndex],
-          tokens: capacity ? Math.min(newTokens, capacity) : newTokens,
-        }
-      }
-
-      // Update state with new token counts
-      setPlaces((prevPlaces) =>
-        prevPlaces.map((place) => {
-          const updated = updatedPlaces.find((up) => up.id === place.id)
-          return updated || place
-        }),
+      // Show the firing right away (consume, reset, produce, as the server does) and keep
+      // the previous tokens to put back if the server refuses it
+      const { consumed, resets, produced } = transitionEffect(transition, arcs, places)
+      const touched = new Set([...Object.keys(consumed), ...resets, ...Object.keys(produced)])
+      const previous = Object.fromEntries(
+        places
+          .filter((p) => p.petri_net === transition.petri_net && touched.has(p.id_in_net))
+          .map((p) => [p.id_in_net, p.tokens]),
       )
-
-      // Update backend for each modified place
-      for (const updatedPlace of updatedPlaces) {
-        const originalPlace = places.find((p) => p.id === updatedPlace.id)
-        if (originalPlace && originalPlace.tokens !== updatedPlace.tokens) {
-          try {
-            await apiService.updatePlace(updatedPlace.id, { tokens: updatedPlace.tokens })
-          } catch (err) {
-            console.error(`[v0] Failed to update place ${updatedPlace.label}:`, err)
-          }
-        }
+      const fired = { ...previous }
+      for (const [pid, weight] of Object.entries(consumed)) fired[pid] -= weight
+      for (const pid of resets) fired[pid] = 0
+      for (const [pid, weight] of Object.entries(produced)) fired[pid] += weight
+
+      const applyMarking = (marking) =>
+        setPlaces((prevPlaces) =>
+          prevPlaces.map((place) =>
+            place.petri_net === transition.petri_net && marking[place.id_in_net] !== undefined
+              ? { ...place, tokens: marking[place.id_in_net] }
+              : place,
+          ),
+        )
+      applyMarking(fired)
+
+      // Persist the firing in one atomic request and keep the server's marking
+      try {
+        const { marking } = await apiService.firePetriNet(currentPetriNet, [transition.id_in_net])
+        applyMarking(marking)
+        addNotification(`Transition ${transition.label} déclenchée`, "success")
+      } catch (err) {
+        console.error(`[v0] Failed to fire transition ${transition.label}:`, err)
+        applyMarking(previous)
+        addNotification(`Transition ${transition.label} refusée : ${err.message}`, "error")
       }
 
       setTimeout(() => {
@@ -268,56 +263,104 @@ const PetriEditor = () => {
 
       checkValidation()
     },
-    [arcs, places, checkValidation],
+    [arcs, places, checkValidation, currentPetriNet],
   )
 
-  const playSimulation = useCallback(() => {
-    if (simulationIntervalRef.current) {
-      clearInterval(simulationIntervalRef.current)
-      simulationIntervalRef.current = null
-      setSimulationInterval(null)
-    }
-
-    const runSimulationStep = async () => {
-      const enabledTransitions = getEnabledTransitionsRef.current()
+  // Play/pause run the engine server-side and push markings over a WebSocket session
+  // (backend/rdp/consumers.py); the stored marking is left alone
+  const applyTokens = useCallback(
+    (tokens) =>
+      setPlaces((prevPlaces) =>
+        prevPlaces.map((place) =>
+          place.petri_net === currentPetriNet && tokens[place.id_in_net] !== undefined
+            ? { ...place, tokens: tokens[place.id_in_net] }
+            : place,
+        ),
+      ),
+    [currentPetriNet],
+  )
 
-      if (enabledTransitions.length === 0) {
-        console.log("[v0] No enabled transitions - stopping simulation")
-        addNotification("Simulation terminée : deadlock atteint", "info")
-        if (simulationIntervalRef.current) {
-          clearInterval(simulationIntervalRef.current)
-          simulationIntervalRef.current = null
-          setSimulationInterval(null)
+  const openSimulationSession = useCallback(() => {
+    const socket = apiService.openSimulationSocket(currentPetriNet, { fps: SIMULATION_FPS })
+    socket.onmessage = (event) => {
+      const message = JSON.parse(event.data)
+      if (message.type === "init") {
+        applyTokens(message.marking)
+        // Commands given while connecting
+        for (const command of simulationQueueRef.current.splice(0)) socket.send(JSON.stringify(command))
+      } else if (message.type === "frame") {
+        applyTokens(message.changed)
+        const last = message.fired[message.fired.length - 1]
+        const { transitions: netTransitions, arcs: netArcs } = simulationNetRef.current
+        const transition = netTransitions.find((t) => t.petri_net === currentPetriNet && t.id_in_net === last)
+        if (transition) {
+          setFiringTransitionId(transition.id)
+          setFiringArcs(
+            netArcs
+              .filter(
+                (a) => a.petri_net === currentPetriNet && (a.source_id === last || a.target_id === last),
+              )
+              .map((a) => a.id),
+          )
+          setTimeout(() => {
+            setFiringTransitionId(null)
+            setFiringArcs([])
+          }, 500)
         }
+      } else if (message.type === "stopped") {
+        addNotification("Simulation terminée : deadlock atteint", "info")
         setIsSimulating(false)
-        return
+      } else if (message.type === "state") {
+        setIsSimulating(message.playing)
+      } else if (message.type === "error") {
+        addNotification(`Simulation : ${message.error}`, "error")
       }
-      const selectedTransition = enabledTransitions[0]
-
-      console.log(`[v0] Auto-firing transition: ${selectedTransition.label}`)
-      await fireTransitionRef.current(selectedTransition)
     }
+    socket.onclose = () => {
+      if (simulationSocketRef.current === socket) {
+        simulationSocketRef.current = null
+        simulationQueueRef.current = []
+      }
+      setIsSimulating(false)
+      setFiringTransitionId(null)
+      setFiringArcs([])
+    }
+    simulationSocketRef.current = socket
+  }, [currentPetriNet, applyTokens])
+
+  const sendSimulationAction = useCallback(
+    (command) => {
+      const socket = simulationSocketRef.current
+      if (socket && socket.readyState === WebSocket.OPEN) {
+        socket.send(JSON.stringify(command))
+        return
+      }
+      simulationQueueRef.current.push(command)
+      if (!socket) openSimulationSession()
+    },
+    [openSimulationSession],
+  )
 
-    const interval = setInterval(runSimulationStep, 3000)
-    simulationIntervalRef.current = interval
-    setSimulationInterval(interval)
+  const playSimulation = useCallback(() => {
+    if (!currentPetriNet) return
+    sendSimulationAction({ action: "play" })
     setIsSimulating(true)
     addNotification("Simulation automatique démarrée", "info")
-    console.log("[v0] Continuous simulation started - will run until deadlock")
-  }, [])
+  }, [currentPetriNet, sendSimulationAction])
 
   const pauseSimulation = useCallback(() => {
-    if (simulationIntervalRef.current) {
-      clearInterval(simulationIntervalRef.current)
-      simulationIntervalRef.current = null
-      setSimulationInterval(null)
-    }
+    sendSimulationAction({ action: "pause" })
     setIsSimulating(false)
     addNotification("Simulation en pause", "info")
-    console.log("[v0] Simulation paused")
-  }, [])
+  }, [sendSimulationAction])
 
   const stepSimulation = useCallback(() => {
+    if (simulationSocketRef.current) {
+      // Keep stepping the live session rather than the stored marking it started from
+      sendSimulationAction({ action: "step", count: 1 })
+      return
+    }
+
     const enabledTransitions = getEnabledTransitions()
 
     if (enabledTransitions.length === 0) {
@@ -329,7 +372,7 @@ const PetriEditor = () => {
     // Fire the first enabled transition (or could be random)
     const transitionToFire = enabledTransitions[0]
     fireTransition(transitionToFire)
-  }, [getEnabledTransitions, fireTransition])
+  }, [getEnabledTransitions, fireTransition, sendSimulationAction])
 
   const exportJSON = useCallback(async () => {
     const data = {
@@ -1012,9 +1055,8 @@ const PetriEditor = () => {
   )
 
   useEffect(() => {
-    getEnabledTransitionsRef.current = getEnabledTransitions
-    fireTransitionRef.current = fireTransition
-  }, [getEnabledTransitions, fireTransition])
+    simulationNetRef.current = { transitions, arcs }
+  }, [transitions, arcs])
 
   useEffect(() => {
     const canvas = canvasRef.current
@@ -1040,13 +1082,14 @@ const PetriEditor = () => {
   }, [places, transitions, arcs, checkValidation])
 
   useEffect(() => {
+    // One session per net: close it when switching nets or unmounting
     return () => {
-      if (simulationIntervalRef.current) {
-        clearInterval(simulationIntervalRef.current)
-        console.log("[v0] Cleaned up simulation interval on component unmount")
+      if (simulationSocketRef.current) {
+        simulationSocketRef.current.close()
+        simulationSocketRef.current = null
       }
     }
-  }, [])
+  }, [currentPetriNet])
 
   const addNotification = useCallback((message, type) => {
     const notificationId = Date.now()
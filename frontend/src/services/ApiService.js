@@ -246,6 +246,24 @@ class PetriNetAPI {
     }
   }
 
+  // Fire one or more transitions atomically on the server
+  async firePetriNet(id, transitions) {
+    try {
+      const response = await api.post(`/petri-nets/${id}/fire/`, { transitions });
+      return response.data;
+    } catch (err) {
+      throw new Error(err.response?.data?.error || "Failed to fire transitions");
+    }
+  }
+
+  // Live simulation session over WebSocket (see backend/rdp/consumers.py for the protocol)
+  openSimulationSocket(id, options = {}) {
+    const base = new URL(api.defaults.baseURL, window.location.href)
+    const protocol = base.protocol === "https:" ? "wss:" : "ws:"
+    const query = new URLSearchParams(options).toString()
+    return new WebSocket(`${protocol}//${base.host}/ws/rdp/petri-nets/${id}/simulate/${query ? `?${query}` : ""}`)
+  }
+
   // Validation endpoint
   async validatePetriNet(id) {
     try {